@@ -1,53 +1,149 @@
 
+import functools
 import os
+import sys
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import importlib.util
-from scipy import stats
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
-# Path to the aligned data CSV
+# Make the package under src/ importable when running from a source checkout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from gold_vs_equities.core.bootstrap import METHODS as BOOTSTRAP_METHODS, bootstrap_correlation
+from gold_vs_equities.core.matrix import correlation_matrix
+from gold_vs_equities.core.regimes import NBER_RECESSIONS, PHASES, RegimeIndex, regime_table
+from gold_vs_equities.core.presets import HISTORY_PRESET_RANGES, PRESET_RANGES, ROLLING_WINDOW_MONTHS, preset_range
+from gold_vs_equities.core.returns import ReturnKernel
+from gold_vs_equities.core.rolling import RollingCorrelationTable
+from gold_vs_equities.core.stats_index import PrefixStatsIndex
+from gold_vs_equities.data.columnar import ColumnarDataset, to_epoch_days
+from gold_vs_equities.data.dataset_cache import VersionedDataset
+from gold_vs_equities.data.load_historical import SpliceError, get_combined_gold_data, get_seam_tolerance
+from gold_vs_equities.data.snapshots import SnapshotStore, get_snapshots_dir
+from gold_vs_equities.data.sorted_frame import SortedFrame
+from gold_vs_equities.data.tiers import PERIODS_PER_YEAR, MultiResolutionDataset, months_to_rows
+from gold_vs_equities.utils.metrics import METRICS
+from gold_vs_equities.viz.downsample import downsample, range_extrema
+from gold_vs_equities.viz.render_cache import RenderCache
+
+# Path to the aligned data CSV and its memory-mapped binary copy
 DATA_PATH = os.path.join("data", "gold_sp500_aligned.csv")
+BINARY_PATH = os.path.join("data", "gold_sp500_aligned.bin")
+# Wide date x asset table of every asset configured in config.yaml
+ASSETS_PATH = os.path.join("data", "assets_wide.bin")
+# Versioned copies of the files above published by `cli refresh`; when a version is
+# current, every file is read from it instead
+SNAPSHOTS = SnapshotStore(get_snapshots_dir())
 HIST_JSON_PATH = "histprices.json"
 
-# US Recession periods (NBER dates from 1971 onwards)
-RECESSION_PERIODS = [
-    ("1973-11-01", "1975-03-31"),  # 1973-75 Oil Crisis Recession
-    ("1980-01-01", "1980-07-31"),  # 1980 Recession
-    ("1981-07-01", "1982-11-30"),  # 1981-82 Early 1980s Recession
-    ("1990-07-01", "1991-03-31"),  # 1990-91 Gulf War Recession
-    ("2001-03-01", "2001-11-30"),  # 2001 Dot-com Recession
-    ("2007-12-01", "2009-06-30"),  # 2007-09 Great Recession
-    ("2020-02-01", "2020-04-30"),  # 2020 COVID-19 Recession
-]
-
-def add_recession_shading(ax, start_date, end_date):
+# How often an open page checks whether a newer dataset was published
+DATASET_CHECK_SECONDS = 5
+
+# Maximum vertices drawn per line; longer series are downsampled (LTTB)
+PLOT_TARGET_POINTS = 2000
+
+# US Recession periods (NBER dates from 1971 onwards) as a sorted interval index
+RECESSIONS = RegimeIndex(NBER_RECESSIONS)
+
+def add_recession_shading(ax, periods):
     """
     Add grey shading for US recession periods to a matplotlib axis.
     
     Args:
         ax: matplotlib axis object
-        start_date: pd.Timestamp - start of the visible date range
-        end_date: pd.Timestamp - end of the visible date range
+        periods: (start, end) timestamps of the recessions overlapping the
+            visible range, from RECESSIONS.periods (looked up once per rerun)
     """
-    for recession_start, recession_end in RECESSION_PERIODS:
-        rec_start = pd.Timestamp(recession_start)
-        rec_end = pd.Timestamp(recession_end)
-        
-        # Only shade if recession overlaps with visible date range
-        if rec_end >= start_date and rec_start <= end_date:
-            ax.axvspan(rec_start, rec_end, alpha=0.2, color='gray', zorder=0)
+    for rec_start, rec_end in periods:
+        ax.axvspan(rec_start, rec_end, alpha=0.2, color='gray', zorder=0)
+
+
+def plot_downsampled(ax, dates, values, **kwargs):
+    """
+    Plot a line reduced to about PLOT_TARGET_POINTS vertices.
+    
+    The global extremes and the extremes inside each recession period are always
+    kept, so the chart looks the same as plotting every row.
+    
+    Args:
+        ax: matplotlib axis object
+        dates: sorted dates of the line
+        values: y values of the line
+        **kwargs: passed on to ax.plot
+    """
+    dates = np.asarray(dates)
+    values = np.asarray(values, dtype=float)
+    keep = range_extrema(values, zip(*RECESSIONS.bounds(dates)))
+    x, y = downsample(dates, values, target_points=PLOT_TARGET_POINTS, keep=keep)
+    ax.plot(x, y, **kwargs)
+
+
+# ReturnMetrics fields shown in the sidebar, with their labels
+RETURN_METRIC_LABELS = {
+    "total_return": "Total return",
+    "cagr": "CAGR",
+    "volatility": "Volatility (ann.)",
+    "sharpe": "Sharpe",
+    "sortino": "Sortino",
+    "max_drawdown": "Max drawdown",
+    "peak_date": "Drawdown peak",
+    "trough_date": "Drawdown trough",
+    "recovery_date": "Recovered",
+    "mean_return": "Mean period return",
+    "best_return": "Best period",
+    "worst_return": "Worst period",
+    "periods": "Periods",
+}
 
 
-# Check if CSV exists, if not, run enhanced preprocessing
-if not os.path.exists(DATA_PATH):
+def format_return_metric(name, value):
+    """
+    Format one ReturnMetrics field for display.
+    
+    Args:
+        name: field name
+        value: field value (NaN / None when undefined)
+    """
+    if value is None or pd.isna(value):
+        return "–"
+    if name.endswith("_date"):
+        return f"{value:%Y-%m-%d}"
+    if name in ("sharpe", "sortino"):
+        return f"{value:.2f}"
+    if name == "volatility":
+        return f"{value:.1%}"
+    if name == "periods":
+        return f"{value:,}"
+    return f"{value:+.1%}"
+
+
+def instrumented(name, loader, *args):
+    """
+    Call a cached loader, timing it and recording whether the cache had the result.
+    
+    Loaders count "<name>.computed" when their body runs, so an unchanged
+    counter means a cache answered the call.
+    
+    Args:
+        name: stage / cache name
+        loader: cached loader
+        *args: loader arguments
+    """
+    if not METRICS.enabled:
+        return loader(*args)
+    computed = METRICS.counter(f"{name}.computed")
+    with METRICS.span(f"app.{name}"):
+        result = loader(*args)
+    METRICS.record_cache(name, METRICS.counter(f"{name}.computed") == computed)
+    return result
+
+
+# Check if the dataset exists, if not, run preprocessing
+if SNAPSHOTS.current() is None and not os.path.exists(DATA_PATH) and not os.path.exists(BINARY_PATH):
     st.info("Fetching historical data... This may take a moment.")
-    spec = importlib.util.spec_from_file_location("preprocess_1971", os.path.join("src", "preprocess_1971.py"))
-    preprocess = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(preprocess)
-    preprocess.main()
+    from gold_vs_equities.data import preprocess
+    preprocess.main(out_path=DATA_PATH, binary_path=BINARY_PATH)
     st.success("Data loaded successfully!")
 
 st.title("Gold vs S&P 500: Historical Comparison (1971-Present)")
@@ -62,24 +158,140 @@ This analysis uses:
 # Sidebar for data settings
 st.sidebar.header("📊 Analysis Settings")
 
-# Load the data
-@st.cache_data
-def load_data():
-    """Load and cache the dataset."""
-    df = pd.read_csv(DATA_PATH, parse_dates=["date"])
-    
-    # Filter to 1971 onwards
+def clean_frame(df):
+    """Restrict a tier to complete rows from 1971 onwards, sorted by date."""
     df = df[df['date'] >= '1971-01-01']
     df = df.dropna()
-    df = df.sort_values('date').reset_index(drop=True)
+    return df.sort_values('date').reset_index(drop=True)
+
+def load_dataset():
+    """Load the dataset at every pre-aggregated resolution."""
+    METRICS.count("load_data.computed")
+    return MultiResolutionDataset.load(*SNAPSHOTS.resolve(DATA_PATH, BINARY_PATH)).map(clean_frame)
+
+def drop_stale_caches(old, new):
+    """Forget results cached outside the dataset snapshot for a replaced version."""
+    if old is None:
+        return
+    get_render_cache().discard(lambda key: key[0][0] == old.version)
+    load_bootstrap.clear()
+    load_regime_table.clear()
+
+# The dataset is shared by every session as a resource (the frames wrap memory-mapped
+# columns and are never mutated). Each rerun stats its files; when preprocess rewrites
+# them the new version is loaded once and swapped in, without a restart.
+@st.cache_resource
+def get_dataset_cache():
+    """Dataset holder keyed on the size, mtime and content digest of its files."""
+    cache = VersionedDataset([SNAPSHOTS.pointer, DATA_PATH, BINARY_PATH], load_dataset)
+    cache.subscribe(drop_stale_caches)
+    return cache
+
+def load_data():
+    """Return the dataset of this rerun's snapshot."""
+    return snapshot.value
+
+def load_dataset_version():
+    """Identify the loaded dataset so cached charts are dropped when it changes."""
+    return snapshot.version
+
+def per_version(func):
+    """
+    Cache a loader on the current dataset snapshot, keyed by its arguments.
     
-    return df
+    Results are dropped together with the snapshot when a new dataset version
+    is swapped in, so nothing derived from stale data is ever served.
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        return snapshot.derived((func.__name__, *args), lambda: func(*args))
+    return wrapper
+
+@st.cache_resource
+def get_render_cache():
+    """Rendered chart images shared by every session (LRU, 64 MB budget)."""
+    return RenderCache(max_bytes=64 * 1024 * 1024)
+
+@per_version
+def load_sorted_frame(tier):
+    """Wrap a tier as read-only sorted columns; ranges are sliced by binary search."""
+    return SortedFrame.from_frame(load_data().frame(tier))
+
+@per_version
+def load_history_frame():
+    """Monthly gold since 1833 spliced onto the dataset, with S&P 500 where the dataset has it."""
+    METRICS.count("history_frame.computed")
+    # The spliced series is cached on disk and only rebuilt when an input changes
+    gold = get_combined_gold_data(SNAPSHOTS.resolve(DATA_PATH)[0], HIST_JSON_PATH, seam_tolerance=get_seam_tolerance())
+    monthly = load_data().frame("monthly")
+    months = gold["date"].to_numpy(dtype="datetime64[M]")
+    sp500_months = monthly["date"].to_numpy(dtype="datetime64[M]")
+    rows = np.minimum(np.searchsorted(sp500_months, months), len(sp500_months) - 1)
+    sp500 = np.where(sp500_months[rows] == months, monthly["sp500"].to_numpy()[rows], np.nan)
+    return SortedFrame(gold["date"].to_numpy(), {"gold": gold["gold"].to_numpy(), "sp500": sp500})
+
+@per_version
+def load_stats_index(tier):
+    """Build the prefix-sum statistics index once per dataset load and tier."""
+    METRICS.count("stats_index.computed")
+    return PrefixStatsIndex.from_frame(load_data().frame(tier))
+
+@per_version
+def load_rolling_table(tier):
+    """Compute rolling correlations for every selectable window in one pass."""
+    METRICS.count("rolling_table.computed")
+    windows = [months_to_rows(months, tier) for months in ROLLING_WINDOW_MONTHS]
+    return RollingCorrelationTable.from_frame(load_data().frame(tier), windows=[w for w in windows if w >= 2])
+
+@per_version
+def load_return_kernel(tier):
+    """Log returns of every asset in a tier; range metrics are memoized inside the kernel."""
+    METRICS.count("return_kernel.computed")
+    if tier == "history":
+        # Gold only: the S&P 500 has no data before 1971
+        return ReturnKernel.from_frame(load_history_frame(), PERIODS_PER_YEAR["monthly"], columns=["gold"])
+    return ReturnKernel.from_frame(load_sorted_frame(tier), PERIODS_PER_YEAR[tier], columns=["gold", "sp500"])
 
-df = load_data()
+@st.cache_resource(max_entries=64)
+def load_bootstrap(version, tier, start, stop, method):
+    """Block-bootstrap intervals for rows start:stop of a tier (seeded, so reruns agree)."""
+    METRICS.count("bootstrap.computed")
+    frame = load_sorted_frame(tier)
+    return bootstrap_correlation(frame["gold"][start:stop], frame["sp500"][start:stop], method=method).to_dict()
+
+@st.cache_resource(max_entries=64)
+def load_regime_table(version, tier, start, stop, events, months):
+    """Gold / S&P 500 statistics in, around and between the events, over rows start:stop."""
+    METRICS.count("regime_table.computed")
+    frame = load_sorted_frame(tier)
+    series = {"gold": frame["gold"][start:stop], "sp500": frame["sp500"][start:stop]}
+    return regime_table(frame.dates[start:stop], series, RegimeIndex(events), months, PERIODS_PER_YEAR[tier])
+
+@per_version
+def load_asset_table():
+    """Memory-map the multi-asset table, or return None if it was not built."""
+    assets_path, = SNAPSHOTS.resolve(ASSETS_PATH)
+    if not os.path.exists(assets_path):
+        return None
+    return ColumnarDataset(assets_path)
+
+dataset_cache = get_dataset_cache()
+snapshot = instrumented("load_data", dataset_cache.current)
+dataset = snapshot.value
+
+@st.fragment(run_every=DATASET_CHECK_SECONDS)
+def watch_dataset(version):
+    """Rerun the page once a newer dataset version has been swapped in."""
+    if dataset_cache.current().version != version:
+        st.rerun()
+
+watch_dataset(snapshot.version)
+df = dataset.base
+render_cache = get_render_cache()
 
 st.sidebar.write(f"**Data Range:** {df['date'].min().date()} to {df['date'].max().date()}")
 st.sidebar.write(f"**Total Records:** {len(df):,}")
-st.sidebar.write(f"**Frequency:** {'Monthly' if len(df) < 1000 else 'Daily'}")
+st.sidebar.write(f"**Frequency:** {dataset.base_tier.title()}")
 
 # Date range selector
 st.sidebar.header("📅 Date Range")
@@ -87,47 +299,33 @@ st.sidebar.header("📅 Date Range")
 # Get min/max dates
 min_date = df["date"].min().date()
 max_date = df["date"].max().date()
+# Ranges starting before the dataset's first month are served from the monthly gold history
+history_cutoff = pd.Timestamp(min_date).replace(day=1)
+
+# Monthly gold history back to 1833 (S&P 500 data only starts in 1971)
+show_history = st.sidebar.checkbox(
+    "Include gold history before 1971",
+    value=False,
+    help="Adds monthly gold prices from 1833 (histprices.json). S&P 500 comparisons need a range from 1971 onwards."
+)
+if show_history:
+    try:
+        history = instrumented("history_frame", load_history_frame)
+    except SpliceError as exc:
+        # The two gold sources disagree at the seam: fall back to the post-1971 data
+        st.sidebar.error(f"Gold history before 1971 is unavailable: {exc}")
+        show_history = False
+    else:
+        min_date = history.range().first_date().date()
 
 # Add preset date ranges
 preset_ranges = st.sidebar.selectbox(
     "Preset Ranges:",
-    [
-        "Custom",
-        "Last 1 Year", 
-        "Last 5 Years",
-        "Last 10 Years",
-        "Last 20 Years",
-        "Since 2000",
-        "Since 1980",
-        "Since 1971 (All Data)"
-    ]
+    ["Custom", *PRESET_RANGES, *(HISTORY_PRESET_RANGES if show_history else ())]
 )
 
-# Calculate date range based on preset
-if preset_ranges == "Last 1 Year":
-    start_preset = max_date.replace(year=max_date.year - 1) if max_date.year > min_date.year else min_date
-    end_preset = max_date
-elif preset_ranges == "Last 5 Years":
-    start_preset = max_date.replace(year=max_date.year - 5) if max_date.year - 5 >= min_date.year else min_date
-    end_preset = max_date
-elif preset_ranges == "Last 10 Years":
-    start_preset = max_date.replace(year=max_date.year - 10) if max_date.year - 10 >= min_date.year else min_date
-    end_preset = max_date
-elif preset_ranges == "Last 20 Years":
-    start_preset = max_date.replace(year=max_date.year - 20) if max_date.year - 20 >= min_date.year else min_date
-    end_preset = max_date
-elif preset_ranges == "Since 2000":
-    start_preset = datetime(2000, 1, 1).date() if datetime(2000, 1, 1).date() >= min_date else min_date
-    end_preset = max_date
-elif preset_ranges == "Since 1980":
-    start_preset = datetime(1980, 1, 1).date() if datetime(1980, 1, 1).date() >= min_date else min_date
-    end_preset = max_date
-elif preset_ranges == "Since 1971 (All Data)":
-    start_preset = min_date
-    end_preset = max_date
-else:  # Custom
-    start_preset = min_date
-    end_preset = max_date
+# Calculate date range based on preset ("Custom" starts from the full range)
+start_preset, end_preset = preset_range(preset_ranges, min_date, max_date)
 
 # Show custom date selector if "Custom" is selected
 if preset_ranges == "Custom":
@@ -165,35 +363,63 @@ else:
 
 # Convert back to pd.Timestamp for filtering
 start_date, end_date = [pd.Timestamp(d) for d in date_range]
-mask = (df["date"] >= start_date) & (df["date"] <= end_date)
-df_range = df.loc[mask].copy()
 
-# Determine frequency description
-time_description = "Monthly" if len(df) < 1000 else "Daily/Monthly"
+# Recessions overlapping the range, shared by the shading of every chart
+recession_periods = RECESSIONS.periods(start_date, end_date)
+
+if show_history and start_date < history_cutoff:
+    # Pre-1971 ranges: monthly spliced gold history (S&P 500 is missing before 1971)
+    tier = "history"
+    with METRICS.span("app.filter"):
+        view = history.range(start_date, end_date)
+else:
+    # Use the coarsest pre-aggregated tier that still has enough points for the range
+    tier = dataset.select_tier(start_date, end_date)
+    # Zero-copy view of the selected rows (two binary searches, no mask or copy)
+    with METRICS.span("app.filter"):
+        view = load_sorted_frame(tier).range(start_date, end_date)
+
+# Return-based metrics for the range (memoized per asset, range and tier)
+if len(view) >= 2:
+    kernel = instrumented("return_kernel", load_return_kernel, tier)
+    with METRICS.span("app.return_metrics"):
+        return_table = kernel.table(view.start, view.stop)
+        return_correlation = kernel.correlation("gold", "sp500", view.start, view.stop) if "sp500" in kernel.assets else None
+    with st.sidebar.expander("📈 Return Metrics", expanded=True):
+        shown = pd.DataFrame({
+            {"gold": "Gold", "sp500": "S&P 500"}[asset]: [format_return_metric(name, row[name]) for name in RETURN_METRIC_LABELS]
+            for asset, row in return_table.iterrows()
+        }, index=list(RETURN_METRIC_LABELS.values()))
+        st.dataframe(shown)
+        if return_correlation is not None:
+            st.caption(f"Correlation of {tier} log returns: {return_correlation:.2f}")
+        st.caption("Volatility is annualized; Sharpe and Sortino use a 0% risk-free rate")
 
 st.write(f"### Data from {start_date.date()} to {end_date.date()}")
-st.write(f"**Total records in selection:** {len(df_range):,}")
+resolution = "monthly gold history" if tier == "history" else f"{tier} resolution"
+st.write(f"**Total records in selection:** {len(view):,} ({resolution})")
 
-if len(df_range) < 2:
+if len(view) < 2:
     st.warning("Please select a wider date range.")
 else:
-    # Store the first row for visualization
-    first_row = df_range.iloc[0]
-    last_row = df_range.iloc[-1]
+    # First and last dates of the selection
+    first_date = view.first_date().date()
+    last_date = view.last_date().date()
+    has_sp500 = "sp500" in view and pd.notna(view.first("sp500"))
     
     # Calculate overall performance for the selected period
     st.write("### Overall Performance")
     
-    gold_pct = 100 * (last_row["gold"] - first_row["gold"]) / first_row["gold"]
+    gold_pct = view.pct_change("gold")
     st.write(f"**Gold:** {gold_pct:+.2f}% change")
-    st.write(f"- Start: ${first_row['gold']:.2f} ({first_row['date'].date()})")
-    st.write(f"- End: ${last_row['gold']:.2f} ({last_row['date'].date()})")
+    st.write(f"- Start: ${view.first('gold'):.2f} ({first_date})")
+    st.write(f"- End: ${view.last('gold'):.2f} ({last_date})")
     
-    if pd.notna(first_row.get("sp500")) and pd.notna(last_row.get("sp500")):
-        sp500_pct = 100 * (last_row["sp500"] - first_row["sp500"]) / first_row["sp500"]
+    if has_sp500 and pd.notna(view.last("sp500")):
+        sp500_pct = view.pct_change("sp500")
         st.write(f"**S&P 500:** {sp500_pct:+.2f}% change")
-        st.write(f"- Start: {first_row['sp500']:.2f} ({first_row['date'].date()})")
-        st.write(f"- End: {last_row['sp500']:.2f} ({last_row['date'].date()})")
+        st.write(f"- Start: {view.first('sp500'):.2f} ({first_date})")
+        st.write(f"- End: {view.last('sp500'):.2f} ({last_date})")
         
         if gold_pct > sp500_pct:
             winner = "Gold outperformed"
@@ -211,39 +437,43 @@ else:
     # Visualization section
     st.write("### Price History Visualization")
     
-    # Normalize to base 100 at start date for comparison
-    df_viz = df_range.copy()
-    df_viz['gold_indexed'] = 100 * df_viz['gold'] / first_row['gold']
-    
-    # Create matplotlib figure for better control
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # Add recession shading first (so it's in the background)
-    add_recession_shading(ax, start_date, end_date)
-    
-    # Plot gold
-    ax.plot(df_viz['date'], df_viz['gold_indexed'], label='Gold', linewidth=2, color='gold')
-    
-    if pd.notna(first_row.get("sp500")):
-        df_viz['sp500_indexed'] = 100 * df_viz['sp500'] / first_row['sp500']
-        # Plot S&P 500
-        ax.plot(df_viz['date'], df_viz['sp500_indexed'], label='S&P 500', linewidth=2, color='steelblue')
-    
-    # Formatting
-    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Indexed Value (Start = 100)', fontsize=12, fontweight='bold')
-    ax.set_title('Gold vs S&P 500 Performance (Indexed)', fontsize=14, fontweight='bold', pad=20)
-    ax.grid(True, alpha=0.3, linestyle='--')
-    ax.legend(loc='best', framealpha=0.9, fontsize=10)
-    
-    # Add note about recessions
-    ax.text(0.02, 0.98, 'Gray areas indicate US recessions', 
-            transform=ax.transAxes, fontsize=9, verticalalignment='top',
-            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+    # Normalize to base 100 at start date for comparison (computed lazily on the view)
+    def draw_price_chart():
+        # Build the figure directly (no pyplot state) so sessions can draw concurrently
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+        
+        # Add recession shading first (so it's in the background)
+        add_recession_shading(ax, recession_periods)
+        
+        # Plot gold
+        plot_downsampled(ax, view.dates, view.indexed('gold'), label='Gold', linewidth=2, color='gold')
+        
+        if has_sp500:
+            # Plot S&P 500
+            plot_downsampled(ax, view.dates, view.indexed('sp500'), label='S&P 500', linewidth=2, color='steelblue')
+        
+        # Formatting
+        ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Indexed Value (Start = 100)', fontsize=12, fontweight='bold')
+        ax.set_title('Gold vs S&P 500 Performance (Indexed)', fontsize=14, fontweight='bold', pad=20)
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.legend(loc='best', framealpha=0.9, fontsize=10)
+        
+        # Add note about recessions
+        ax.text(0.02, 0.98, 'Gray areas indicate US recessions', 
+                transform=ax.transAxes, fontsize=9, verticalalignment='top',
+                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        
+        fig.tight_layout()
+        return fig
     
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.close(fig)
+    # Serve the encoded image from the shared render cache when another rerun already drew it
+    with METRICS.span("app.chart.price"):
+        price_png = render_cache.get_or_render(
+            (load_dataset_version(), "price", tier, start_date, end_date), draw_price_chart
+        )
+    st.image(price_png)
     
     st.caption("Index: Start of selected period = 100 | Gray shading indicates NBER-defined US recession periods")
     
@@ -252,68 +482,68 @@ else:
     st.write("### 📊 Correlation Analysis (PMCC)")
     st.write("**Pearson's Product-Moment Correlation Coefficient** measures the linear relationship between Gold and S&P 500 prices.")
     
-    if pd.notna(first_row.get("sp500")) and len(df_range) > 1:
-        # Calculate correlation using complete data
-        valid_data = df_range[['gold', 'sp500']].dropna()
+    if has_sp500 and len(view) > 1:
+        # Pearson correlation and regression for the range in O(1) from the prefix-sum index
+        stats_index = instrumented("stats_index", load_stats_index, tier)
+        with METRICS.span("app.stats_query"):
+            range_stats = stats_index.query(start_date, end_date)
+        correlation, p_value = range_stats.r, range_stats.p_value
         
-        if len(valid_data) > 1:
-            # Calculate Pearson correlation coefficient
-            correlation, p_value = stats.pearsonr(valid_data['gold'], valid_data['sp500'])
-            
-            # Display correlation metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Correlation (r)", f"{correlation:.4f}")
-            with col2:
-                st.metric("P-value", f"{p_value:.6f}")
-            with col3:
-                # Interpret correlation strength
-                if abs(correlation) >= 0.7:
-                    strength = "Strong"
-                elif abs(correlation) >= 0.4:
-                    strength = "Moderate"
-                elif abs(correlation) >= 0.2:
-                    strength = "Weak"
-                else:
-                    strength = "Very Weak"
-                
-                direction = "Positive" if correlation > 0 else "Negative"
-                st.metric("Relationship", f"{strength} {direction}")
-            
-            # Interpretation guide
-            with st.expander("📖 How to interpret correlation"):
-                st.write("""
-                **Correlation Coefficient (r):**
-                - **+1.0**: Perfect positive correlation (both move together)
-                - **+0.7 to +1.0**: Strong positive correlation
-                - **+0.4 to +0.7**: Moderate positive correlation
-                - **+0.2 to +0.4**: Weak positive correlation
-                - **-0.2 to +0.2**: Very weak or no correlation
-                - **-0.4 to -0.2**: Weak negative correlation
-                - **-0.7 to -0.4**: Moderate negative correlation
-                - **-1.0 to -0.7**: Strong negative correlation
-                - **-1.0**: Perfect negative correlation (move in opposite directions)
-                
-                **P-value:**
-                - **< 0.05**: Statistically significant (relationship likely not due to chance)
-                - **≥ 0.05**: Not statistically significant (could be due to random chance)
-                
-                **Note:** Gold is often considered a "safe haven" asset that may move inversely to equities during market stress,
-                but can show positive correlation during bull markets.
-                """)
-            
-            # Scatter plot with trend line
-            st.write("#### Scatter Plot: Gold vs S&P 500 with Line of Best Fit")
+        # Display correlation metrics
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Correlation (r)", f"{correlation:.4f}")
+        with col2:
+            st.metric("P-value", f"{p_value:.6f}")
+        with col3:
+            # Interpret correlation strength
+            if abs(correlation) >= 0.7:
+                strength = "Strong"
+            elif abs(correlation) >= 0.4:
+                strength = "Moderate"
+            elif abs(correlation) >= 0.2:
+                strength = "Weak"
+            else:
+                strength = "Very Weak"
             
-            # Prepare data for scatter plot
-            x = valid_data['gold'].values
-            y = valid_data['sp500'].values
+            direction = "Positive" if correlation > 0 else "Negative"
+            st.metric("Relationship", f"{strength} {direction}")
+        
+        # Interpretation guide
+        with st.expander("📖 How to interpret correlation"):
+            st.write("""
+            **Correlation Coefficient (r):**
+            - **+1.0**: Perfect positive correlation (both move together)
+            - **+0.7 to +1.0**: Strong positive correlation
+            - **+0.4 to +0.7**: Moderate positive correlation
+            - **+0.2 to +0.4**: Weak positive correlation
+            - **-0.2 to +0.2**: Very weak or no correlation
+            - **-0.4 to -0.2**: Weak negative correlation
+            - **-0.7 to -0.4**: Moderate negative correlation
+            - **-1.0 to -0.7**: Strong negative correlation
+            - **-1.0**: Perfect negative correlation (move in opposite directions)
             
-            # Calculate line of best fit using linear regression
-            slope, intercept, r_value, p_value_reg, std_err = stats.linregress(x, y)
+            **P-value:**
+            - **< 0.05**: Statistically significant (relationship likely not due to chance)
+            - **≥ 0.05**: Not statistically significant (could be due to random chance)
             
-            # Create matplotlib figure
-            fig, ax = plt.subplots(figsize=(10, 6))
+            **Note:** Gold is often considered a "safe haven" asset that may move inversely to equities during market stress,
+            but can show positive correlation during bull markets.
+            """)
+        
+        # Scatter plot with trend line
+        st.write("#### Scatter Plot: Gold vs S&P 500 with Line of Best Fit")
+        
+        # Prepare data for scatter plot
+        x = view['gold']
+        y = view['sp500']
+        
+        # Line of best fit from the same range statistics
+        slope, intercept = range_stats.slope, range_stats.intercept
+        
+        def draw_scatter_chart():
+            fig = Figure(figsize=(10, 6))
+            ax = fig.subplots()
             
             # Scatter plot
             ax.scatter(x, y, alpha=0.6, s=50, color='steelblue', edgecolors='darkblue', linewidth=0.5, label='Data Points')
@@ -335,80 +565,100 @@ else:
             ax.legend(loc='best', framealpha=0.9)
             
             # Tight layout
-            plt.tight_layout()
-            
-            # Display in Streamlit
-            st.pyplot(fig)
-            
-            # Close figure to free memory
-            plt.close(fig)
-            
-            # Display regression equation and stats
-            st.caption(f"**Regression Line:** S&P 500 = {slope:.4f} × Gold + {intercept:.2f}")
-            st.caption(f"**Correlation:** r = {correlation:.4f} | Each point represents a date in the selected period")
-            
-            # Calculate and display coefficient of determination
-            r_squared = correlation ** 2
-            st.info(f"**R² = {r_squared:.4f}** — {r_squared*100:.2f}% of the variance in one asset can be explained by the other")
-            
-            # Rolling correlation analysis
-            st.write("#### 📈 Rolling Correlation Over Time")
-            
-            # Add disclaimer about monthly data limitations
-            st.markdown("""
-            <div style="background-color: #ffcccc; padding: 15px; border-radius: 5px; border-left: 5px solid #ff0000;">
-                <strong style="color: #cc0000; font-size: 16px;">⚠️ IMPORTANT LIMITATION:</strong><br>
-                <span style="color: #660000;">
-                This rolling correlation analysis has <strong>severe limitations</strong> due to monthly data frequency. 
-                With only 12 data points per year, even a 12-month window provides minimal statistical reliability. 
-                Rolling correlations calculated from monthly data are <strong>highly unstable</strong> and should be 
-                interpreted with extreme caution. Daily data would be required for meaningful rolling correlation analysis.
-                </span>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.write("")  # Add spacing
+            fig.tight_layout()
+            return fig
+        
+        # Display in Streamlit (cached render)
+        with METRICS.span("app.chart.scatter"):
+            scatter_png = render_cache.get_or_render(
+                (load_dataset_version(), "scatter", tier, start_date, end_date), draw_scatter_chart
+            )
+        st.image(scatter_png)
+        
+        # Display regression equation and stats
+        st.caption(f"**Regression Line:** S&P 500 = {slope:.4f} × Gold + {intercept:.2f}")
+        st.caption(f"**Correlation:** r = {correlation:.4f} | Each point represents a date in the selected period")
+        
+        # Calculate and display coefficient of determination
+        r_squared = range_stats.r_squared
+        st.info(f"**R² = {r_squared:.4f}** — {r_squared*100:.2f}% of the variance in one asset can be explained by the other")
+        
+        # Resampled intervals that respect autocorrelation (the p-value above assumes independent rows)
+        if st.checkbox("Show block-bootstrap confidence intervals", value=False) and len(view) >= 3:
+            method = st.radio(
+                "Resampling scheme:",
+                BOOTSTRAP_METHODS,
+                format_func=lambda name: {"stationary": "Stationary (random block lengths)", "block": "Moving blocks (fixed length)"}[name],
+                horizontal=True,
+            )
+            with st.spinner("Resampling..."):
+                bootstrap = instrumented("bootstrap", load_bootstrap, load_dataset_version(), tier, view.start, view.stop, method)
+            intervals = pd.DataFrame.from_dict(bootstrap["statistics"], orient="index")
+            intervals.index = ["Correlation (r)", "Slope", "R²"]
+            st.dataframe(intervals[["estimate", "low", "high", "stderr"]].style.format("{:.4f}"))
+            st.caption(
+                f"{bootstrap['confidence']:.0%} percentile intervals from {bootstrap['resamples']:,} resamples of "
+                f"blocks of ~{bootstrap['block_length']:.0f} {tier} rows | Wide intervals mean the correlation "
+                "of these trending price series is poorly determined, whatever the p-value says"
+            )
+        
+        # Rolling correlation analysis
+        st.write("#### 📈 Rolling Correlation Over Time")
+        
+        # Add disclaimer about monthly data limitations
+        st.markdown("""
+        <div style="background-color: #ffcccc; padding: 15px; border-radius: 5px; border-left: 5px solid #ff0000;">
+            <strong style="color: #cc0000; font-size: 16px;">⚠️ IMPORTANT LIMITATION:</strong><br>
+            <span style="color: #660000;">
+            This rolling correlation analysis has <strong>severe limitations</strong> due to monthly data frequency. 
+            With only 12 data points per year, even a 12-month window provides minimal statistical reliability. 
+            Rolling correlations calculated from monthly data are <strong>highly unstable</strong> and should be 
+            interpreted with extreme caution. Daily data would be required for meaningful rolling correlation analysis.
+            </span>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.write("")  # Add spacing
+        
+        # Let user select window size
+        window_options = {f"{months} months": months for months in ROLLING_WINDOW_MONTHS}
+        
+        window_label = st.selectbox(
+            "Rolling window size:",
+            list(window_options.keys()),
+            index=2  # Default to 12 months
+        )
+        window_size = window_options[window_label]
+        # Window length in rows of the tier being shown
+        window_rows = months_to_rows(window_size, tier)
+        
+        if window_rows >= 2 and len(view) >= window_rows:
+            # Look up the precomputed rolling correlation for the selected rows
+            rolling_table = instrumented("rolling_table", load_rolling_table, tier)
+            with METRICS.span("app.rolling"):
+                rolling_corr = pd.Series(rolling_table.get(window_rows, view.start, view.stop))
             
-            # Let user select window size
-            window_options = {
-                "3 months": 3,
-                "6 months": 6,
-                "12 months": 12,
-                "24 months": 24,
-                "36 months": 36
-            }
+            # Create rolling correlation chart with matplotlib
+            rolling_df = pd.DataFrame({
+                'date': view.dates,
+                'Rolling Correlation': rolling_corr.values
+            })
+            rolling_df = rolling_df.dropna()
             
-            window_label = st.selectbox(
-                "Rolling window size:",
-                list(window_options.keys()),
-                index=2  # Default to 12 months
-            )
-            window_size = window_options[window_label]
+            def draw_rolling_chart():
+                fig = Figure(figsize=(12, 5))
+                ax = fig.subplots()
             
-            if len(valid_data) >= window_size:
-                # Calculate rolling correlation
-                rolling_corr = valid_data['gold'].rolling(window=window_size).corr(valid_data['sp500'])
-                
-                # Create rolling correlation chart with matplotlib
-                rolling_df = pd.DataFrame({
-                    'date': df_range['date'].iloc[:len(rolling_corr)],
-                    'Rolling Correlation': rolling_corr.values
-                })
-                rolling_df = rolling_df.dropna()
-                
-                # Create matplotlib figure
-                fig, ax = plt.subplots(figsize=(12, 5))
-                
                 # Add recession shading
-                add_recession_shading(ax, start_date, end_date)
-                
+                add_recession_shading(ax, recession_periods)
+            
                 # Plot rolling correlation
-                ax.plot(rolling_df['date'], rolling_df['Rolling Correlation'], 
+                plot_downsampled(ax, rolling_df['date'], rolling_df['Rolling Correlation'], 
                        linewidth=2, color='darkgreen', label=f'{window_label} Rolling Correlation')
-                
+            
                 # Add horizontal line at 0
                 ax.axhline(y=0, color='black', linestyle='--', linewidth=1, alpha=0.5)
-                
+            
                 # Formatting
                 ax.set_xlabel('Date', fontsize=12, fontweight='bold')
                 ax.set_ylabel('Correlation Coefficient', fontsize=12, fontweight='bold')
@@ -417,31 +667,121 @@ else:
                 ax.grid(True, alpha=0.3, linestyle='--')
                 ax.legend(loc='best', framealpha=0.9, fontsize=10)
                 ax.set_ylim(-1, 1)
-                
+            
                 # Add note about recessions
                 ax.text(0.02, 0.98, 'Gray areas indicate US recessions', 
                        transform=ax.transAxes, fontsize=9, verticalalignment='top',
                        bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close(fig)
-                
-                st.caption(f"Rolling {window_label} correlation between Gold and S&P 500 | Gray shading indicates recession periods")
-                
-                # Summary statistics
-                st.write(f"**Rolling Correlation Statistics ({window_label}):**")
-                stats_col1, stats_col2, stats_col3 = st.columns(3)
-                with stats_col1:
-                    st.metric("Mean", f"{rolling_corr.mean():.4f}")
-                with stats_col2:
-                    st.metric("Min", f"{rolling_corr.min():.4f}")
-                with stats_col3:
-                    st.metric("Max", f"{rolling_corr.max():.4f}")
-            else:
-                st.warning(f"Not enough data points for {window_label} rolling correlation. Need at least {window_size} records.")
+            
+                fig.tight_layout()
+                return fig
+            
+            with METRICS.span("app.chart.rolling"):
+                rolling_png = render_cache.get_or_render(
+                    (load_dataset_version(), "rolling", tier, start_date, end_date, window_rows), draw_rolling_chart
+                )
+            st.image(rolling_png)
+            
+            st.caption(f"Rolling {window_label} correlation between Gold and S&P 500 | Gray shading indicates recession periods")
+            
+            # Summary statistics
+            st.write(f"**Rolling Correlation Statistics ({window_label}):**")
+            stats_col1, stats_col2, stats_col3 = st.columns(3)
+            with stats_col1:
+                st.metric("Mean", f"{rolling_corr.mean():.4f}")
+            with stats_col2:
+                st.metric("Min", f"{rolling_corr.min():.4f}")
+            with stats_col3:
+                st.metric("Max", f"{rolling_corr.max():.4f}")
         else:
-            st.warning("Not enough valid data points to calculate correlation.")
+            st.warning(f"Not enough data points for {window_label} rolling correlation. Need at least {max(window_rows, 2)} {tier} records.")
     else:
         st.info("S&P 500 data not available for correlation analysis in this period.")
 
+# Returns, volatility, drawdowns and correlation by recession regime
+if len(view) >= 2 and has_sp500:
+    st.write("---")
+    st.write("### 🏛️ Recession Regimes")
+    st.write("Gold vs S&P 500 during each recession in the selected range, in the months before and after it, and across all expansion periods combined.")
+    
+    months_around = st.select_slider("Months before / after each event:", options=[3, 6, 12, 24], value=6)
+    with st.expander("✏️ Custom events"):
+        custom_events = st.text_area(
+            "One event per line as start, end, label (leave empty for the NBER recessions):",
+            placeholder="2022-01-03, 2022-10-12, 2022 bear market",
+        )
+    regimes = RECESSIONS
+    if custom_events.strip():
+        try:
+            regimes = RegimeIndex.from_text(custom_events)
+        except ValueError as exc:
+            st.error(f"Could not read the custom events ({exc}); showing NBER recessions instead.")
+    
+    regime_stats = instrumented(
+        "regime_table", load_regime_table,
+        load_dataset_version(), tier, view.start, view.stop, tuple(regimes.events()), months_around
+    )
+    # Keep the events overlapping the range (three phase rows each) plus the expansion row
+    shown = [3 * k + phase for k in regimes.overlapping(start_date, end_date) for phase in range(len(PHASES))]
+    regime_view = regime_stats.iloc[[*shown, len(regime_stats) - 1]]
+    percent_columns = [c for c in regime_view.columns if c.endswith(("_return", "_volatility", "_max_drawdown"))]
+    labels = {c: c.replace("sp500", "S&P 500").replace("gold", "Gold").replace("_", " ").capitalize() for c in regime_view.columns}
+    st.dataframe(
+        regime_view.style.format({
+            **{c: "{:+.1%}" for c in percent_columns},
+            "correlation": "{:.2f}",
+            "start": lambda d: "–" if pd.isna(d) else f"{d:%Y-%m-%d}",
+            "end": lambda d: "–" if pd.isna(d) else f"{d:%Y-%m-%d}",
+        }, na_rep="–").relabel_index(list(labels.values()), axis="columns"),
+        hide_index=True,
+    )
+    st.caption(
+        f"Returns are total returns over each segment; volatility is annualized from {tier} log returns; "
+        "correlation is between the two assets' returns | Expansion = every row outside the events, combined"
+    )
+
+# Multi-asset correlation matrix (shown once preprocessing has built the asset table)
+asset_table = load_asset_table()
+if asset_table is not None and len(asset_table.value_columns) > 2 and len(view) >= 2:
+    st.write("---")
+    st.write("### 🧮 Multi-Asset Correlation Matrix")
+    
+    # Slice the selected range straight out of the mapped columns
+    asset_days = asset_table['date']
+    first, last = to_epoch_days([start_date, end_date])
+    i = int(np.searchsorted(asset_days, first, side='left'))
+    j = int(np.searchsorted(asset_days, last, side='right'))
+    asset_names = asset_table.value_columns
+    asset_values = np.column_stack([asset_table[name][i:j] for name in asset_names])
+    
+    with METRICS.span("app.correlation_matrix"):
+        matrix = correlation_matrix(asset_values, names=asset_names, min_periods=30)
+    st.dataframe(
+        matrix.to_frame().style.format("{:.2f}", na_rep="–").background_gradient(cmap="RdBu_r", vmin=-1, vmax=1)
+    )
+    st.caption("Pairwise Pearson correlation of daily closes in the selected range | Assets with shorter histories use their overlapping dates only")
+
+# Render cache counters (shared across sessions)
+cache_stats = render_cache.stats()
+st.sidebar.caption(
+    f"Chart cache: {cache_stats.hits} hits / {cache_stats.misses} misses "
+    f"({cache_stats.hit_rate:.0%}), {cache_stats.entries} images, "
+    f"{cache_stats.size_bytes / 1e6:.1f} MB"
+)
+
+# Developer panel: stage timings and cache hit rates (set GOLD_VS_EQ_METRICS=1 to enable)
+if METRICS.enabled:
+    with st.sidebar.expander("🛠️ Developer metrics"):
+        metrics_snapshot = METRICS.snapshot()
+        if metrics_snapshot["spans"]:
+            spans = pd.DataFrame.from_dict(metrics_snapshot["spans"], orient="index")
+            spans[["last", "mean", "max", "total"]] *= 1000
+            st.write("**Stage timings (ms)**")
+            st.dataframe(spans[["count", "last", "mean", "max", "total"]].sort_index().style.format(precision=2))
+        if metrics_snapshot["caches"]:
+            caches = pd.DataFrame.from_dict(metrics_snapshot["caches"], orient="index")
+            st.write("**Cache hit rates**")
+            st.dataframe(caches[["hits", "misses", "hit_rate"]].sort_index().style.format({"hit_rate": "{:.0%}"}))
+        st.download_button("Download Prometheus metrics", METRICS.to_prometheus(), file_name="metrics.prom")
+        if st.button("Reset metrics"):
+            METRICS.reset()
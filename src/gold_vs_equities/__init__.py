@@ -4,12 +4,37 @@ This package provides a compatibility layer exposing the main utilities from
 the existing project. It intentionally copies core modules into the package
 so the project is importable as `gold_vs_equities` for downstream usage.
 
-Versioning and small convenience exports are defined here.
+Versioning and small convenience exports are defined here. The exports are
+loaded on first attribute access (PEP 562), so ``import gold_vs_equities`` or
+importing one submodule does not pull in matplotlib, seaborn, pandas or
+requests until something actually uses them.
 """
+from importlib import import_module
+
 __version__ = "0.1.0"
 
-from .viz import eda  # noqa: F401
-from .data import fetch_ticker, preprocess  # noqa: F401
-from .config import load_config  # noqa: F401
+# Public name -> (module, attribute); attribute None means the module itself.
+_LAZY_EXPORTS = {
+    "eda": ("gold_vs_equities.viz.eda", None),
+    "fetch_ticker": ("gold_vs_equities.data.fetch_ticker", None),
+    "preprocess": ("gold_vs_equities.data.preprocess", None),
+    "load_config": ("gold_vs_equities.config", "load_config"),
+}
 
 __all__ = ["__version__", "eda", "fetch_ticker", "preprocess", "load_config"]
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value  # later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,452 @@
+"""Small JSON HTTP API over the aligned dataset (standard library only).
+
+Endpoints (all ``GET``; ranges are given as ``start``/``end`` ISO dates or as
+``preset``, e.g. ``preset=Last 10 Years``)::
+
+    /api/meta                              dataset version, bounds, presets
+    /api/performance?start=&end=           first/last price and % change
+    /api/correlation?start=&end=           Pearson r, p-value and n
+    /api/regression?start=&end=            slope, intercept, R², stderr
+    /api/rolling?start=&end=&window=12     rolling correlation series
+                  [&points=500]            (optionally downsampled)
+    /metrics                               Prometheus text (when metrics are enabled)
+
+Every response carries a strong ``ETag`` built from the dataset version and
+the normalized request, so a client revalidating with ``If-None-Match`` gets
+a bodiless ``304`` without any computation when nothing changed. Computed
+bodies are kept in an in-process TTL/LRU cache together with their gzip
+encoding, and gzip is served to clients that accept it.
+
+Usage::
+
+    python -m gold_vs_equities.cli serve [--host 127.0.0.1] [--port 8000]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Mapping, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH, load_config
+from gold_vs_equities.core.presets import PRESET_RANGES, ROLLING_WINDOW_MONTHS, preset_range
+from gold_vs_equities.core.rolling import RollingCorrelationTable
+from gold_vs_equities.core.stats_index import PrefixStatsIndex
+from gold_vs_equities.data.columnar import dataset_version, default_binary_path, load_dataset
+from gold_vs_equities.data.snapshots import SnapshotStore, get_snapshots_dir
+from gold_vs_equities.data.tiers import detect_base_tier, months_to_rows
+from gold_vs_equities.utils.metrics import METRICS
+from gold_vs_equities.viz.downsample import downsample_indices
+
+PROJECT_ROOT = DEFAULT_CONFIG_PATH.parent
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_TTL = 300.0
+# Bodies smaller than this are sent uncompressed.
+GZIP_MIN_BYTES = 512
+
+
+class ApiError(ValueError):
+    """A request the API cannot answer; carries the HTTP status to send."""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Args:
+        max_entries: Maximum number of cached responses.
+        ttl: Seconds an entry stays valid.
+        clock: Time source (monotonic seconds), replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        """Return the cached value for ``key``, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _clean(value):
+    """Convert NumPy scalars and non-finite floats to JSON-safe values."""
+    if isinstance(value, (np.floating, float)):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _encode(payload: Mapping) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), allow_nan=False).encode()
+
+
+class AnalyticsService:
+    """Answers API queries from the aligned dataset.
+
+    The dataset, its prefix-sum index and rolling table are built on first use
+    and rebuilt whenever :func:`dataset_version` reports a different file (one
+    ``stat`` call per request, plus reading the snapshot pointer).
+
+    Args:
+        csv_path: Aligned CSV.
+        binary_path: Aligned columnar binary (optional).
+        snapshots: Snapshot store; while it has a current version the files
+            of the same names are read from that version instead.
+    """
+
+    def __init__(
+        self,
+        csv_path: Union[str, Path],
+        binary_path: Union[str, Path, None] = None,
+        snapshots: Optional[SnapshotStore] = None,
+    ):
+        self.csv_path = Path(csv_path)
+        self.binary_path = Path(binary_path) if binary_path else None
+        self.snapshots = snapshots
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, object]] = None
+
+    def _paths(self) -> Tuple[Path, Optional[Path]]:
+        if self.snapshots is None:
+            return self.csv_path, self.binary_path
+        binary_path = self.binary_path or default_binary_path(self.csv_path)
+        return self.snapshots.resolve(self.csv_path, binary_path)
+
+    def _load(self, version: str, csv_path: Path, binary_path: Optional[Path]) -> Dict[str, object]:
+        df = load_dataset(csv_path, binary_path).dropna()
+        dates = df["date"].to_numpy(dtype="datetime64[D]")
+        gold = df["gold"].to_numpy(dtype=np.float64)
+        sp500 = df["sp500"].to_numpy(dtype=np.float64)
+        tier = detect_base_tier(dates)
+        windows = {months: months_to_rows(months, tier) for months in ROLLING_WINDOW_MONTHS}
+        return {
+            "version": version,
+            "dates": dates,
+            "gold": gold,
+            "sp500": sp500,
+            "tier": tier,
+            "index": PrefixStatsIndex(dates, gold, sp500),
+            "rolling": RollingCorrelationTable(gold, sp500, windows=[w for w in windows.values() if w >= 2]),
+        }
+
+    def state(self) -> Dict[str, object]:
+        """Return the current dataset state, reloading it if the files changed."""
+        csv_path, binary_path = self._paths()
+        version = dataset_version(csv_path, binary_path)
+        state = self._state
+        if state is None or state["version"] != version:
+            with self._lock:
+                state = self._state
+                if state is None or state["version"] != version:
+                    state = self._state = self._load(version, csv_path, binary_path)
+        return state
+
+    @property
+    def version(self) -> str:
+        """Version of the dataset currently served."""
+        return self.state()["version"]
+
+    def _range(self, state, params: Mapping[str, str]) -> Tuple[date, date]:
+        dates = state["dates"]
+        if not len(dates):
+            raise ApiError("dataset is empty", HTTPStatus.SERVICE_UNAVAILABLE)
+        min_date, max_date = dates[0].item(), dates[-1].item()
+        preset = params.get("preset")
+        if preset:
+            if preset not in PRESET_RANGES:
+                raise ApiError(f"unknown preset {preset!r}")
+            return preset_range(preset, min_date, max_date)
+        try:
+            start = date.fromisoformat(params["start"]) if params.get("start") else min_date
+            end = date.fromisoformat(params["end"]) if params.get("end") else max_date
+        except ValueError as exc:
+            raise ApiError(f"invalid date: {exc}") from None
+        if start > end:
+            raise ApiError("start must not be after end")
+        return start, end
+
+    def meta(self, params: Mapping[str, str]) -> Dict[str, object]:
+        state = self.state()
+        dates = state["dates"]
+        return {
+            "version": state["version"],
+            "rows": len(dates),
+            "frequency": state["tier"],
+            "min_date": str(dates[0]) if len(dates) else None,
+            "max_date": str(dates[-1]) if len(dates) else None,
+            "presets": list(PRESET_RANGES),
+            "windows": list(ROLLING_WINDOW_MONTHS),
+        }
+
+    def performance(self, params: Mapping[str, str]) -> Dict[str, object]:
+        state = self.state()
+        start, end = self._range(state, params)
+        i, j = state["index"].bounds(start, end)
+        result: Dict[str, object] = {"start": str(start), "end": str(end), "n": j - i}
+        for name in ("gold", "sp500"):
+            if j - i < 1:
+                result[name] = None
+                continue
+            first, last = state[name][i], state[name][j - 1]
+            result[name] = {
+                "start_date": str(state["dates"][i]),
+                "end_date": str(state["dates"][j - 1]),
+                "start": _clean(first),
+                "end": _clean(last),
+                "pct_change": _clean(100 * (last - first) / first),
+            }
+        return result
+
+    def correlation(self, params: Mapping[str, str]) -> Dict[str, object]:
+        state = self.state()
+        start, end = self._range(state, params)
+        stats = state["index"].query(start, end)
+        return {"start": str(start), "end": str(end), "n": stats.n, "r": _clean(stats.r), "p_value": _clean(stats.p_value)}
+
+    def regression(self, params: Mapping[str, str]) -> Dict[str, object]:
+        state = self.state()
+        start, end = self._range(state, params)
+        stats = state["index"].query(start, end)
+        return {
+            "start": str(start),
+            "end": str(end),
+            "n": stats.n,
+            "slope": _clean(stats.slope),
+            "intercept": _clean(stats.intercept),
+            "r_squared": _clean(stats.r_squared),
+            "stderr": _clean(stats.stderr),
+        }
+
+    def rolling(self, params: Mapping[str, str]) -> Dict[str, object]:
+        state = self.state()
+        start, end = self._range(state, params)
+        try:
+            window = int(params.get("window", 12))
+            points = int(params["points"]) if params.get("points") else None
+        except ValueError:
+            raise ApiError("window and points must be integers") from None
+        if window not in ROLLING_WINDOW_MONTHS:
+            raise ApiError(f"window must be one of {', '.join(map(str, ROLLING_WINDOW_MONTHS))} months")
+        rows = months_to_rows(window, state["tier"])
+        if rows < 2:
+            raise ApiError(f"window of {window} months is too short for {state['tier']} data")
+        if points is not None and points < 3:
+            raise ApiError("points must be at least 3")
+        i, j = state["index"].bounds(start, end)
+        values = state["rolling"].get(rows, i, j)
+        dates = state["dates"][i:j]
+        keep = np.flatnonzero(np.isfinite(values))
+        if points is not None:
+            keep = downsample_indices(dates, values, target_points=points)
+        return {
+            "start": str(start),
+            "end": str(end),
+            "window": window,
+            "dates": np.datetime_as_string(dates[keep]).tolist(),
+            "values": np.round(values[keep], 6).tolist(),
+        }
+
+
+class AnalyticsApp:
+    """Routing, ETag handling, caching and encoding around a service.
+
+    Kept separate from the HTTP server so it can be driven directly in tests
+    or mounted behind another server.
+
+    Args:
+        service: The :class:`AnalyticsService` answering queries.
+        cache: Response cache (defaults to a fresh :class:`ResponseCache`).
+    """
+
+    ROUTES = ("meta", "performance", "correlation", "regression", "rolling")
+
+    def __init__(self, service: AnalyticsService, cache: Optional[ResponseCache] = None):
+        self.service = service
+        self.cache = cache if cache is not None else ResponseCache()
+
+    @staticmethod
+    def _etag(version: str, route: str, params: Mapping[str, str], gzipped: bool) -> str:
+        canonical = route + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        digest = hashlib.sha1(f"{version}|{canonical}".encode()).hexdigest()[:20]
+        return f'"{version}-{digest}{"-gz" if gzipped else ""}"'
+
+    def handle(self, target: str, headers: Mapping[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Answer one ``GET`` request.
+
+        Args:
+            target: Request path with query string.
+            headers: Request headers (case-insensitive mapping or plain dict
+                with canonical header names).
+
+        Returns:
+            tuple: ``(status, response headers, body)``.
+        """
+        url = urlsplit(target)
+        if url.path.rstrip("/") == "/metrics":
+            return self._metrics()
+        route = url.path.rstrip("/").removeprefix("/api/")
+        if route not in self.ROUTES:
+            return self._error(HTTPStatus.NOT_FOUND, f"unknown endpoint {url.path!r}")
+        params = dict(parse_qsl(url.query))
+        gzipped = "gzip" in (headers.get("Accept-Encoding") or "")
+
+        try:
+            version = self.service.version
+        except FileNotFoundError:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, "dataset not available")
+        etag = self._etag(version, route, params, gzipped)
+        response_headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = headers.get("If-None-Match") or ""
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            METRICS.count("api.not_modified")
+            return HTTPStatus.NOT_MODIFIED, response_headers, b""
+
+        key = (version, route, tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        METRICS.record_cache("api_response", cached is not None)
+        if cached is None:
+            try:
+                with METRICS.span(f"api.{route}"):
+                    body = _encode(getattr(self.service, route)(params))
+            except ApiError as exc:
+                return self._error(exc.status, str(exc))
+            compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+            cached = (body, compressed)
+            self.cache.put(key, cached)
+        body, compressed = cached
+
+        response_headers["Content-Type"] = "application/json"
+        if gzipped and compressed is not None:
+            response_headers["Content-Encoding"] = "gzip"
+            body = compressed
+        response_headers["Content-Length"] = str(len(body))
+        return HTTPStatus.OK, response_headers, body
+
+    @staticmethod
+    def _metrics() -> Tuple[int, Dict[str, str], bytes]:
+        if not METRICS.enabled:
+            return AnalyticsApp._error(HTTPStatus.NOT_FOUND, "metrics are disabled (set GOLD_VS_EQ_METRICS=1)")
+        body = METRICS.to_prometheus().encode()
+        headers = {
+            "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+            "Content-Length": str(len(body)),
+            "Cache-Control": "no-store",
+        }
+        return HTTPStatus.OK, headers, body
+
+    @staticmethod
+    def _error(status: HTTPStatus, message: str) -> Tuple[int, Dict[str, str], bytes]:
+        body = _encode({"error": message})
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body)), "Cache-Control": "no-store"}
+        return status, headers, body
+
+
+def make_handler(app: AnalyticsApp):
+    """Return a :class:`BaseHTTPRequestHandler` class bound to ``app``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802 (stdlib naming)
+            status, headers, body = app.handle(self.path, self.headers)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status == HTTPStatus.NOT_MODIFIED:
+                self.send_header("Content-Length", "0")
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):  # quiet by default
+            pass
+
+    return Handler
+
+
+def create_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    csv_path: Union[str, Path, None] = None,
+    binary_path: Union[str, Path, None] = None,
+) -> ThreadingHTTPServer:
+    """Build (but do not start) a threaded API server.
+
+    Paths default to ``csv_path`` / ``binary_path`` in config.yaml, read
+    from the current snapshot once ``cli refresh`` has published one.
+    """
+    cfg = load_config()
+    snapshots = None if csv_path else SnapshotStore(get_snapshots_dir())
+    csv_path = Path(csv_path) if csv_path else PROJECT_ROOT / cfg["csv_path"]
+    binary_path = Path(binary_path) if binary_path else PROJECT_ROOT / cfg.get("binary_path", "data/gold_sp500_aligned.bin")
+    app = AnalyticsApp(AnalyticsService(csv_path, binary_path, snapshots))
+    return ThreadingHTTPServer((host, port), make_handler(app))
+
+
+def main(argv=None) -> int:
+    """Command-line entry point for ``cli serve``."""
+    parser = argparse.ArgumentParser(prog="gold_vs_equities.cli serve", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    server = create_server(args.host, args.port)
+    print(f"Serving analytics API on http://{args.host}:{server.server_address[1]}/api/meta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
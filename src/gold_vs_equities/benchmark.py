@@ -0,0 +1,421 @@
+"""Speed benchmarks for the data pipeline and dashboard computations.
+
+Every case times one step of the real code path on seeded synthetic data
+(:mod:`gold_vs_equities.data.synthetic`) at several sizes:
+
+* ``fetch.parse`` — decode a stored chart API response into columns;
+* ``preprocess.align_write`` — merge / round the series, write CSV + binary;
+* ``load.binary`` / ``load.csv`` — load the aligned dataset from either file;
+* ``filter.range`` — select the middle half of the rows by date;
+* ``stats.pearson_regression`` — scipy Pearson r and linear regression;
+* ``stats.prefix_index`` — build the prefix-sum index and answer one range;
+* ``rolling.correlation`` — rolling correlation over a 252-row window;
+* ``render.chart`` — downsample, draw and encode the price chart as PNG.
+
+Results are written as JSON (one file per run, stamped with the git commit)
+and can be compared against an earlier run to spot regressions::
+
+    python -m gold_vs_equities.cli benchmark [--sizes 1k,100k,1M,10M] [--cases CASE,...]
+        [--repeat N] [--seed S] [--out PATH] [--baseline PATH] [--threshold 0.10]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH
+from gold_vs_equities.data import synthetic
+
+PROJECT_ROOT = DEFAULT_CONFIG_PATH.parent
+DEFAULT_RESULTS_DIR = PROJECT_ROOT / "data" / "benchmarks"
+DEFAULT_SIZES = ("1k", "100k", "1M", "10M")
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+ROLLING_WINDOW = 252
+BOOTSTRAP_RESAMPLES = 1_000
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class BenchmarkContext:
+    """Inputs shared by every case at one size; built lazily and reused."""
+
+    rows: int
+    seed: int
+    workdir: Path
+    _frame: Optional[pd.DataFrame] = None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = synthetic.synthetic_prices(self.rows, seed=self.seed)
+        return self._frame
+
+    def path(self, name: str) -> Path:
+        return self.workdir / f"{self.rows}-{name}"
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One timed step.
+
+    Attributes:
+        name: Dotted case name.
+        setup: Called with the context once per size; returns the function to
+            time (called with no arguments).
+        max_rows: Largest size the case supports (None for no limit).
+        limit_reason: Why sizes above ``max_rows`` are skipped.
+    """
+
+    name: str
+    setup: Callable[[BenchmarkContext], Callable[[], object]]
+    max_rows: Optional[int] = None
+    limit_reason: str = ""
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Timings of one case at one size, in seconds."""
+
+    case: str
+    size: str
+    rows: int
+    status: str
+    repeat: int = 0
+    best: Optional[float] = None
+    median: Optional[float] = None
+    mean: Optional[float] = None
+    reason: str = ""
+
+
+CASES: Dict[str, BenchmarkCase] = {}
+
+
+def _case(name: str, max_rows: Optional[int] = None, limit_reason: str = ""):
+    def register(setup):
+        CASES[name] = BenchmarkCase(name, setup, max_rows, limit_reason)
+        return setup
+
+    return register
+
+
+@_case("fetch.parse")
+def _fetch_parse(ctx: BenchmarkContext):
+    from gold_vs_equities.data.fetch_ticker import parse_chart_columns
+
+    gold, _ = synthetic.synthetic_columns(ctx.rows, seed=ctx.seed)
+    body = json.dumps(synthetic.chart_payload(gold, seed=ctx.seed))
+    return lambda: parse_chart_columns(json.loads(body))
+
+
+@_case(
+    "preprocess.align_write",
+    max_rows=synthetic.MAX_CALENDAR_DAY_ROWS,
+    limit_reason="the merge is keyed by calendar day and datetime64[ns] spans fewer days",
+)
+def _preprocess_align_write(ctx: BenchmarkContext):
+    from gold_vs_equities.data.columnar import write_frame
+    from gold_vs_equities.data.preprocess import align_prices
+
+    gold, sp500 = synthetic.synthetic_columns(ctx.rows, seed=ctx.seed)
+    csv_path, binary_path = ctx.path("align.csv"), ctx.path("align.bin")
+
+    def run():
+        merged = align_prices(gold, sp500)
+        merged.to_csv(csv_path, index=False)
+        write_frame(merged, binary_path)
+
+    return run
+
+
+@_case("load.binary")
+def _load_binary(ctx: BenchmarkContext):
+    from gold_vs_equities.data.columnar import load_dataset, write_frame
+
+    binary_path = write_frame(ctx.frame, ctx.path("load.bin"))
+    return lambda: load_dataset(ctx.path("missing.csv"), binary_path)
+
+
+@_case("load.csv")
+def _load_csv(ctx: BenchmarkContext):
+    from gold_vs_equities.data.columnar import load_dataset
+
+    csv_path = ctx.path("load.csv")
+    ctx.frame.to_csv(csv_path, index=False)
+    return lambda: load_dataset(csv_path, ctx.path("missing.bin"))
+
+
+@_case("filter.range")
+def _filter_range(ctx: BenchmarkContext):
+    df = ctx.frame
+    start, end = df["date"].iloc[len(df) // 4], df["date"].iloc[3 * len(df) // 4]
+    return lambda: df.loc[(df["date"] >= start) & (df["date"] <= end)]
+
+
+@_case("stats.pearson_regression")
+def _pearson_regression(ctx: BenchmarkContext):
+    from scipy import stats
+
+    gold, sp500 = ctx.frame["gold"].to_numpy(), ctx.frame["sp500"].to_numpy()
+    return lambda: (stats.pearsonr(gold, sp500), stats.linregress(gold, sp500))
+
+
+@_case("stats.prefix_index")
+def _prefix_index(ctx: BenchmarkContext):
+    from gold_vs_equities.core.stats_index import PrefixStatsIndex
+
+    df = ctx.frame
+    dates = df["date"].to_numpy(dtype="datetime64[D]")
+    gold, sp500 = df["gold"].to_numpy(), df["sp500"].to_numpy()
+    start, end = dates[len(dates) // 4], dates[3 * len(dates) // 4]
+    return lambda: PrefixStatsIndex(dates, gold, sp500).query(start, end)
+
+
+@_case("rolling.correlation")
+def _rolling_correlation(ctx: BenchmarkContext):
+    from gold_vs_equities.core.rolling import rolling_correlation
+
+    gold, sp500 = ctx.frame["gold"].to_numpy(), ctx.frame["sp500"].to_numpy()
+    return lambda: rolling_correlation(gold, sp500, ROLLING_WINDOW)
+
+
+@_case(
+    "stats.bootstrap",
+    max_rows=1_000_000,
+    limit_reason="block lookups grow with rows ** (2/3); at 10M rows one run takes minutes",
+)
+def _bootstrap(ctx: BenchmarkContext):
+    from gold_vs_equities.core.bootstrap import bootstrap_correlation
+
+    gold, sp500 = ctx.frame["gold"].to_numpy(), ctx.frame["sp500"].to_numpy()
+    return lambda: bootstrap_correlation(gold, sp500, resamples=BOOTSTRAP_RESAMPLES, seed=ctx.seed)
+
+
+@_case("render.chart")
+def _render_chart(ctx: BenchmarkContext):
+    from matplotlib.figure import Figure
+
+    from gold_vs_equities.viz.downsample import downsample
+    from gold_vs_equities.viz.render_cache import render_figure
+
+    df = ctx.frame
+    dates = df["date"].to_numpy()
+
+    def run():
+        fig = Figure(figsize=(12, 6))
+        ax = fig.add_subplot()
+        for column in ("gold", "sp500"):
+            ax.plot(*downsample(dates, df[column].to_numpy()), label=column)
+        ax.legend()
+        return render_figure(fig)
+
+    return run
+
+
+def time_callable(func: Callable[[], object], repeat: int) -> List[float]:
+    """Call ``func`` ``repeat`` times with the GC paused; return each duration."""
+    timings = []
+    for _ in range(repeat):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return timings
+
+
+def run_benchmarks(
+    sizes: Sequence[str] = DEFAULT_SIZES,
+    cases: Optional[Sequence[str]] = None,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    workdir: Union[str, Path, None] = None,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> List[BenchmarkResult]:
+    """Time every selected case at every size.
+
+    The first call of each case is an untimed warm-up (imports, caches).
+
+    Args:
+        sizes: Named sizes (see :data:`synthetic.SIZES`) or row counts.
+        cases: Case names (defaults to every case).
+        repeat: Timed calls per case and size.
+        seed: Seed for the synthetic data.
+        workdir: Directory for files the cases write (a temporary one by default).
+        progress: Called with each result as soon as it is available.
+
+    Returns:
+        list: One :class:`BenchmarkResult` per case and size.
+    """
+    names = list(cases) if cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {', '.join(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            ctx = BenchmarkContext(synthetic.parse_size(size), seed, Path(tmp))
+            for name in names:
+                case = CASES[name]
+                if case.max_rows is not None and ctx.rows > case.max_rows:
+                    result = BenchmarkResult(name, size, ctx.rows, "skipped", reason=case.limit_reason)
+                else:
+                    func = case.setup(ctx)
+                    func()
+                    timings = time_callable(func, repeat)
+                    result = BenchmarkResult(
+                        name,
+                        size,
+                        ctx.rows,
+                        "ok",
+                        repeat=repeat,
+                        best=min(timings),
+                        median=statistics.median(timings),
+                        mean=statistics.fmean(timings),
+                    )
+                results.append(result)
+                if progress:
+                    progress(result)
+            del ctx
+            gc.collect()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment_info() -> Dict[str, object]:
+    """Describe the machine and library versions a run was measured on."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(results: Sequence[BenchmarkResult], out_path: Union[str, Path], seed: int = 0) -> Path:
+    """Write ``{"meta": ..., "results": [...]}`` JSON atomically."""
+    out_path = Path(out_path)
+    payload = {
+        "meta": {
+            "format_version": RESULTS_FORMAT_VERSION,
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seed": seed,
+            "environment": environment_info(),
+        },
+        "results": [asdict(result) for result in results],
+    }
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def default_results_path() -> Path:
+    """Return ``data/benchmarks/<UTC time>-<commit>.json``."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return DEFAULT_RESULTS_DIR / f"{stamp}-{_git_commit() or 'nogit'}.json"
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, object]]:
+    """Compare the best times of two result files.
+
+    Args:
+        baseline: Decoded earlier results file.
+        current: Decoded new results file.
+        threshold: Relative slow-down above which a row counts as a regression.
+
+    Returns:
+        list: One row per case and size measured in both runs, with
+        ``baseline``, ``current``, ``ratio`` and ``regression`` keys.
+    """
+    before = {(r["case"], r["size"]): r for r in baseline["results"] if r["status"] == "ok"}
+    rows = []
+    for result in current["results"]:
+        old = before.get((result["case"], result["size"]))
+        if result["status"] != "ok" or old is None:
+            continue
+        ratio = result["best"] / old["best"] if old["best"] else float("inf")
+        rows.append(
+            {
+                "case": result["case"],
+                "size": result["size"],
+                "baseline": old["best"],
+                "current": result["best"],
+                "ratio": ratio,
+                "regression": ratio > 1.0 + threshold,
+            }
+        )
+    return rows
+
+
+def _format_result(result: BenchmarkResult) -> str:
+    if result.status != "ok":
+        return f"{result.case:<28} {result.size:>6}  skipped ({result.reason})"
+    return f"{result.case:<28} {result.size:>6}  best {result.best * 1e3:10.3f} ms  median {result.median * 1e3:10.3f} ms"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for ``cli benchmark``.
+
+    Returns 1 when ``--baseline`` is given and a case regressed beyond the
+    threshold, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(prog="gold_vs_equities.cli benchmark", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="comma-separated sizes (1k,100k,1M,10M or row counts)")
+    parser.add_argument("--cases", help=f"comma-separated cases (default all: {', '.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed calls per case and size")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+    parser.add_argument("--out", help="results file (default data/benchmarks/<time>-<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slow-down counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        sizes=[size.strip() for size in args.sizes.split(",") if size.strip()],
+        cases=[case.strip() for case in args.cases.split(",")] if args.cases else None,
+        repeat=args.repeat,
+        seed=args.seed,
+        progress=lambda result: print(_format_result(result), flush=True),
+    )
+    out_path = write_results(results, args.out or default_results_path(), seed=args.seed)
+    print(f"Wrote {len(results)} results to {out_path}")
+
+    if not args.baseline:
+        return 0
+    current = json.loads(out_path.read_text())
+    rows = compare_results(json.loads(Path(args.baseline).read_text()), current, args.threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<28} {row['size']:>6}  x{row['ratio']:.2f}{flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
@@ -1,15 +1,26 @@
 """Simple CLI entry points for the package.
 
 Usage: python -m gold_vs_equities.cli [command]
-Available commands: preprocess, plot
+Available commands: preprocess, refresh, plot, report, serve, export-web, benchmark
+
+Each command imports its module only when it runs, so ``preprocess`` never
+loads the plotting stack and printing the help loads nothing heavy.
 """
 import sys
-from . import preprocess, eda
 
 
 def _help():
     print("Usage: python -m gold_vs_equities.cli [command]")
-    print("Commands:\n  preprocess   Fetch and prepare aligned CSV\n  plot <path>  Plot the aligned CSV file")
+    print(
+        "Commands:\n"
+        "  preprocess [--full]  Fetch and prepare aligned CSV (--full ignores the ticker cache)\n"
+        "  refresh [options]    Refresh the dataset on a schedule into versioned snapshots (see refresh --help)\n"
+        "  plot <path>          Plot the aligned CSV file\n"
+        "  report [options]     Evaluate every preset x window x asset pair (see report --help)\n"
+        "  serve [options]      Run the JSON analytics API (see serve --help)\n"
+        "  export-web [--out PATH]  Write the precomputed web dashboard bundle\n"
+        "  benchmark [options]  Time the pipeline on synthetic data (see benchmark --help)"
+    )
 
 
 def main(argv=None):
@@ -19,14 +30,38 @@ def main(argv=None):
         return 1
     cmd = argv[0]
     if cmd == "preprocess":
-        preprocess.main()
+        from .data import preprocess
+
+        preprocess.main(force_full="--full" in argv[1:])
         return 0
+    if cmd == "refresh":
+        from . import refresh
+
+        return refresh.main(argv[1:])
     if cmd == "plot":
         if len(argv) < 2:
             print("Missing path for plot command")
             return 2
+        from .viz import eda
+
         eda.plot_gold_sp500(argv[1])
         return 0
+    if cmd == "report":
+        from . import report
+
+        return report.main(argv[1:])
+    if cmd == "serve":
+        from . import api
+
+        return api.main(argv[1:])
+    if cmd == "export-web":
+        from . import web_export
+
+        return web_export.main(argv[1:])
+    if cmd == "benchmark":
+        from . import benchmark
+
+        return benchmark.main(argv[1:])
     print(f"Unknown command: {cmd}")
     _help()
     return 3
@@ -38,7 +38,13 @@ def load_config(path: str | Path | None = None) -> Dict[str, Any]:
             cfg = yaml.safe_load(f)
 
     # Apply common environment override pattern
-    cfg_env_map = {"api_key": "GOLD_VS_EQ_API_KEY", "csv_path": "GOLD_VS_EQ_CSV_PATH"}
+    cfg_env_map = {
+        "api_key": "GOLD_VS_EQ_API_KEY",
+        "csv_path": "GOLD_VS_EQ_CSV_PATH",
+        "binary_path": "GOLD_VS_EQ_BINARY_PATH",
+        "assets_path": "GOLD_VS_EQ_ASSETS_PATH",
+        "snapshots_dir": "GOLD_VS_EQ_SNAPSHOTS_DIR",
+    }
     for key, env_var in cfg_env_map.items():
         val = os.getenv(env_var)
         if val:
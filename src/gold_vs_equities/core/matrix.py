@@ -0,0 +1,205 @@
+"""Correlation and covariance matrices for many assets at once.
+
+Input is an aligned ``T x N`` array (one row per date, one column per asset).
+For complete data the whole correlation matrix comes from a single BLAS-backed
+product of the centred array with itself. Missing values (assets with
+different listing dates) are handled pairwise, as ``DataFrame.corr`` does,
+with four matrix products over the zero-filled data and its validity mask, so
+no code ever loops over asset pairs.
+
+Rolling matrices are computed for a batch of windows at a time with one
+batched ``matmul`` per batch. Every window is centred on its own mean before
+multiplying, so results are as accurate as a direct two-pass calculation.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_CHUNK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class CorrelationMatrix:
+    """Pairwise statistics for a set of assets.
+
+    Attributes:
+        names: Asset names, in column order.
+        correlation: ``(N, N)`` Pearson correlations (NaN where undefined).
+        covariance: ``(N, N)`` sample covariances (``ddof=1``).
+        counts: ``(N, N)`` number of rows where both assets have values.
+    """
+
+    names: Tuple[str, ...]
+    correlation: np.ndarray
+    covariance: np.ndarray
+    counts: np.ndarray
+
+    def to_frame(self, kind: str = "correlation") -> pd.DataFrame:
+        """Return ``correlation``, ``covariance`` or ``counts`` as a labelled frame."""
+        return pd.DataFrame(getattr(self, kind), index=list(self.names), columns=list(self.names))
+
+
+def _as_matrix(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2-D (rows x assets) array")
+    return values
+
+
+def _finish(sxy: np.ndarray, var_i: np.ndarray, var_j: np.ndarray, counts: np.ndarray, min_periods: int):
+    """Turn centred cross sums into (correlation, covariance) with masking."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = sxy / (counts - 1)
+        correlation = np.clip(sxy / np.sqrt(var_i * var_j), -1.0, 1.0)
+    too_few = counts < max(min_periods, 2)
+    covariance[too_few] = np.nan
+    correlation[too_few | (var_i <= 0) | (var_j <= 0)] = np.nan
+    diagonal = np.diag_indices_from(correlation)
+    correlation[diagonal] = np.where(np.isnan(correlation[diagonal]), np.nan, 1.0)
+    return correlation, covariance
+
+
+def correlation_matrix(
+    values,
+    names: Optional[Sequence[str]] = None,
+    min_periods: int = 2,
+) -> CorrelationMatrix:
+    """Compute the full correlation and covariance matrix of ``values``.
+
+    Args:
+        values: ``(T, N)`` array; NaN marks a missing observation.
+        names: Asset names (defaults to ``"0" .. "N-1"``).
+        min_periods: Pairs with fewer overlapping rows are reported as NaN.
+
+    Returns:
+        CorrelationMatrix: Pairwise-complete statistics, matching
+        ``DataFrame.corr()`` / ``DataFrame.cov()``.
+    """
+    values = _as_matrix(values)
+    n_assets = values.shape[1]
+    names = tuple(names) if names is not None else tuple(str(i) for i in range(n_assets))
+    if len(names) != n_assets:
+        raise ValueError("names must have one entry per column")
+
+    valid = np.isfinite(values)
+    # Shift by column means first so the sums below subtract small numbers.
+    means = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    centred = np.where(valid, values - means, 0.0)
+
+    if valid.all():
+        # Complete data: one product gives every centred cross sum.
+        sxy = centred.T @ centred
+        counts = np.full((n_assets, n_assets), len(values), dtype=np.int64)
+        var = np.diag(sxy).copy()
+        var_i, var_j = var[:, None], var[None, :]
+    else:
+        # Pairwise-complete: restrict every sum to rows where both assets exist.
+        mask = valid.astype(np.float64)
+        counts = np.rint(mask.T @ mask).astype(np.int64)
+        sx = centred.T @ mask  # sx[i, j]: sum of x_i over rows shared with j
+        sxx = (centred * centred).T @ mask
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sxy = centred.T @ centred - sx * sx.T / counts
+            var_i = sxx - sx * sx / counts
+        var_j = var_i.T
+    correlation, covariance = _finish(sxy, var_i, var_j, counts, min_periods)
+    return CorrelationMatrix(names, correlation, covariance, counts)
+
+
+def correlation_matrix_from_frame(
+    df: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    min_periods: int = 2,
+) -> CorrelationMatrix:
+    """Compute :func:`correlation_matrix` over DataFrame columns.
+
+    Args:
+        df: Aligned frame, one column per asset.
+        columns: Asset columns (defaults to every numeric column).
+        min_periods: Minimum overlapping rows per pair.
+    """
+    if columns is None:
+        columns = [name for name in df.columns if pd.api.types.is_numeric_dtype(df[name])]
+    return correlation_matrix(df[list(columns)].to_numpy(dtype=np.float64), names=columns, min_periods=min_periods)
+
+
+def iter_rolling_correlation_matrices(
+    values,
+    window: int,
+    step: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield rolling correlation matrices in batches.
+
+    Entry ``t`` covers rows ``t - window + 1 .. t`` (the alignment of
+    ``DataFrame.rolling(window).corr()``). An asset with a missing value or
+    zero variance inside a window has NaN correlations for that window.
+
+    Args:
+        values: ``(T, N)`` array.
+        window: Window length in rows (at least 2).
+        step: Only report every ``step``-th window end.
+        chunk_size: Windows per batch; peak memory is about
+            ``chunk_size * N * (N + window) * 8`` bytes.
+
+    Yields:
+        tuple: ``(ends, matrices)`` with ``ends`` the row index of each
+        window's last row and ``matrices`` shaped ``(len(ends), N, N)``.
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    if step < 1 or chunk_size < 1:
+        raise ValueError("step and chunk_size must be positive")
+    values = _as_matrix(values)
+    n_rows, n_assets = values.shape
+    if n_rows < window:
+        return
+
+    invalid = ~np.isfinite(values)
+    filled = np.where(invalid, 0.0, values)
+    bad_counts = np.concatenate([np.zeros((1, n_assets), dtype=np.int64), np.cumsum(invalid, axis=0)])
+    windows = sliding_window_view(filled, window, axis=0)  # (T - w + 1, N, w), no copy
+    diagonal = np.arange(n_assets)
+
+    all_ends = np.arange(window - 1, n_rows, step)
+    for offset in range(0, len(all_ends), chunk_size):
+        ends = all_ends[offset : offset + chunk_size]
+        starts = ends - window + 1
+        block = windows[starts]
+        block = block - block.mean(axis=2, keepdims=True)
+        cross = np.matmul(block, block.transpose(0, 2, 1))  # batched BLAS
+        var = cross[:, diagonal, diagonal]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.sqrt(var)
+            matrices = np.clip(cross / (scale[:, :, None] * scale[:, None, :]), -1.0, 1.0)
+        unusable = ((bad_counts[ends + 1] - bad_counts[starts]) > 0) | (var <= 0)
+        matrices[unusable[:, :, None] | unusable[:, None, :]] = np.nan
+        matrices[:, diagonal, diagonal] = np.where(unusable, np.nan, 1.0)
+        yield ends, matrices
+
+
+def rolling_correlation_matrices(
+    values,
+    window: int,
+    step: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return every rolling correlation matrix as one ``(K, N, N)`` array.
+
+    See :func:`iter_rolling_correlation_matrices` for the arguments; use the
+    iterator instead when ``K * N * N`` values do not fit in memory.
+
+    Returns:
+        tuple: ``(ends, matrices)``.
+    """
+    values = _as_matrix(values)
+    batches = list(iter_rolling_correlation_matrices(values, window, step=step, chunk_size=chunk_size))
+    if not batches:
+        n_assets = values.shape[1]
+        return np.empty(0, dtype=np.int64), np.empty((0, n_assets, n_assets))
+    ends, matrices = zip(*batches)
+    return np.concatenate(ends), np.concatenate(matrices)
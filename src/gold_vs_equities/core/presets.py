@@ -0,0 +1,61 @@
+"""Named date ranges and rolling windows shared by the app and batch reports."""
+
+from datetime import date
+from typing import Tuple
+
+PRESET_RANGES = (
+    "Last 1 Year",
+    "Last 5 Years",
+    "Last 10 Years",
+    "Last 20 Years",
+    "Since 2000",
+    "Since 1980",
+    "Since 1971 (All Data)",
+)
+
+# Extra presets offered when the monthly gold history before 1971 is shown
+HISTORY_PRESET_RANGES = (
+    "Since 1900 (Gold Only)",
+    "Since 1833 (Gold Only)",
+)
+
+# Selectable rolling correlation windows, in months
+ROLLING_WINDOW_MONTHS = (3, 6, 12, 24, 36)
+
+_YEARS_BACK = {"Last 1 Year": 1, "Last 5 Years": 5, "Last 10 Years": 10, "Last 20 Years": 20}
+_SINCE = {
+    "Since 2000": date(2000, 1, 1),
+    "Since 1980": date(1980, 1, 1),
+    "Since 1971 (All Data)": date(1971, 1, 1),
+    "Since 1900 (Gold Only)": date(1900, 1, 1),
+    "Since 1833 (Gold Only)": date(1833, 1, 1),
+}
+
+
+def _years_before(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # 29 February in a non-leap target year
+        return day.replace(year=day.year - years, day=28)
+
+
+def preset_range(name: str, min_date: date, max_date: date) -> Tuple[date, date]:
+    """Return the ``(start, end)`` dates of a preset, clipped to the data.
+
+    Args:
+        name: One of :data:`PRESET_RANGES` or :data:`HISTORY_PRESET_RANGES`
+            (anything else, e.g. ``"Custom"``, selects the full range).
+        min_date: First date in the dataset.
+        max_date: Last date in the dataset.
+
+    Returns:
+        tuple: Inclusive ``(start, end)`` dates.
+    """
+    if name in _YEARS_BACK:
+        years = _YEARS_BACK[name]
+        start = _years_before(max_date, years) if max_date.year - years >= min_date.year else min_date
+    elif name in _SINCE:
+        start = _SINCE[name] if _SINCE[name] >= min_date else min_date
+    else:
+        start = min_date
+    return start, max_date
@@ -0,0 +1,258 @@
+"""Recession regimes: an interval index and per-regime return statistics.
+
+:class:`RegimeIndex` holds a list of dated events (the NBER recessions by
+default, or any user-supplied list) as sorted ``datetime64`` arrays. Which
+rows of a date axis fall inside an event, which events overlap a chart's
+range and where each event starts and stops on the axis are all answered
+with ``searchsorted``, so the dashboard's shading, the downsampler's
+protected extremes and the statistics share one lookup structure.
+
+:func:`regime_table` computes, for every event, the return, annualized
+volatility and maximum drawdown of each series plus the correlation of
+their returns:
+
+* ``during`` the event,
+* in the ``months`` ``before`` it started and ``after`` it ended,
+* and once for all ``expansion`` rows (outside every event) combined.
+
+A period's return at row ``t`` (from close ``t - 1`` to close ``t``) belongs
+to the regime of row ``t``. Sums of log returns, their squares and cross
+products come from prefix sums (two lookups per segment), and drawdowns for
+every segment come from a single running maximum over the concatenated
+segments, so the whole table is one vectorized pass over the data.
+"""
+
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# NBER US recessions since 1971: (start, end, label)
+NBER_RECESSIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("1973-11-01", "1975-03-31", "1973-75 Oil Crisis Recession"),
+    ("1980-01-01", "1980-07-31", "1980 Recession"),
+    ("1981-07-01", "1982-11-30", "1981-82 Early 1980s Recession"),
+    ("1990-07-01", "1991-03-31", "1990-91 Gulf War Recession"),
+    ("2001-03-01", "2001-11-30", "2001 Dot-com Recession"),
+    ("2007-12-01", "2009-06-30", "2007-09 Great Recession"),
+    ("2020-02-01", "2020-04-30", "2020 COVID-19 Recession"),
+)
+PHASES = ("before", "during", "after")
+EXPANSION = "expansion"
+DEFAULT_MONTHS_AROUND = 6
+
+
+class RegimeIndex:
+    """Sorted, searchable list of dated events.
+
+    Args:
+        events: ``(start, end)`` or ``(start, end, label)`` tuples with
+            inclusive dates (anything ``np.datetime64`` accepts).
+
+    Raises:
+        ValueError: If an event ends before it starts.
+    """
+
+    def __init__(self, events: Iterable[Sequence] = NBER_RECESSIONS):
+        events = sorted((tuple(event) for event in events), key=lambda event: np.datetime64(event[0], "D"))
+        self.starts = np.array([np.datetime64(event[0], "D") for event in events], dtype="datetime64[D]")
+        self.ends = np.array([np.datetime64(event[1], "D") for event in events], dtype="datetime64[D]")
+        if (self.ends < self.starts).any():
+            raise ValueError("every event must end on or after its start")
+        self.labels: Tuple[str, ...] = tuple(
+            str(event[2]) if len(event) > 2 and event[2] else f"{start} to {end}"
+            for event, start, end in zip(events, self.starts, self.ends)
+        )
+        # Latest end among events starting at or before each event (overlapping events allowed).
+        self._reach = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    @classmethod
+    def from_text(cls, text: str) -> "RegimeIndex":
+        """Parse one ``start, end[, label]`` event per line (``#`` starts a comment).
+
+        Raises:
+            ValueError: For a line that does not hold two valid dates.
+        """
+        events = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = [part.strip() for part in line.split(",", 2)]
+            if len(parts) < 2:
+                raise ValueError(f"Line {number}: expected 'start, end[, label]'")
+            try:
+                np.datetime64(parts[0], "D"), np.datetime64(parts[1], "D")
+            except ValueError as exc:
+                raise ValueError(f"Line {number}: {exc}") from None
+            events.append(tuple(parts))
+        return cls(events)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def events(self) -> List[Tuple[str, str, str]]:
+        """Return the events as ``(start, end, label)`` strings (hashable, for cache keys)."""
+        return [(str(s), str(e), label) for s, e, label in zip(self.starts, self.ends, self.labels)]
+
+    def bounds(self, dates) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``[lo, hi)`` rows of every event on a sorted date axis."""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        return np.searchsorted(dates, self.starts, side="left"), np.searchsorted(dates, self.ends, side="right")
+
+    def mask(self, dates) -> np.ndarray:
+        """Return True for every date inside at least one event."""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if not len(self):
+            return np.zeros(len(dates), dtype=bool)
+        k = np.searchsorted(self.starts, dates, side="right") - 1
+        return (k >= 0) & (dates <= self._reach[np.maximum(k, 0)])
+
+    def overlapping(self, start, end) -> np.ndarray:
+        """Return the positions of events overlapping ``start .. end`` (inclusive)."""
+        start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+        i = int(np.searchsorted(self._reach, start, side="left"))
+        j = int(np.searchsorted(self.starts, end, side="right"))
+        candidates = np.arange(i, max(i, j))
+        return candidates[self.ends[candidates] >= start]
+
+    def periods(self, start=None, end=None) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return ``(start, end)`` timestamps of the events overlapping the range (all if open)."""
+        rows = np.arange(len(self)) if start is None and end is None else self.overlapping(start, end)
+        return [(pd.Timestamp(self.starts[k]), pd.Timestamp(self.ends[k])) for k in rows]
+
+
+def _months_before(days: np.ndarray, months: int) -> np.ndarray:
+    """First day of the month ``months`` calendar months before each day."""
+    return (days.astype("datetime64[M]") - months).astype("datetime64[D]")
+
+
+def _months_after(days: np.ndarray, months: int) -> np.ndarray:
+    """Last day of the month ``months`` calendar months after each day."""
+    return (days.astype("datetime64[M]") + months + 1).astype("datetime64[D]") - 1
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``[lo, hi)`` bounds of each run of True values."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _segment_drawdowns(log_prices: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Largest drop from a running peak (as a fraction) of each segment ``[lo, hi)``.
+
+    Segments are laid end to end and lifted by a constant per segment larger
+    than the whole price range, so one running maximum never carries a peak
+    from one segment into the next.
+    """
+    lengths = hi - lo
+    result = np.full((log_prices.shape[0], len(lo)), np.nan)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return result
+    lo, lengths = lo[nonempty], lengths[nonempty]
+    offsets = np.cumsum(lengths) - lengths
+    rows = np.arange(lengths.sum()) - np.repeat(offsets, lengths) + np.repeat(lo, lengths)
+    lift = np.repeat(np.arange(len(lo)) * (np.ptp(log_prices) + 1.0), lengths)
+    values = log_prices[:, rows] + lift
+    drawdown = values - np.maximum.accumulate(values, axis=1)
+    result[:, nonempty] = np.expm1(np.minimum.reduceat(drawdown, offsets, axis=1))
+    return result
+
+
+def regime_table(
+    dates,
+    series: Mapping[str, np.ndarray],
+    regimes: Optional[RegimeIndex] = None,
+    months: int = DEFAULT_MONTHS_AROUND,
+    periods_per_year: float = 12,
+) -> pd.DataFrame:
+    """Compute return statistics in, around and between the events of ``regimes``.
+
+    Args:
+        dates: Sorted dates shared by the series.
+        series: Name -> positive prices (e.g. ``{"gold": ..., "sp500": ...}``).
+            The correlation is computed between the first two series.
+        regimes: Events to analyse (defaults to :data:`NBER_RECESSIONS`).
+        months: Length of the ``before`` and ``after`` windows in whole
+            calendar months (on monthly data, ``months`` rows each).
+        periods_per_year: Rows per year, used to annualize volatility.
+
+    Returns:
+        pd.DataFrame: One row per event and phase, plus one ``expansion``
+        row, with ``event``, ``phase``, ``start``, ``end`` (first and last
+        dates of the segment), ``periods`` (returns in the segment), then
+        ``<name>_return``, ``<name>_volatility`` and ``<name>_max_drawdown``
+        per series, and ``correlation``.
+    """
+    regimes = RegimeIndex() if regimes is None else regimes
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    names = list(series)
+    log_prices = np.log(np.stack([np.asarray(series[name], dtype=np.float64) for name in names]))
+    n = len(dates)
+
+    # Prefix sums of log returns, squares and the cross product; returns[t] ends at row t.
+    returns = np.zeros_like(log_prices)
+    returns[:, 1:] = np.diff(log_prices, axis=1)
+    cross = returns[0] * returns[1] if len(names) > 1 else np.zeros(n)
+    prefix = np.zeros((2 * len(names) + 1, n + 1))
+    np.cumsum(np.vstack([returns, returns * returns, cross]), axis=1, out=prefix[:, 1:])
+
+    # Row bounds of every (event, phase) segment, then the expansion runs.
+    lo, hi = regimes.bounds(dates)
+    before_lo = np.searchsorted(dates, _months_before(regimes.starts, months), side="left")
+    after_hi = np.searchsorted(dates, _months_after(regimes.ends, months), side="right")
+    seg_lo = np.stack([before_lo, lo, hi], axis=1).ravel()
+    seg_hi = np.stack([lo, hi, after_hi], axis=1).ravel()
+    expansion = ~regimes.mask(dates)
+    run_lo, run_hi = _runs(expansion)
+
+    # Returns of a segment start at row max(lo, 1); its entry close is the row before.
+    first = np.maximum(seg_lo, 1)
+    count = np.maximum(seg_hi - first, 0)
+    sums = np.where(count > 0, prefix[:, np.maximum(seg_hi, first)] - prefix[:, first], 0.0)
+    pooled = expansion.copy()
+    pooled[:1] = False
+    sums = np.column_stack([sums, np.vstack([returns, returns * returns, cross])[:, pooled].sum(axis=1)])
+    count = np.append(count, np.count_nonzero(pooled))
+
+    k = len(names)
+    s1, s2, sx = sums[:k], sums[k : 2 * k], sums[2 * k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centred = s2 - s1 * s1 / count
+        volatility = np.sqrt(centred / (count - 1) * periods_per_year)
+        correlation = (sx - s1[0] * s1[min(1, k - 1)] / count) / np.sqrt(centred[0] * centred[min(1, k - 1)])
+    total_return = np.where(count > 0, np.expm1(s1), np.nan)
+    volatility[:, count < 2] = np.nan
+    correlation = np.clip(np.where(count >= 3, correlation, np.nan), -1.0, 1.0) if k > 1 else np.full(len(count), np.nan)
+
+    # Drawdowns include each segment's entry close; expansions combine to their worst run.
+    entry = np.maximum(np.append(seg_lo, run_lo) - 1, 0)
+    drawdowns = _segment_drawdowns(log_prices, entry, np.append(seg_hi, run_hi))
+    segment_drawdowns = drawdowns[:, : len(seg_lo)]
+    run_drawdowns = drawdowns[:, len(seg_lo) :]
+    expansion_drawdown = np.fmin.reduce(run_drawdowns, axis=1) if len(run_lo) else np.full(k, np.nan)
+    drawdown = np.column_stack([segment_drawdowns, expansion_drawdown])
+
+    # First and last dates shown for each segment (NaT when it has no rows).
+    expansion_rows = np.flatnonzero(expansion)
+    first_row = np.append(seg_lo, expansion_rows[0] if len(expansion_rows) else 0)
+    last_row = np.append(seg_hi - 1, expansion_rows[-1] if len(expansion_rows) else -1)
+    has_rows = last_row >= first_row
+    start = np.full(len(first_row), np.datetime64("NaT"), dtype="datetime64[ns]")
+    end = start.copy()
+    start[has_rows] = dates[first_row[has_rows]]
+    end[has_rows] = dates[last_row[has_rows]]
+    table = {
+        "event": [*(label for label in regimes.labels for _ in PHASES), EXPANSION],
+        "phase": [*PHASES * len(regimes), EXPANSION],
+        "start": start,
+        "end": end,
+        "periods": count,
+    }
+    for row, name in enumerate(names):
+        table[f"{name}_return"] = total_return[row]
+        table[f"{name}_volatility"] = volatility[row]
+        table[f"{name}_max_drawdown"] = drawdown[row]
+    table["correlation"] = correlation
+    return pd.DataFrame(table)
@@ -0,0 +1,253 @@
+"""Return-space metrics for any row range of a set of price series.
+
+:class:`ReturnKernel` turns each price series into log returns once, and
+keeps prefix sums of the returns, their squares and their downside squares
+(below the risk-free rate). For a range of rows the period return, CAGR,
+annualized volatility, Sharpe and Sortino ratios then cost a few lookups;
+the maximum drawdown and its peak, trough and recovery dates come from one
+running-maximum scan over the range. Results are memoized per
+``(asset, start, stop)``, so build one kernel per data frequency and
+repeated reruns over the same range cost a dictionary lookup.
+
+A range of rows ``[i, j)`` covers the returns from close ``i`` to close
+``j - 1``, so its total return equals the percentage change between its
+first and last prices.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365.25
+DEFAULT_MEMO_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class ReturnMetrics:
+    """Return statistics of one asset over one range.
+
+    Ratios and returns are fractions (``0.05`` is 5%); NaN when the range
+    has too few returns. Dates are None when undefined.
+
+    Attributes:
+        asset: Series name.
+        periods: Number of returns in the range.
+        total_return: Price change from the first to the last row.
+        cagr: Compound annual growth rate over the calendar span.
+        mean_return: Geometric mean return per period.
+        best_return: Largest single-period return.
+        worst_return: Smallest single-period return.
+        volatility: Annualized standard deviation of log returns.
+        sharpe: Annualized mean excess log return over volatility.
+        sortino: Annualized mean excess log return over downside deviation.
+        max_drawdown: Largest fall from a running peak (negative or 0).
+        peak_date: Date of the peak before the largest fall.
+        trough_date: Date of the lowest point of the largest fall.
+        recovery_date: First date back at the peak price (None if it never was).
+    """
+
+    asset: str
+    periods: int
+    total_return: float
+    cagr: float
+    mean_return: float
+    best_return: float
+    worst_return: float
+    volatility: float
+    sharpe: float
+    sortino: float
+    max_drawdown: float
+    peak_date: Optional[pd.Timestamp]
+    trough_date: Optional[pd.Timestamp]
+    recovery_date: Optional[pd.Timestamp]
+
+
+def log_returns(prices) -> np.ndarray:
+    """Log returns of a price series; entry ``t`` is the return into row ``t`` (entry 0 is 0)."""
+    log_prices = np.log(np.asarray(prices, dtype=np.float64))
+    returns = np.zeros_like(log_prices)
+    returns[1:] = np.diff(log_prices)
+    return returns
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(values) + 1)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+class ReturnKernel:
+    """Memoized return metrics over row ranges of date-aligned price series.
+
+    Args:
+        dates: Sorted dates shared by the series.
+        prices: Name -> positive prices (no NaN) of the same length.
+        periods_per_year: Rows per year, used to annualize.
+        risk_free: Annual risk-free rate for Sharpe and Sortino.
+        memo_size: Most results kept (least recently used are dropped).
+
+    Raises:
+        ValueError: If a series has the wrong length or non-positive or
+            missing prices.
+    """
+
+    def __init__(
+        self,
+        dates,
+        prices: Mapping[str, np.ndarray],
+        periods_per_year: float,
+        risk_free: float = 0.0,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+    ):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.periods_per_year = float(periods_per_year)
+        self.risk_free = float(risk_free)
+        # Per-period log risk-free rate.
+        self._rf = np.log1p(self.risk_free) / self.periods_per_year
+        self.prices: Dict[str, np.ndarray] = {}
+        self.returns: Dict[str, np.ndarray] = {}
+        self._sums: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for name, values in prices.items():
+            values = np.asarray(values, dtype=np.float64)
+            if len(values) != len(self.dates):
+                raise ValueError(f"Series {name!r} has {len(values)} rows, expected {len(self.dates)}")
+            if not (values > 0).all():
+                raise ValueError(f"Series {name!r} must hold positive prices without gaps")
+            returns = log_returns(values)
+            downside = np.minimum(returns - self._rf, 0.0)
+            self.prices[name] = _read_only(values)
+            self.returns[name] = _read_only(returns)
+            self._sums[name] = (_prefix(returns), _prefix(returns * returns), _prefix(downside * downside))
+        self._cross: Dict[Tuple[str, str], np.ndarray] = {}
+        self._memo: "OrderedDict[tuple, object]" = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, frame, periods_per_year: float, columns: Optional[Sequence[str]] = None, **kwargs):
+        """Build a kernel from a :class:`~gold_vs_equities.data.sorted_frame.SortedFrame`
+        (or any mapping of columns with a ``dates`` attribute)."""
+        columns = list(frame) if columns is None else columns
+        return cls(frame.dates, {name: frame[name] for name in columns}, periods_per_year, **kwargs)
+
+    @property
+    def assets(self) -> Tuple[str, ...]:
+        """Series names in input order."""
+        return tuple(self.prices)
+
+    def bounds(self, start, end) -> Tuple[int, int]:
+        """Return the rows ``[i, j)`` dated within ``start..end`` inclusive."""
+        i = int(np.searchsorted(self.dates, np.datetime64(start, "D"), side="left"))
+        j = int(np.searchsorted(self.dates, np.datetime64(end, "D"), side="right"))
+        return i, max(i, j)
+
+    def _memoized(self, key: tuple, compute):
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        value = compute()
+        with self._lock:
+            self._memo[key] = value
+            while len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return value
+
+    def metrics(self, asset: str, start: int = 0, stop: Optional[int] = None) -> ReturnMetrics:
+        """Return (memoized) metrics of ``asset`` over rows ``start:stop``."""
+        stop = len(self.dates) if stop is None else stop
+        return self._memoized(("metrics", asset, start, stop), lambda: self._compute(asset, start, stop))
+
+    def _compute(self, asset: str, i: int, j: int) -> ReturnMetrics:
+        nan = float("nan")
+        n = j - i - 1  # returns i+1 .. j-1
+        if n < 1:
+            return ReturnMetrics(asset, max(n, 0), nan, nan, nan, nan, nan, nan, nan, nan, nan, None, None, None)
+        prices, returns = self.prices[asset], self.returns[asset]
+        s1, s2, sd = (float(prefix[j] - prefix[i + 1]) for prefix in self._sums[asset])
+        total = float(np.expm1(s1))
+        days = float((self.dates[j - 1] - self.dates[i]) / np.timedelta64(1, "D"))
+        cagr = float(np.expm1(s1 * DAYS_PER_YEAR / days)) if days > 0 else nan
+        mean = s1 / n
+        window = returns[i + 1 : j]
+
+        volatility = sharpe = sortino = nan
+        if n >= 2:
+            std = np.sqrt(max(s2 - s1 * s1 / n, 0.0) / (n - 1))
+            volatility = float(std * np.sqrt(self.periods_per_year))
+            excess = (mean - self._rf) * self.periods_per_year
+            if std > 0:
+                sharpe = float(excess / volatility)
+            downside = np.sqrt(sd / n) * np.sqrt(self.periods_per_year)
+            if downside > 0:
+                sortino = float(excess / downside)
+
+        # Running-maximum scan for the largest drawdown and its dates.
+        segment = prices[i:j]
+        peaks = np.maximum.accumulate(segment)
+        drawdowns = segment / peaks - 1.0
+        trough = int(np.argmin(drawdowns))
+        max_drawdown = float(drawdowns[trough])
+        peak_date = trough_date = recovery_date = None
+        if max_drawdown < 0:
+            peak = int(np.argmax(segment[: trough + 1]))
+            recovered = np.flatnonzero(segment[trough:] >= segment[peak])
+            peak_date = pd.Timestamp(self.dates[i + peak])
+            trough_date = pd.Timestamp(self.dates[i + trough])
+            if len(recovered):
+                recovery_date = pd.Timestamp(self.dates[i + trough + int(recovered[0])])
+
+        return ReturnMetrics(
+            asset=asset,
+            periods=n,
+            total_return=total,
+            cagr=cagr,
+            mean_return=float(np.expm1(mean)),
+            best_return=float(np.expm1(window.max())),
+            worst_return=float(np.expm1(window.min())),
+            volatility=volatility,
+            sharpe=sharpe,
+            sortino=sortino,
+            max_drawdown=max_drawdown,
+            peak_date=peak_date,
+            trough_date=trough_date,
+            recovery_date=recovery_date,
+        )
+
+    def correlation(self, a: str, b: str, start: int = 0, stop: Optional[int] = None) -> float:
+        """Return the (memoized) Pearson correlation of the log returns of ``a`` and ``b``."""
+        stop = len(self.dates) if stop is None else stop
+        return self._memoized(("correlation", a, b, start, stop), lambda: self._correlation(a, b, start, stop))
+
+    def _correlation(self, a: str, b: str, i: int, j: int) -> float:
+        n = j - i - 1
+        if n < 2:
+            return float("nan")
+        with self._lock:
+            cross = self._cross.get((a, b))
+        if cross is None:
+            cross = _prefix(self.returns[a] * self.returns[b])
+            with self._lock:
+                self._cross[(a, b)] = cross
+        (sa, saa, _), (sb, sbb, _) = self._sums[a], self._sums[b]
+        sum_a, sum_b = sa[j] - sa[i + 1], sb[j] - sb[i + 1]
+        var_a = saa[j] - saa[i + 1] - sum_a * sum_a / n
+        var_b = sbb[j] - sbb[i + 1] - sum_b * sum_b / n
+        cov = cross[j] - cross[i + 1] - sum_a * sum_b / n
+        if var_a <= 0 or var_b <= 0:
+            return float("nan")
+        return float(np.clip(cov / np.sqrt(var_a * var_b), -1.0, 1.0))
+
+    def table(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """Return the metrics of every asset over rows ``start:stop``, one row per asset."""
+        return pd.DataFrame([asdict(self.metrics(asset, start, stop)) for asset in self.assets]).set_index("asset")
@@ -0,0 +1,193 @@
+"""Vectorized rolling Pearson correlation for many window sizes at once.
+
+For each window ``w`` the series are cut into overlapping blocks of ``2w``
+rows (stride ``w``). Each block is centred on its own mean and turned into
+prefix sums, so every window that starts inside the block is answered with
+two lookups per sum. Centring per block keeps the sums small relative to the
+window's own variance; the rare windows where that still is not enough
+(near-constant stretches) are recomputed exactly with a two-pass formula.
+
+Cost is ``O(n)`` per window and ``O(n * k)`` for ``k`` windows, with no
+Python-level loop over rows.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_WINDOWS = (3, 6, 12, 24, 36)
+
+# Windows whose estimated relative rounding error exceeds this are recomputed
+# with the exact two-pass formula.
+RELATIVE_TOLERANCE = 1e-13
+_ERROR_SCALE = 8 * np.finfo(np.float64).eps
+
+
+def _block_sums(values: np.ndarray, w: int, n_windows: int):
+    """Return per-window sums of centred values and squares, plus error bounds.
+
+    Args:
+        values: ``(2, n)`` array holding x and y (invalid entries already zeroed).
+        w: Window length.
+        n_windows: Number of complete windows (``n - w + 1``).
+
+    Returns:
+        tuple: ``(s, s2, sxy, bound)`` where ``s`` and ``s2`` are ``(2, m)``
+        window sums of centred values and squares, ``sxy`` the cross-product
+        sums and ``bound`` the ``(2, m)`` sum of squares over each block,
+        used to bound rounding error.
+    """
+    n_blocks = -(-n_windows // w)
+    padded_len = n_blocks * w + w
+    padded = np.pad(values, ((0, 0), (0, padded_len - values.shape[1])), mode="edge")
+    blocks = sliding_window_view(padded, 2 * w, axis=1)[:, ::w]  # (2, n_blocks, 2w)
+    centred = blocks - blocks.mean(axis=2, keepdims=True)
+
+    def windowed(terms: np.ndarray) -> np.ndarray:
+        prefix = np.zeros(terms.shape[:-1] + (2 * w + 1,))
+        np.cumsum(terms, axis=-1, out=prefix[..., 1:])
+        sums = prefix[..., w : 2 * w] - prefix[..., :w]
+        return sums.reshape(terms.shape[:-2] + (-1,))[..., :n_windows]
+
+    squares = centred * centred
+    s = windowed(centred)
+    s2 = windowed(squares)
+    sxy = windowed(centred[0] * centred[1])
+    bound = np.repeat(squares.sum(axis=2), w, axis=-1)[:, :n_windows]
+    return s, s2, sxy, bound
+
+
+def _exact_correlation(x: np.ndarray, y: np.ndarray, starts: np.ndarray, w: int) -> np.ndarray:
+    """Two-pass correlation for the windows beginning at ``starts``."""
+    idx = starts[:, None] + np.arange(w)
+    cx = x[idx] - x[idx].mean(axis=1, keepdims=True)
+    cy = y[idx] - y[idx].mean(axis=1, keepdims=True)
+    sxx = (cx * cx).sum(axis=1)
+    syy = (cy * cy).sum(axis=1)
+    sxy = (cx * cy).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = sxy / np.sqrt(sxx * syy)
+    r[(sxx == 0) | (syy == 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def rolling_correlation(x, y, window: int) -> np.ndarray:
+    """Rolling Pearson correlation of ``x`` and ``y`` for one window size.
+
+    Matches ``pd.Series(x).rolling(window).corr(pd.Series(y))``: entry ``i``
+    covers rows ``i - window + 1 .. i`` and is NaN when fewer than ``window``
+    rows are available, any row in the window is missing, or either series is
+    constant over the window.
+
+    Args:
+        x: First series.
+        y: Second series.
+        window: Window length in rows (at least 2).
+
+    Returns:
+        np.ndarray: float64 array with the same length as ``x``.
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("x and y must be 1-D arrays of the same length")
+    n = len(x)
+    out = np.full(n, np.nan)
+    n_windows = n - window + 1
+    if n_windows <= 0:
+        return out
+
+    invalid = ~(np.isfinite(x) & np.isfinite(y))
+    if invalid.any():
+        # Fill gaps with a neutral value for the block sums; windows that
+        # touch a gap are masked below.
+        valid = ~invalid
+        x = np.where(invalid, x[valid].mean() if valid.any() else 0.0, x)
+        y = np.where(invalid, y[valid].mean() if valid.any() else 0.0, y)
+
+    s, s2, sxy_raw, bound = _block_sums(np.stack([x, y]), window, n_windows)
+    var = s2 - s * s / window  # (2, m): centred sums of squares
+    var = np.maximum(var, 0.0)
+    sxy = sxy_raw - s[0] * s[1] / window
+
+    err = _ERROR_SCALE * bound
+    err_xy = _ERROR_SCALE * np.sqrt(bound[0] * bound[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = np.sqrt(var[0] * var[1])
+        r = sxy / denom
+        ill_conditioned = (
+            (var[0] * RELATIVE_TOLERANCE <= err[0])
+            | (var[1] * RELATIVE_TOLERANCE <= err[1])
+            | (denom * RELATIVE_TOLERANCE <= err_xy)
+        )
+    starts = np.flatnonzero(ill_conditioned)
+    if len(starts):
+        r[starts] = _exact_correlation(x, y, starts, window)
+    r = np.clip(r, -1.0, 1.0)
+
+    if invalid.any():
+        bad = np.concatenate([[0], np.cumsum(invalid)])
+        r[(bad[window:] - bad[:-window]) > 0] = np.nan
+    out[window - 1 :] = r
+    return out
+
+
+class RollingCorrelationTable:
+    """Rolling correlations for a set of windows, stored as a ``(k, n)`` array.
+
+    Build it once per dataset and look windows up instead of recomputing them.
+    Windows that were not precomputed are calculated for the requested slice
+    on each access and not kept, so the table never grows past its windows.
+
+    Args:
+        x: First series.
+        y: Second series.
+        windows: Window sizes to precompute.
+    """
+
+    def __init__(self, x, y, windows: Iterable[int] = DEFAULT_WINDOWS):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self._rows: Dict[int, np.ndarray] = {}
+        for window in dict.fromkeys(windows):
+            self._rows[window] = rolling_correlation(self.x, self.y, window)
+
+    @classmethod
+    def from_frame(cls, df, x_col: str = "gold", y_col: str = "sp500", windows: Iterable[int] = DEFAULT_WINDOWS):
+        """Build a table from two DataFrame columns."""
+        return cls(df[x_col].to_numpy(), df[y_col].to_numpy(), windows)
+
+    @property
+    def windows(self) -> Sequence[int]:
+        """Precomputed window sizes, in insertion order."""
+        return tuple(self._rows)
+
+    @property
+    def values(self) -> np.ndarray:
+        """The ``(len(windows), n)`` matrix of rolling correlations."""
+        return np.vstack([self._rows[w] for w in self._rows]) if self._rows else np.empty((0, len(self.x)))
+
+    def get(self, window: int, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Return rolling correlations for ``window`` over rows ``start:stop``.
+
+        Only windows that lie entirely inside ``start:stop`` are reported; the
+        first ``window - 1`` entries of the slice are NaN, exactly as if the
+        correlation had been computed on the slice alone.
+
+        Args:
+            window: Window length in rows.
+            start: First row of the slice.
+            stop: End of the slice (exclusive, defaults to the end).
+
+        Returns:
+            np.ndarray: A new float64 array of length ``stop - start``.
+        """
+        row = self._rows.get(window)
+        if row is None:
+            return rolling_correlation(self.x[start:stop], self.y[start:stop], window)
+        result = row[start:stop].copy()
+        result[: window - 1] = np.nan
+        return result
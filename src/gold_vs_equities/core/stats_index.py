@@ -0,0 +1,175 @@
+"""Prefix-sum index for constant-time range correlation and regression.
+
+:class:`PrefixStatsIndex` stores cumulative sums of x, y, x², y² and xy over a
+date-sorted pair of series. The Pearson r, its p-value and the least-squares
+fit for any ``[start, end]`` range then follow from two lookups per sum, so an
+interactive range change costs the same for 658 monthly rows as for tens of
+thousands of daily rows.
+
+Two measures keep the sums accurate:
+
+* both series are shifted by their global means before accumulating, so the
+  range formulas subtract numbers of similar, small magnitude;
+* with ``compensated=True`` every running sum carries an error term obtained
+  from an exact TwoSum of each accumulation step (a vectorized Neumaier
+  summation), so prefix sums are accurate to about one rounding error
+  regardless of length.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+from scipy import special
+
+SUM_NAMES = ("x", "y", "xx", "yy", "xy")
+
+
+@dataclass(frozen=True)
+class RangeStats:
+    """Correlation and regression summary for one date range.
+
+    Attributes:
+        n: Number of observations in the range.
+        r: Pearson correlation coefficient.
+        p_value: Two-sided p-value for r (same as ``scipy.stats.pearsonr``).
+        slope: Least-squares slope of y on x.
+        intercept: Least-squares intercept of y on x.
+        r_squared: Coefficient of determination (``r ** 2``).
+        stderr: Standard error of the slope (same as ``scipy.stats.linregress``).
+    """
+
+    n: int
+    r: float
+    p_value: float
+    slope: float
+    intercept: float
+    r_squared: float
+    stderr: float
+
+
+def _prefix_sums(values: np.ndarray, compensated: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(hi, lo)`` prefix sums with a leading zero.
+
+    ``hi`` is the ordinary running sum. When ``compensated`` is set, ``lo``
+    accumulates the exact rounding error of every step, so ``hi + lo`` is the
+    compensated running sum.
+    """
+    hi = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=hi[1:])
+    lo = np.zeros_like(hi)
+    if compensated and len(values):
+        previous = hi[:-1]
+        total = hi[1:]
+        # TwoSum: previous + values == total + err exactly.
+        b_virtual = total - previous
+        err = (previous - (total - b_virtual)) + (values - b_virtual)
+        np.cumsum(err, out=lo[1:])
+    return hi, lo
+
+
+class PrefixStatsIndex:
+    """Constant-time range statistics over two date-aligned series.
+
+    Args:
+        dates: Sorted dates (``datetime64`` values or anything NumPy can
+            convert to ``datetime64[D]``).
+        x: First series (e.g. gold).
+        y: Second series (e.g. S&P 500).
+        compensated: Accumulate rounding errors alongside the prefix sums.
+
+    Raises:
+        ValueError: If lengths differ or dates are not sorted.
+    """
+
+    def __init__(self, dates, x, y, compensated: bool = True):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if not (len(self.dates) == len(x) == len(y)):
+            raise ValueError("dates, x and y must have the same length")
+        if len(self.dates) > 1 and np.any(self.dates[1:] < self.dates[:-1]):
+            raise ValueError("dates must be sorted in ascending order")
+        self.compensated = compensated
+        self.x_shift = float(x.mean()) if len(x) else 0.0
+        self.y_shift = float(y.mean()) if len(y) else 0.0
+        dx = x - self.x_shift
+        dy = y - self.y_shift
+        terms = {"x": dx, "y": dy, "xx": dx * dx, "yy": dy * dy, "xy": dx * dy}
+        self._sums = {name: _prefix_sums(terms[name], compensated) for name in SUM_NAMES}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def from_frame(cls, df, x_col: str = "gold", y_col: str = "sp500", date_col: str = "date", **kwargs):
+        """Build an index from a DataFrame sorted by ``date_col``."""
+        return cls(df[date_col].to_numpy(), df[x_col].to_numpy(), df[y_col].to_numpy(), **kwargs)
+
+    def bounds(self, start, end) -> Tuple[int, int]:
+        """Return the positional slice ``[i, j)`` covering ``start..end`` inclusive."""
+        start = np.datetime64(start, "D")
+        end = np.datetime64(end, "D")
+        i = int(np.searchsorted(self.dates, start, side="left"))
+        j = int(np.searchsorted(self.dates, end, side="right"))
+        return i, max(i, j)
+
+    def cumulative_sums(self) -> Dict[str, np.ndarray]:
+        """Return the prefix sums of x, y, xx, yy and xy (leading zero included).
+
+        Sums are of the mean-shifted series (see ``x_shift`` / ``y_shift``)
+        with the compensation term folded in, so ``sums[name][j] -
+        sums[name][i]`` gives the range sum used by :meth:`query_positions`.
+        """
+        return {name: hi + lo for name, (hi, lo) in self._sums.items()}
+
+    def _range_sum(self, name: str, i: int, j: int) -> float:
+        hi, lo = self._sums[name]
+        return float((hi[j] - hi[i]) + (lo[j] - lo[i]))
+
+    def query_positions(self, i: int, j: int) -> RangeStats:
+        """Return statistics for rows ``i`` (inclusive) to ``j`` (exclusive)."""
+        n = j - i
+        if n < 2:
+            nan = float("nan")
+            return RangeStats(n, nan, nan, nan, nan, nan, nan)
+        sx, sy = self._range_sum("x", i, j), self._range_sum("y", i, j)
+        sxx = max(self._range_sum("xx", i, j) - sx * sx / n, 0.0)
+        syy = max(self._range_sum("yy", i, j) - sy * sy / n, 0.0)
+        sxy = self._range_sum("xy", i, j) - sx * sy / n
+        x_mean = self.x_shift + sx / n
+        y_mean = self.y_shift + sy / n
+
+        if sxx == 0.0 or syy == 0.0:
+            r = float("nan")
+        else:
+            r = float(np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0))
+        slope = sxy / sxx if sxx else float("nan")
+        intercept = y_mean - slope * x_mean
+
+        df = n - 2
+        if np.isnan(r):
+            p_value = stderr = float("nan")
+        elif df == 0:
+            # Two points always fit perfectly (scipy reports p = 1).
+            p_value, stderr = 1.0, 0.0
+        elif abs(r) == 1.0:
+            p_value, stderr = 0.0, 0.0
+        else:
+            t = r * np.sqrt(df / (1.0 - r * r))
+            p_value = float(2.0 * special.stdtr(df, -abs(t)))
+            stderr = float(np.sqrt((1.0 - r * r) * syy / sxx / df))
+        return RangeStats(n, r, p_value, slope, intercept, r * r, stderr)
+
+    def query(self, start, end) -> RangeStats:
+        """Return statistics for all rows dated within ``start..end`` inclusive.
+
+        Args:
+            start: First date of the range (inclusive).
+            end: Last date of the range (inclusive).
+
+        Returns:
+            RangeStats: Correlation and regression summary.
+        """
+        return self.query_positions(*self.bounds(start, end))
+
@@ -0,0 +1,228 @@
+"""Calendar alignment of many price series on integer epoch-day keys.
+
+Markets trade on different calendars, so joining their histories needs a
+policy for days where only some of them have a close:
+
+* ``inner`` — keep only days on which every series has a close;
+* ``outer`` — keep every day any series traded; a series without a close
+  that day carries its last close forward for up to ``tolerance`` days and
+  is NaN beyond that (``tolerance=0`` leaves every gap as NaN);
+* ``asof`` — keep the days of one reference series; every other series
+  contributes its last close at or before that day, at most ``tolerance``
+  days old (like :func:`pandas.merge_asof` with ``direction="backward"``).
+
+All series are merged at once: the day keys are combined into one sorted
+axis, and each series is placed on it with a single ``searchsorted``. The
+result is one ``T x N`` float64 matrix whose columns are contiguous, so
+:func:`write_aligned` streams it to the columnar store without building a
+DataFrame per series. Every alignment also reports, per series, how many
+closes were matched, filled, missing or dropped and the longest gap between
+its own observations.
+"""
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.data.columnar import DATE_COLUMN, from_epoch_days, write_columnar
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+
+POLICIES = ("inner", "outer", "asof")
+DEFAULT_POLICY = "inner"
+# Carry a close across a weekend plus a holiday, but not across longer outages.
+DEFAULT_TOLERANCE_DAYS = 4
+
+SeriesInput = Union[PriceColumns, Tuple[np.ndarray, np.ndarray]]
+
+
+@dataclass(frozen=True)
+class SeriesGaps:
+    """How one series fared in an alignment.
+
+    Attributes:
+        observations: Valid (non-NaN) closes in the input.
+        matched: Output rows filled with a close from the same day.
+        filled: Output rows filled with an earlier close (forward fill / as-of).
+        missing: Output rows left NaN.
+        dropped: Input closes whose day is not on the output axis.
+        first_day: Epoch day of the first close (None if empty).
+        last_day: Epoch day of the last close (None if empty).
+        longest_gap_days: Largest distance in days between consecutive closes.
+        longest_gap_start: Epoch day of the close before the longest gap.
+    """
+
+    observations: int
+    matched: int
+    filled: int
+    missing: int
+    dropped: int
+    first_day: Optional[int]
+    last_day: Optional[int]
+    longest_gap_days: int
+    longest_gap_start: Optional[int]
+
+
+@dataclass(frozen=True)
+class AlignedMatrix:
+    """A date axis shared by ``N`` series.
+
+    Attributes:
+        days: ``(T,)`` int32 epoch days, strictly increasing.
+        names: Series names in column order.
+        values: ``(T, N)`` float64 matrix (Fortran order, so each column is
+            contiguous); NaN marks a missing close.
+        gaps: Per-series :class:`SeriesGaps`.
+        policy: Policy the matrix was built with.
+        tolerance: Fill tolerance in days.
+    """
+
+    days: np.ndarray
+    names: Tuple[str, ...]
+    values: np.ndarray
+    gaps: Dict[str, SeriesGaps]
+    policy: str
+    tolerance: int
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """The axis as ``datetime64[D]``."""
+        return from_epoch_days(self.days)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return one series as a view of the matrix."""
+        return self.values[:, self.names.index(name)]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return ``date`` plus one column per series (column data is not copied)."""
+        data = {DATE_COLUMN: self.dates.astype("datetime64[ns]")}
+        data.update((name, self.values[:, k]) for k, name in enumerate(self.names))
+        return pd.DataFrame(data, copy=False)
+
+    def gap_report(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """Return :attr:`gaps` as plain dictionaries (JSON-serializable)."""
+        return {name: asdict(gaps) for name, gaps in self.gaps.items()}
+
+
+def _day_values(series: SeriesInput) -> Tuple[np.ndarray, np.ndarray]:
+    """Return sorted, de-duplicated epoch days and closes with NaNs removed.
+
+    When a day appears more than once the last close of that day wins.
+    """
+    if isinstance(series, PriceColumns):
+        days, values = series.epoch_days(), series.closes
+    else:
+        days, values = series
+    days = np.asarray(days, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(days) != len(values):
+        raise ValueError("days and values must have the same length")
+    valid = ~np.isnan(values)
+    days, values = days[valid], values[valid]
+    if len(days) > 1 and (np.diff(days) <= 0).any():
+        order = np.argsort(days, kind="stable")
+        days, values = days[order], values[order]
+        last_of_day = np.append(days[1:] != days[:-1], True)
+        days, values = days[last_of_day], values[last_of_day]
+    return days, values
+
+
+def _longest_gap(days: np.ndarray) -> Tuple[int, Optional[int]]:
+    if len(days) < 2:
+        return 0, None
+    spacing = np.diff(days)
+    k = int(np.argmax(spacing))
+    return int(spacing[k]), int(days[k])
+
+
+def align_series(
+    series: Mapping[str, SeriesInput],
+    policy: str = DEFAULT_POLICY,
+    tolerance: int = DEFAULT_TOLERANCE_DAYS,
+    reference: Optional[str] = None,
+) -> AlignedMatrix:
+    """Align several price series on a common epoch-day axis.
+
+    Args:
+        series: Name -> :class:`PriceColumns` or ``(epoch_days, values)``.
+        policy: ``"inner"``, ``"outer"`` or ``"asof"`` (see the module docs).
+        tolerance: For ``outer`` and ``asof``, the oldest close (in days) that
+            may be carried forward; ``0`` disables filling. Ignored by ``inner``.
+        reference: Series whose days form the axis for ``asof`` (defaults to
+            the first series).
+
+    Returns:
+        AlignedMatrix: The aligned matrix and per-series gap report.
+
+    Raises:
+        ValueError: For an unknown policy, a negative tolerance, an unknown
+            reference or no input series.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown alignment policy {policy!r}; expected one of {', '.join(POLICIES)}")
+    if tolerance < 0:
+        raise ValueError("tolerance must be non-negative")
+    if not series:
+        raise ValueError("at least one series is required")
+    names = tuple(series)
+    inputs = [_day_values(series[name]) for name in names]
+
+    if policy == "asof":
+        reference = names[0] if reference is None else reference
+        if reference not in series:
+            raise ValueError(f"Unknown reference series {reference!r}")
+        axis = inputs[names.index(reference)][0]
+    else:
+        keys = np.concatenate([days for days, _ in inputs])
+        axis, counts = np.unique(keys, return_counts=True)
+        if policy == "inner":
+            # Days are unique within a series, so a day every series has appears N times.
+            axis = axis[counts == len(inputs)]
+            tolerance = 0
+
+    values = np.full((len(axis), len(names)), np.nan, order="F")
+    gaps = {}
+    for k, (name, (days, closes)) in enumerate(zip(names, inputs)):
+        if len(days):
+            # Last close at or before each axis day, and how old it is.
+            source = np.searchsorted(days, axis, side="right") - 1
+            has_source = source >= 0
+            age = np.where(has_source, axis - days[np.maximum(source, 0)], -1)
+            usable = has_source & (age <= tolerance)
+            values[usable, k] = closes[source[usable]]
+            matched = int(np.count_nonzero(usable & (age == 0)))
+            filled = int(np.count_nonzero(usable & (age > 0)))
+            on_axis = np.count_nonzero(np.isin(days, axis, assume_unique=True))
+        else:
+            usable = np.zeros(len(axis), dtype=bool)
+            matched = filled = on_axis = 0
+        longest, longest_start = _longest_gap(days)
+        gaps[name] = SeriesGaps(
+            observations=len(days),
+            matched=matched,
+            filled=filled,
+            missing=int(len(axis) - np.count_nonzero(usable)),
+            dropped=int(len(days) - on_axis),
+            first_day=int(days[0]) if len(days) else None,
+            last_day=int(days[-1]) if len(days) else None,
+            longest_gap_days=longest,
+            longest_gap_start=longest_start,
+        )
+    return AlignedMatrix(axis.astype(np.int32), names, values, gaps, policy, tolerance)
+
+
+def write_aligned(path: Union[str, Path], aligned: AlignedMatrix) -> Path:
+    """Write the aligned matrix to a columnar file, one column per series.
+
+    The policy, tolerance and gap report are stored in the file metadata.
+    Columns are written straight from the matrix (they are contiguous, so
+    nothing is copied).
+    """
+    metadata = {"alignment": {"policy": aligned.policy, "tolerance": aligned.tolerance, "gaps": aligned.gap_report()}}
+    columns = {name: aligned.values[:, k] for k, name in enumerate(aligned.names)}
+    return write_columnar(path, aligned.dates, columns, metadata=metadata)
@@ -0,0 +1,217 @@
+"""Compact binary columnar format for the aligned dataset.
+
+The file holds an ``int32`` column of epoch days (days since 1970-01-01)
+followed by one ``float64`` column per series. Layout::
+
+    b"GVEQCOL1" | uint32 header length | JSON header | padding | columns...
+
+Every column starts on a 64-byte boundary so readers can memory-map the file
+and view each column in place without copying or parsing anything.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"GVEQCOL1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+DATE_COLUMN = "date"
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def to_epoch_days(dates) -> np.ndarray:
+    """Convert dates (strings, datetime64 or Timestamps) to int32 epoch days."""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64).astype(np.int32)
+
+
+def from_epoch_days(days: np.ndarray) -> np.ndarray:
+    """Convert int32 epoch days back to ``datetime64[D]``."""
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]")
+
+
+class ColumnarDataset(Mapping[str, np.ndarray]):
+    """Read-only, memory-mapped view over a columnar dataset file.
+
+    Behaves like a mapping of column name to NumPy array. The arrays are views
+    into the mapped file, so opening a dataset costs one ``mmap`` call no
+    matter how many rows it holds.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if bytes(raw[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a columnar dataset file")
+        (header_len,) = struct.unpack_from("<I", raw, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(bytes(raw[header_start : header_start + header_len]))
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version: {self.header.get('version')!r}")
+        self.rows: int = self.header["rows"]
+        self._columns: Dict[str, np.ndarray] = {}
+        for spec in self.header["columns"]:
+            dtype = np.dtype(spec["dtype"])
+            end = spec["offset"] + self.rows * dtype.itemsize
+            self._columns[spec["name"]] = raw[spec["offset"] : end].view(dtype)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Free-form metadata stored in the header by the writer."""
+        return self.header.get("metadata", {})
+
+    @property
+    def value_columns(self) -> list:
+        """Names of the non-date columns, in file order."""
+        return [name for name in self._columns if name != DATE_COLUMN]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return a DataFrame with a ``datetime64`` date column.
+
+        Value columns wrap the mapped arrays without copying; only the date
+        column is materialized.
+        """
+        data = {DATE_COLUMN: from_epoch_days(self[DATE_COLUMN]).astype("datetime64[ns]")}
+        data.update((name, self[name]) for name in self.value_columns)
+        return pd.DataFrame(data, copy=False)
+
+
+def write_columnar(
+    path: Union[str, Path],
+    dates,
+    columns: Mapping[str, np.ndarray],
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> Path:
+    """Atomically write a columnar dataset file.
+
+    Args:
+        path: Destination file.
+        dates: Row dates, anything :func:`to_epoch_days` accepts.
+        columns: Mapping of column name to values (stored as float64).
+        metadata: Optional JSON-serializable mapping stored in the header.
+
+    Returns:
+        Path: The written file.
+    """
+    path = Path(path)
+    arrays = {DATE_COLUMN: to_epoch_days(dates)}
+    arrays.update((name, np.ascontiguousarray(values, dtype=np.float64)) for name, values in columns.items())
+    rows = len(arrays[DATE_COLUMN])
+    for name, values in arrays.items():
+        if len(values) != rows:
+            raise ValueError(f"Column {name!r} has {len(values)} rows, expected {rows}")
+
+    # The header size depends on the offsets it records, so reserve a
+    # generous fixed-width slot for each offset before laying out columns.
+    specs = [{"name": name, "dtype": values.dtype.str, "offset": 10 ** 12} for name, values in arrays.items()]
+    header_fields = {"version": FORMAT_VERSION, "rows": rows, "columns": specs, "metadata": dict(metadata or {})}
+    header_probe = json.dumps(header_fields).encode()
+    offset = _align(len(MAGIC) + 4 + len(header_probe))
+    for spec, values in zip(specs, arrays.values()):
+        spec["offset"] = offset
+        offset = _align(offset + values.nbytes)
+    header = json.dumps(header_fields).encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for spec, values in zip(specs, arrays.values()):
+            f.seek(spec["offset"])
+            f.write(values.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_frame(
+    df: pd.DataFrame,
+    path: Union[str, Path],
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> Path:
+    """Write a DataFrame with a ``date`` column and numeric columns."""
+    values = {name: df[name].to_numpy(dtype=np.float64) for name in df.columns if name != DATE_COLUMN}
+    return write_columnar(path, pd.to_datetime(df[DATE_COLUMN]).to_numpy(), values, metadata=metadata)
+
+
+def default_binary_path(csv_path: Union[str, Path]) -> Path:
+    """Return the binary sibling of ``csv_path`` (same name, ``.bin`` suffix)."""
+    return Path(csv_path).with_suffix(".bin")
+
+
+def _select_source(csv_path: Union[str, Path], binary_path: Optional[Union[str, Path]]) -> Path:
+    """Return the file :func:`load_dataset` reads: the binary unless it is stale."""
+    binary_path = Path(binary_path) if binary_path else default_binary_path(csv_path)
+    try:
+        binary_mtime = binary_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return Path(csv_path)
+    try:
+        csv_mtime = Path(csv_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return binary_path
+    return binary_path if binary_mtime >= csv_mtime else Path(csv_path)
+
+
+def dataset_version(
+    csv_path: Union[str, Path],
+    binary_path: Optional[Union[str, Path]] = None,
+) -> str:
+    """Return a short identifier that changes whenever the loaded data changes.
+
+    Built from the path, size and mtime of the file :func:`load_dataset` would
+    read, so it costs one ``stat`` call and is suitable as a cache-key prefix
+    for anything derived from the dataset.
+
+    Raises:
+        FileNotFoundError: If neither file exists.
+    """
+    source = _select_source(csv_path, binary_path)
+    stat = source.stat()
+    token = f"{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(token.encode()).hexdigest()[:16]
+
+
+def load_dataset(
+    csv_path: Union[str, Path],
+    binary_path: Optional[Union[str, Path]] = None,
+) -> pd.DataFrame:
+    """Load the aligned dataset, preferring the memory-mapped binary artifact.
+
+    The CSV is only parsed when the binary file is missing or older than the
+    CSV (e.g. the CSV was edited by hand).
+
+    Args:
+        csv_path: Path to the aligned CSV.
+        binary_path: Path to the columnar file (defaults to the CSV's ``.bin``
+            sibling).
+
+    Returns:
+        pd.DataFrame: ``date`` as datetime64 plus one column per series.
+
+    Raises:
+        FileNotFoundError: If neither file exists.
+    """
+    source = _select_source(csv_path, binary_path)
+    if source != Path(csv_path):
+        return ColumnarDataset(source).to_frame()
+    return pd.read_csv(csv_path, parse_dates=[DATE_COLUMN])
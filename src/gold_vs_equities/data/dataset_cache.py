@@ -0,0 +1,240 @@
+"""Hot-reloading holder for a dataset loaded from files on disk.
+
+A long-running server that caches the dataset forever keeps serving the old
+data after ``preprocess`` rewrites it, and restarting it throws away every
+other cache too. :class:`VersionedDataset` instead keys the loaded value on
+the identity of its source files: their size, mtime and a content digest.
+
+Each call to :meth:`VersionedDataset.current` costs one ``stat`` per file.
+Only when a size or mtime changed are the files hashed again, and only when
+a digest changed is the dataset reloaded; a file rewritten with identical
+bytes (or merely touched) keeps its version and every cache derived from it.
+A new version is published by swapping a single reference, so concurrent
+readers see either the old :class:`DatasetSnapshot` or the new one, never a
+mix. Values derived from a dataset live on its snapshot
+(:meth:`DatasetSnapshot.derived`) and are dropped together with it; caches
+kept elsewhere can subscribe to swaps to drop their entries for the old
+version.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+# Files modified more recently than this are assumed to still be being written.
+DEFAULT_SETTLE_SECONDS = 1.0
+_CHUNK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    """What a file looked like when it was last checked.
+
+    Attributes:
+        path: File path.
+        size: Size in bytes (-1 if the file does not exist).
+        mtime_ns: Modification time in nanoseconds (-1 if missing).
+        digest: Content digest (empty if missing).
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str
+
+    @property
+    def exists(self) -> bool:
+        """Whether the file existed."""
+        return self.size >= 0
+
+    def same_stat(self, size: int, mtime_ns: int) -> bool:
+        """Whether a ``stat`` result matches this identity."""
+        return self.size == size and self.mtime_ns == mtime_ns
+
+
+def content_digest(path: Union[str, Path]) -> str:
+    """Return a BLAKE2b digest of a file's bytes (read in 1 MiB chunks)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return -1, -1
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_identity(path: Union[str, Path], previous: Optional[FileIdentity] = None) -> FileIdentity:
+    """Return the identity of ``path``.
+
+    The file is only hashed when its size or mtime differ from ``previous``.
+    """
+    path = Path(path)
+    size, mtime_ns = _stat(path)
+    if size < 0:
+        return FileIdentity(str(path), -1, -1, "")
+    if previous is not None and previous.same_stat(size, mtime_ns):
+        return previous
+    return FileIdentity(str(path), size, mtime_ns, content_digest(path))
+
+
+def identities_version(identities: Sequence[FileIdentity]) -> str:
+    """Short version string derived from the content digests of ``identities``."""
+    token = "|".join(f"{Path(identity.path).name}:{identity.digest}" for identity in identities)
+    return hashlib.sha1(token.encode()).hexdigest()[:16]
+
+
+@dataclass
+class DatasetSnapshot(Generic[T]):
+    """One loaded version of a dataset, with the values derived from it.
+
+    Attributes:
+        version: Content-derived version string.
+        value: The loaded dataset.
+        loaded_at: ``time.time()`` when it was loaded.
+    """
+
+    version: str
+    value: T
+    loaded_at: float
+    _derived: Dict[Hashable, object] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def derived(self, key: Hashable, compute: Callable[[], object]):
+        """Return the value cached under ``key``, computing it on first use.
+
+        ``compute`` runs outside the lock; if two threads miss at once the
+        first result stored wins and both callers receive it.
+        """
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+        value = compute()
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._derived
+
+
+SwapCallback = Callable[[Optional[DatasetSnapshot], DatasetSnapshot], None]
+
+
+class VersionedDataset(Generic[T]):
+    """A dataset that is reloaded whenever its source files change.
+
+    Args:
+        paths: Files the dataset is read from. Missing files are allowed
+            (their identity records them as absent).
+        loader: Zero-argument callable that loads the dataset.
+        settle_seconds: A change is only picked up once every file has been
+            left alone for this long, so a writer that is not atomic is not
+            read half-way through. The first load never waits.
+        clock: Returns the current time in seconds (for tests).
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Union[str, Path]],
+        loader: Callable[[], T],
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not paths:
+            raise ValueError("at least one path is required")
+        self.paths = tuple(Path(path) for path in paths)
+        self.loader = loader
+        self.settle_seconds = settle_seconds
+        self._clock = clock
+        # (identities, snapshot), replaced as a whole so readers never see a mix.
+        self._state: Optional[Tuple[Tuple[FileIdentity, ...], DatasetSnapshot]] = None
+        # Identities whose load failed, so an unchanged broken file is not retried on every call.
+        self._failed: Optional[Tuple[Tuple[int, int], ...]] = None
+        self._reload_lock = threading.Lock()
+        self._callbacks: List[SwapCallback] = []
+        self.reloads = 0
+        self.last_error: Optional[BaseException] = None
+
+    def subscribe(self, callback: SwapCallback) -> None:
+        """Call ``callback(old_snapshot, new_snapshot)`` after every swap.
+
+        ``old_snapshot`` is None for the first load. Callbacks run in the
+        thread that performed the reload, after the new snapshot is published.
+        """
+        self._callbacks.append(callback)
+
+    def _stats(self) -> Tuple[Tuple[int, int], ...]:
+        return tuple(_stat(path) for path in self.paths)
+
+    @staticmethod
+    def _unchanged(identities: Sequence[FileIdentity], stats: Sequence[Tuple[int, int]]) -> bool:
+        return all(identity.same_stat(*stat) for identity, stat in zip(identities, stats))
+
+    def _settled(self, stats: Sequence[Tuple[int, int]]) -> bool:
+        newest = max(mtime_ns for _, mtime_ns in stats)
+        return self._clock() - newest / 1e9 >= self.settle_seconds
+
+    def current(self) -> DatasetSnapshot:
+        """Return the snapshot for the files as they are now.
+
+        Costs one ``stat`` per file when nothing changed. If the files changed
+        but reloading fails, the previous snapshot keeps being served (the
+        error is kept in :attr:`last_error`) until the files change again.
+
+        Raises:
+            Exception: Whatever the loader raises when there is no previous
+                snapshot to fall back on.
+        """
+        state = self._state
+        if state is not None and self._keep(state, self._stats()):
+            return state[1]
+        with self._reload_lock:
+            # Another thread may have reloaded while this one waited.
+            state = self._state
+            if state is not None and self._keep(state, self._stats()):
+                return state[1]
+            return self._reload(state)
+
+    def _keep(self, state, stats: Tuple[Tuple[int, int], ...]) -> bool:
+        """Whether ``state`` should still be served for files with ``stats``."""
+        return self._unchanged(state[0], stats) or stats == self._failed or not self._settled(stats)
+
+    def _reload(self, state) -> DatasetSnapshot:
+        previous = state[0] if state is not None else (None,) * len(self.paths)
+        identities = tuple(file_identity(path, old) for path, old in zip(self.paths, previous))
+        version = identities_version(identities)
+        if state is not None and state[1].version == version:
+            # Same bytes under a new mtime: keep the snapshot and its derived values.
+            self._state = (identities, state[1])
+            return state[1]
+        try:
+            value = self.loader()
+        except Exception as exc:
+            if state is None:
+                raise
+            self.last_error = exc
+            self._failed = tuple((identity.size, identity.mtime_ns) for identity in identities)
+            return state[1]
+        snapshot = DatasetSnapshot(version, value, self._clock())
+        self._state = (identities, snapshot)
+        self._failed = None
+        self.last_error = None
+        self.reloads += 1
+        for callback in self._callbacks:
+            callback(state[1] if state is not None else None, snapshot)
+        return snapshot
+
+    @property
+    def version(self) -> str:
+        """Version of the current snapshot (checking the files first)."""
+        return self.current().version
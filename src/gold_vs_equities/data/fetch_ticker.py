@@ -1,135 +1,374 @@
-"""
-Fetches historical price data for any ticker from Yahoo Finance and saves it to a CSV file.
+"""Fetch historical price data from Yahoo Finance.
+
+This module provides a small helper to fetch daily price data for a ticker
+using Yahoo Finance's chart API and save it as CSV if desired.
+
+The implementation accepts optional start/end dates and returns either a
+columnar :class:`PriceColumns` (int64 epoch seconds plus float64 closes) or,
+for compatibility, a list of date/close dictionaries. :func:`fetch_many`
+fetches several tickers concurrently over one pooled keep-alive session,
+retrying 429/5xx responses with jittered exponential backoff.
 """
 
-import requests
-import csv
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Union
 
-BASE_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{}?interval=1d&range=25y"
+import csv
+import random
+import threading
+import time
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{}"
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; DataBot/1.0)"}
+DEFAULT_START_DATE = datetime(1971, 1, 1, tzinfo=timezone.utc)
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_WORKERS = 8
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+SECONDS_PER_DAY = 86400
 
-from typing import List, Dict, Union
+DateLike = Optional[Union[str, date, datetime]]
 
-def fetch_ticker_prices(ticker: str) -> List[Dict[str, Union[float, str]]]:
+
+@dataclass(frozen=True)
+class PriceColumns:
+    """Columnar daily price history.
+
+    Attributes:
+        timestamps: int64 array of UTC epoch seconds, one per trading day.
+        closes: float64 array of closing prices aligned with ``timestamps``.
     """
-    Fetches historical price data for a given ticker from Yahoo Finance chart API.
+
+    timestamps: np.ndarray
+    closes: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "PriceColumns":
+        """Return a history with no rows."""
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def epoch_days(self) -> np.ndarray:
+        """Return the UTC calendar day of each row as days since 1970-01-01."""
+        return self.timestamps // SECONDS_PER_DAY
+
+    def date_strings(self) -> np.ndarray:
+        """Return the rows' UTC dates as ``YYYY-MM-DD`` strings, converted in bulk."""
+        return self.timestamps.astype("datetime64[s]").astype("datetime64[D]").astype(str)
+
+    def to_rows(self) -> List[Dict[str, Union[float, str]]]:
+        """Return the legacy list-of-dicts representation."""
+        return [
+            {"date": day, "close": close}
+            for day, close in zip(self.date_strings().tolist(), self.closes.tolist())
+        ]
+
+
+def _to_utc_datetime(value: Optional[Union[str, date, datetime]]) -> datetime:
+    """Convert a supported date-like value into an aware UTC datetime.
 
     Args:
-        ticker (str): The ticker symbol (e.g., 'GC=F', '^GSPC').
+        value: None, a date, datetime or ISO date string.
+
     Returns:
-        list of dict: List of {"date": str, "close": float} for each available day.
+        datetime: timezone-aware UTC datetime.
     """
-    url = BASE_URL.format(ticker)
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    """Fetch historical price data from Yahoo Finance.
+    if value is None:
+        return DEFAULT_START_DATE
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str):
+        dt = datetime.fromisoformat(value)
+    else:
+        raise TypeError(f"Unsupported date type: {type(value)!r}")
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at most ``rate`` per second."""
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the caller is allowed to issue its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
 
-    This module provides a small helper to fetch daily price data for a ticker
-    using Yahoo Finance's chart API and save it as CSV if desired.
 
-    The implementation accepts optional start/end dates and returns a list of
-    date/close dictionaries.
+def create_session(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """Create a keep-alive session sized for ``pool_size`` concurrent requests.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host.
+
+    Returns:
+        requests.Session: Session with the default headers applied.
     """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
 
-    from datetime import date, datetime, timezone
-    from pathlib import Path
-    from typing import Dict, List, Optional, Union
-
-    import csv
-    import requests
-
-    BASE_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{ }".replace("{ }","{}")
-    HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; DataBot/1.0)"}
-    DEFAULT_START_DATE = datetime(1971, 1, 1, tzinfo=timezone.utc)
-
-
-    def _to_utc_datetime(value: Optional[Union[str, date, datetime]]) -> datetime:
-        """Convert a supported date-like value into an aware UTC datetime.
-
-        Args:
-            value: None, a date, datetime or ISO date string.
-
-        Returns:
-            datetime: timezone-aware UTC datetime.
-        """
-        if value is None:
-            return DEFAULT_START_DATE
-        if isinstance(value, datetime):
-            dt = value
-        elif isinstance(value, date):
-            dt = datetime(value.year, value.month, value.day)
-        elif isinstance(value, str):
-            dt = datetime.fromisoformat(value)
-        else:
-            raise TypeError(f"Unsupported date type: {type(value)!r}")
-        if dt.tzinfo is None:
-            return dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
-
-
-    def fetch_ticker_prices(
-        ticker: str,
-        start: Optional[Union[str, date, datetime]] = None,
-        end: Optional[Union[str, date, datetime]] = None,
-    ) -> List[Dict[str, Union[float, str]]]:
-        """Fetch daily historical prices for ``ticker`` from Yahoo Finance.
-
-        Args:
-            ticker: Ticker symbol (e.g., "GC=F", "^GSPC").
-            start: Inclusive start date (defaults to 1971-01-01).
-            end: Exclusive end date (defaults to now).
-
-        Returns:
-            List[dict]: Each dict contains ``"date"`` (YYYY-MM-DD) and ``"close"``.
-        """
-        start_dt = _to_utc_datetime(start)
-        end_dt = _to_utc_datetime(end) if end is not None else datetime.now(timezone.utc)
-        params = {
-            "interval": "1d",
-            "period1": int(start_dt.timestamp()),
-            "period2": int(end_dt.timestamp()),
-        }
-        response = requests.get(BASE_URL.format(ticker), headers=HEADERS, params=params)
+def _backoff_delay(attempt: int, backoff_factor: float, retry_after: Optional[str] = None) -> float:
+    """Return the sleep before retry ``attempt`` (0-based), with full jitter."""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, backoff_factor * (2 ** attempt))
+
+
+def _get_with_retry(
+    session: requests.Session,
+    url: str,
+    params: Dict[str, Union[int, str]],
+    timeout: float,
+    max_retries: int,
+    backoff_factor: float,
+    rate_limiter: Optional[RateLimiter],
+) -> requests.Response:
+    """GET ``url`` and retry on 429/5xx or connection errors.
+
+    Raises:
+        requests.HTTPError: If the final attempt still returns an error status.
+        requests.RequestException: If the final attempt fails to connect.
+    """
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.wait()
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                raise
+            time.sleep(_backoff_delay(attempt, backoff_factor))
+            continue
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+            time.sleep(_backoff_delay(attempt, backoff_factor, response.headers.get("Retry-After")))
+            continue
         response.raise_for_status()
-        data = response.json()
-        result_data = data["chart"]["result"][0]
-        timestamps = result_data["timestamp"]
-        closes = result_data["indicators"]["quote"][0]["close"]
-        result: List[Dict[str, Union[float, str]]] = []
-        for ts, close in zip(timestamps, closes):
-            if close is not None:
-                date_str = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
-                result.append({"date": date_str, "close": close})
-        return result
-
-
-    def save_prices_to_csv(prices: List[Dict[str, Union[float, str]]], filename: Union[str, Path]) -> None:
-        """Save a list of price dicts to a CSV file.
-
-        Args:
-            prices: List of {"date": str, "close": float}.
-            filename: Path to the output CSV file.
-        """
-        Path(filename).parent.mkdir(parents=True, exist_ok=True)
-        with open(filename, "w", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=["date", "close"])
-            writer.writeheader()
-            for row in prices:
-                writer.writerow(row)
-
-
-    if __name__ == "__main__":
-        import sys
-
-        if len(sys.argv) not in (3, 4, 5):
-            print("Usage: python fetch_ticker.py <TICKER> <OUTPUT_CSV> [<START>] [<END>]")
-            exit(1)
-        ticker = sys.argv[1]
-        output_csv = sys.argv[2]
-        start_arg = sys.argv[3] if len(sys.argv) >= 4 else None
-        end_arg = sys.argv[4] if len(sys.argv) == 5 else None
-        prices = fetch_ticker_prices(ticker, start=start_arg, end=end_arg)
-        save_prices_to_csv(prices, output_csv)
-        print(f"Saved {len(prices)} rows to {output_csv}")
+        return response
+    raise AssertionError("unreachable")
+
+
+def parse_chart_columns(payload: Dict) -> PriceColumns:
+    """Convert a chart API JSON payload into :class:`PriceColumns`.
+
+    Rows with a missing close are dropped with a vectorized mask.
+
+    Args:
+        payload: Decoded JSON body of a ``v8/finance/chart`` response.
+
+    Returns:
+        PriceColumns: Timestamps and closes with nulls removed.
+    """
+    result_data = payload["chart"]["result"][0]
+    timestamps = np.asarray(result_data.get("timestamp") or [], dtype=np.int64)
+    # None becomes NaN when coerced to float64.
+    closes = np.asarray(result_data["indicators"]["quote"][0].get("close") or [], dtype=np.float64)
+    n = min(len(timestamps), len(closes))
+    timestamps, closes = timestamps[:n], closes[:n]
+    valid = ~np.isnan(closes)
+    return PriceColumns(timestamps[valid], closes[valid])
+
+
+def fetch_ticker_columns(
+    ticker: str,
+    start: DateLike = None,
+    end: DateLike = None,
+    session: Optional[requests.Session] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int = 4,
+    backoff_factor: float = 0.5,
+    rate_limiter: Optional[RateLimiter] = None,
+    base_url: str = BASE_URL,
+) -> PriceColumns:
+    """Fetch daily historical prices for ``ticker`` as columnar arrays.
+
+    Args:
+        ticker: Ticker symbol (e.g., "GC=F", "^GSPC").
+        start: Inclusive start date (defaults to 1971-01-01).
+        end: Exclusive end date (defaults to now).
+        session: Optional shared session; a one-off session is used otherwise.
+        timeout: Per-request timeout in seconds.
+        max_retries: Retries on 429/5xx responses and connection errors.
+        backoff_factor: Base delay in seconds for exponential backoff.
+        rate_limiter: Optional limiter shared between concurrent fetches.
+        base_url: Chart API URL template with a ``{}`` ticker placeholder.
+
+    Returns:
+        PriceColumns: int64 epoch-second timestamps and float64 closes.
+    """
+    start_dt = _to_utc_datetime(start)
+    end_dt = _to_utc_datetime(end) if end is not None else datetime.now(timezone.utc)
+    params = {
+        "interval": "1d",
+        "period1": int(start_dt.timestamp()),
+        "period2": int(end_dt.timestamp()),
+    }
+    own_session = session is None
+    session = session or create_session(pool_size=1)
+    try:
+        response = _get_with_retry(
+            session, base_url.format(ticker), params, timeout, max_retries, backoff_factor, rate_limiter
+        )
+    finally:
+        if own_session:
+            session.close()
+    return parse_chart_columns(response.json())
+
+
+def fetch_ticker_prices(
+    ticker: str,
+    start: DateLike = None,
+    end: DateLike = None,
+    **kwargs,
+) -> List[Dict[str, Union[float, str]]]:
+    """Fetch daily historical prices for ``ticker`` from Yahoo Finance.
+
+    Thin compatibility wrapper around :func:`fetch_ticker_columns`.
+
+    Args:
+        ticker: Ticker symbol (e.g., "GC=F", "^GSPC").
+        start: Inclusive start date (defaults to 1971-01-01).
+        end: Exclusive end date (defaults to now).
+        **kwargs: Session, retry and URL options for :func:`fetch_ticker_columns`.
+
+    Returns:
+        List[dict]: Each dict contains ``"date"`` (YYYY-MM-DD) and ``"close"``.
+    """
+    return fetch_ticker_columns(ticker, start=start, end=end, **kwargs).to_rows()
+
+
+def fetch_many(
+    tickers: Iterable[str],
+    start: Union[DateLike, Mapping[str, DateLike]] = None,
+    end: DateLike = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_requests_per_second: Optional[float] = None,
+    session: Optional[requests.Session] = None,
+    columnar: bool = False,
+    errors: Optional[Dict[str, Exception]] = None,
+    **kwargs,
+) -> Dict[str, Union[PriceColumns, List[Dict[str, Union[float, str]]]]]:
+    """Fetch several tickers concurrently over one pooled session.
+
+    Args:
+        tickers: Ticker symbols to fetch.
+        start: Inclusive start date, or a mapping of ticker to start date.
+        end: Exclusive end date (defaults to now).
+        max_workers: Size of the thread pool and connection pool.
+        max_requests_per_second: Optional cap on the overall request rate.
+        session: Optional session to reuse; one is created (and closed) otherwise.
+        columnar: Return :class:`PriceColumns` instead of lists of dicts.
+        errors: If given, a ticker whose fetch fails is left out of the result
+            and its exception stored here; otherwise the first failure is raised.
+        **kwargs: Extra keyword arguments passed to :func:`fetch_ticker_columns`.
+
+    Returns:
+        dict: Mapping of ticker to its price history, in input order.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    starts = start if isinstance(start, Mapping) else {ticker: start for ticker in tickers}
+    limiter = RateLimiter(max_requests_per_second) if max_requests_per_second else None
+    workers = max(1, min(max_workers, len(tickers)))
+    own_session = session is None
+    session = session or create_session(pool_size=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                ticker: pool.submit(
+                    fetch_ticker_columns if columnar else fetch_ticker_prices,
+                    ticker,
+                    start=starts.get(ticker),
+                    end=end,
+                    session=session,
+                    rate_limiter=limiter,
+                    **kwargs,
+                )
+                for ticker in tickers
+            }
+            if errors is None:
+                return {ticker: future.result() for ticker, future in futures.items()}
+            results = {}
+            for ticker, future in futures.items():
+                try:
+                    results[ticker] = future.result()
+                except Exception as exc:
+                    errors[ticker] = exc
+            return results
+    finally:
+        if own_session:
+            session.close()
+
+
+def save_prices_to_csv(prices: List[Dict[str, Union[float, str]]], filename: Union[str, Path]) -> None:
+    """Save a list of price dicts to a CSV file.
+
+    Args:
+        prices: List of {"date": str, "close": float}.
+        filename: Path to the output CSV file.
+    """
+    Path(filename).parent.mkdir(parents=True, exist_ok=True)
+    with open(filename, "w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=["date", "close"])
+        writer.writeheader()
+        for row in prices:
+            writer.writerow(row)
+
+
+def load_prices_from_csv(filename: Union[str, Path]) -> List[Dict[str, Union[float, str]]]:
+    """Load a price CSV written by :func:`save_prices_to_csv`.
+
+    Args:
+        filename: Path to a CSV file with ``date`` and ``close`` columns.
+
+    Returns:
+        List[dict]: Each dict contains ``"date"`` (YYYY-MM-DD) and ``"close"``.
+    """
+    with open(filename, "r", newline="") as csvfile:
+        return [{"date": row["date"], "close": float(row["close"])} for row in csv.DictReader(csvfile)]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) not in (3, 4, 5):
+        print("Usage: python fetch_ticker.py <TICKER> <OUTPUT_CSV> [<START>] [<END>]")
+        exit(1)
+    ticker = sys.argv[1]
+    output_csv = sys.argv[2]
+    start_arg = sys.argv[3] if len(sys.argv) >= 4 else None
+    end_arg = sys.argv[4] if len(sys.argv) == 5 else None
+    prices = fetch_ticker_prices(ticker, start=start_arg, end=end_arg)
+    save_prices_to_csv(prices, output_csv)
+    print(f"Saved {len(prices)} rows to {output_csv}")
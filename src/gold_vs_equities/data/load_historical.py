@@ -0,0 +1,428 @@
+"""Load the monthly historical gold price series from ``histprices.json``.
+
+The JSON file holds ``{"Date": "YYYY-MM", "Price": float}`` records from 1833
+onwards. Parsing it is the slow part, so the first load writes a binary
+columnar sidecar (see :mod:`gold_vs_equities.data.columnar`) next to the JSON
+file. The sidecar header records the JSON file's size, mtime and SHA-256 plus
+the series' min/max dates, so repeat loads and bounds lookups skip JSON
+entirely.
+
+:func:`get_combined_gold_data` splices the monthly history onto the month-end
+closes of a modern daily series (see :func:`splice_series`). The result is
+cached in a second columnar file keyed by both inputs, so it is rebuilt only
+when one of them changes.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH, load_config
+from gold_vs_equities.data.columnar import (
+    ColumnarDataset,
+    dataset_version,
+    from_epoch_days,
+    load_dataset,
+    to_epoch_days,
+    write_columnar,
+)
+
+DEFAULT_HIST_JSON_PATH = DEFAULT_CONFIG_PATH.parent / "histprices.json"
+SIDECAR_SUFFIX = ".bin"
+COMBINED_SUFFIX = ".combined.bin"
+# Bump when the splice rules change so stale combined caches are rebuilt.
+SPLICE_VERSION = 1
+
+PRECEDENCES = ("historical", "daily")
+DEFAULT_PRECEDENCE = "historical"
+# Largest relative difference allowed between the two sources near the seam.
+# histprices.json holds monthly averages while the daily series contributes
+# month-end closes, which can differ by several percent in a volatile month;
+# a unit or scale mismatch between the sources is far larger than this.
+DEFAULT_SEAM_TOLERANCE = 0.1
+# Overlapping periods (closest to the seam) compared by the seam check.
+SEAM_WINDOW = 12
+# Offset aliases resampled with NumPy month keys instead of pandas.
+_MONTH_END_ALIASES = ("ME", "M")
+
+
+class SpliceError(ValueError):
+    """The two sources disagree at the seam by more than the tolerance."""
+
+
+def get_seam_tolerance() -> Optional[float]:
+    """Return the configured seam tolerance (``history.seam_tolerance`` in config.yaml).
+
+    ``null`` in the config disables the seam check.
+    """
+    history = load_config().get("history") or {}
+    if "seam_tolerance" not in history:
+        return DEFAULT_SEAM_TOLERANCE
+    tolerance = history["seam_tolerance"]
+    return None if tolerance is None else float(tolerance)
+
+
+def sidecar_path(json_path: Union[str, Path]) -> Path:
+    """Return the binary sidecar used for ``json_path``."""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name + SIDECAR_SUFFIX)
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_month_strings(months) -> np.ndarray:
+    """Parse ``"YYYY-MM"`` strings in bulk into month-end ``datetime64[D]``.
+
+    Args:
+        months: Sequence of ``"YYYY-MM"`` strings.
+
+    Returns:
+        np.ndarray: The last calendar day of each month.
+    """
+    month_starts = np.asarray(months, dtype="datetime64[M]")
+    return (month_starts + 1).astype("datetime64[D]") - 1
+
+
+def _parse_json(json_path: Path):
+    with open(json_path, "r") as f:
+        records = json.load(f)
+    dates = parse_month_strings([record["Date"] for record in records])
+    prices = np.fromiter((record["Price"] for record in records), dtype=np.float64, count=len(records))
+    order = np.argsort(dates, kind="stable")
+    return dates[order], prices[order]
+
+
+def _open_sidecar(json_path: Path) -> ColumnarDataset:
+    """Return an up-to-date sidecar for ``json_path``, rebuilding it if needed."""
+    stat = json_path.stat()
+    path = sidecar_path(json_path)
+    digest = None
+    if path.exists():
+        try:
+            dataset = ColumnarDataset(path)
+        except ValueError:
+            dataset = None
+        if dataset is not None:
+            source = dataset.metadata.get("source", {})
+            if source.get("size") == stat.st_size and source.get("mtime_ns") == stat.st_mtime_ns:
+                return dataset
+            # Touched but possibly unchanged: only re-parse if the content differs.
+            if source.get("size") == stat.st_size:
+                digest = _file_digest(json_path)
+                if source.get("sha256") == digest:
+                    return _write_sidecar(path, dataset["date"], dataset["gold"], stat, digest)
+
+    dates, prices = _parse_json(json_path)
+    return _write_sidecar(path, dates, prices, stat, digest or _file_digest(json_path))
+
+
+def _write_sidecar(path: Path, dates, prices, stat, digest: str) -> ColumnarDataset:
+    dates = np.asarray(dates)
+    if dates.dtype.kind != "M":
+        dates = from_epoch_days(dates)
+    dates = np.array(dates, copy=True)
+    prices = np.array(prices, dtype=np.float64, copy=True)
+    metadata = {
+        "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest},
+        "min_date": str(dates[0]) if len(dates) else None,
+        "max_date": str(dates[-1]) if len(dates) else None,
+    }
+    try:
+        write_columnar(path, dates, {"gold": prices}, metadata=metadata)
+    except OSError:
+        # Read-only checkouts still work, they just parse the JSON every time.
+        return _InMemorySidecar(dates, prices, metadata)
+    return ColumnarDataset(path)
+
+
+class _InMemorySidecar(dict):
+    """Stand-in for :class:`ColumnarDataset` when the sidecar cannot be written."""
+
+    def __init__(self, dates, prices, metadata):
+        super().__init__(date=dates.astype(np.int64).astype(np.int32), gold=prices)
+        self.metadata = metadata
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"date": from_epoch_days(self["date"]).astype("datetime64[ns]"), "gold": self["gold"]})
+
+
+def load_historical_gold_prices(json_path: Union[str, Path, None] = None) -> pd.DataFrame:
+    """Load monthly historical gold prices.
+
+    Args:
+        json_path: Path to ``histprices.json`` (defaults to the project root copy).
+
+    Returns:
+        pd.DataFrame: ``date`` (month-end datetime64) and ``gold`` columns,
+        sorted by date.
+
+    Raises:
+        FileNotFoundError: If ``json_path`` does not exist.
+    """
+    json_path = Path(json_path) if json_path else DEFAULT_HIST_JSON_PATH
+    if not json_path.exists():
+        raise FileNotFoundError(f"Historical price file not found: {json_path}")
+    return _open_sidecar(json_path).to_frame()
+
+
+def get_date_range_bounds(json_path: Union[str, Path, None] = None) -> Dict[str, datetime]:
+    """Return the first and last dates of the historical series.
+
+    Reads the bounds from the sidecar header, so the cost does not depend on
+    the length of the series once the sidecar exists.
+
+    Args:
+        json_path: Path to ``histprices.json`` (defaults to the project root copy).
+
+    Returns:
+        dict: ``{"min_date": datetime, "max_date": datetime}``.
+    """
+    json_path = Path(json_path) if json_path else DEFAULT_HIST_JSON_PATH
+    metadata = _open_sidecar(json_path).metadata
+    return {
+        "min_date": datetime.fromisoformat(metadata["min_date"]),
+        "max_date": datetime.fromisoformat(metadata["max_date"]),
+    }
+
+
+def resample_last(dates, values, freq: str = "ME") -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the last valid value of each ``freq`` period, labelled by period end.
+
+    Month-end resampling (``"ME"``) is done with integer month keys in NumPy
+    (one pass, no index construction); other offset aliases fall back to
+    :meth:`pandas.Series.resample`.
+
+    Args:
+        dates: Sorted dates (anything ``np.asarray`` turns into ``datetime64``).
+        values: Values of the same length; NaNs are skipped.
+        freq: Pandas offset alias.
+
+    Returns:
+        tuple: ``(dates, values)`` as ``datetime64[D]`` and float64 arrays.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    dates, values = dates[valid], values[valid]
+    if freq not in _MONTH_END_ALIASES:
+        resampled = pd.Series(values, index=pd.DatetimeIndex(dates)).resample(freq).last().dropna()
+        return resampled.index.to_numpy(dtype="datetime64[D]"), resampled.to_numpy(dtype=np.float64)
+    months = dates.astype("datetime64[M]")
+    if len(months) == 0:
+        return dates, values
+    last_rows = np.flatnonzero(np.append(months[1:] != months[:-1], True))
+    return (months[last_rows] + 1).astype("datetime64[D]") - 1, values[last_rows]
+
+
+@dataclass(frozen=True)
+class SpliceReport:
+    """Where and how well two sources were joined.
+
+    Attributes:
+        precedence: Source kept on periods both cover.
+        historical_rows: Periods from the historical series.
+        daily_rows: Periods from the resampled daily series.
+        overlap: Periods covered by both sources.
+        seam_date: First period taken from the series after the seam (None
+            if only one source has data).
+        seam_gap_periods: Periods missing between the two sources (0 when
+            they touch or overlap).
+        seam_max_diff: Largest relative difference between the sources over
+            the :data:`SEAM_WINDOW` overlapping periods closest to the seam
+            (None without overlap).
+    """
+
+    precedence: str
+    historical_rows: int
+    daily_rows: int
+    overlap: int
+    seam_date: Optional[str]
+    seam_gap_periods: int
+    seam_max_diff: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as a plain (JSON-serializable) dictionary."""
+        return asdict(self)
+
+
+def splice_series(
+    historical: Tuple[np.ndarray, np.ndarray],
+    daily: Tuple[np.ndarray, np.ndarray],
+    precedence: str = DEFAULT_PRECEDENCE,
+    seam_tolerance: Optional[float] = DEFAULT_SEAM_TOLERANCE,
+) -> Tuple[np.ndarray, np.ndarray, SpliceReport]:
+    """Join two period series on the union of their dates.
+
+    Both inputs are ``(dates, values)`` already on the same period labels
+    (e.g. month ends). Periods covered by only one source take its value;
+    periods covered by both take the ``precedence`` source. The values of
+    both sources on the overlapping periods next to the seam are compared
+    first, so a unit or scale mismatch between the sources is caught instead
+    of showing up as a jump in the series.
+
+    Args:
+        historical: Sorted ``(dates, values)`` of the historical series.
+        daily: Sorted ``(dates, values)`` of the resampled modern series.
+        precedence: ``"historical"`` or ``"daily"``.
+        seam_tolerance: Largest allowed relative difference at the seam, or
+            None to skip the check.
+
+    Returns:
+        tuple: ``(dates, values, report)`` with ``datetime64[D]`` dates.
+
+    Raises:
+        ValueError: For an unknown precedence.
+        SpliceError: If the sources differ by more than ``seam_tolerance``.
+    """
+    if precedence not in PRECEDENCES:
+        raise ValueError(f"Unknown precedence {precedence!r}; expected one of {', '.join(PRECEDENCES)}")
+    hist_days, hist_values = to_epoch_days(historical[0]).astype(np.int64), np.asarray(historical[1], dtype=np.float64)
+    daily_days, daily_values = to_epoch_days(daily[0]).astype(np.int64), np.asarray(daily[1], dtype=np.float64)
+
+    days = np.union1d(hist_days, daily_days)
+    hist_rows = np.searchsorted(days, hist_days)
+    daily_rows = np.searchsorted(days, daily_days)
+    values = np.empty(len(days))
+    # Write the preferred source last so it wins on the overlap.
+    if precedence == "historical":
+        values[daily_rows] = daily_values
+        values[hist_rows] = hist_values
+    else:
+        values[hist_rows] = hist_values
+        values[daily_rows] = daily_values
+
+    overlap_days, hist_k, daily_k = np.intersect1d(hist_days, daily_days, assume_unique=True, return_indices=True)
+    seam_max_diff = None
+    if len(overlap_days):
+        # The seam sits at the end of the historical series or the start of the daily one.
+        near = slice(-SEAM_WINDOW, None) if precedence == "historical" else slice(None, SEAM_WINDOW)
+        reference, other = hist_values[hist_k][near], daily_values[daily_k][near]
+        seam_max_diff = float(np.max(np.abs(other / reference - 1.0)))
+        if seam_tolerance is not None and seam_max_diff > seam_tolerance:
+            raise SpliceError(
+                f"Sources differ by {seam_max_diff:.2%} near the seam (tolerance {seam_tolerance:.2%})"
+            )
+
+    seam_date, gap = None, 0
+    if len(hist_days) and len(daily_days):
+        # Index of the first row after the seam in the spliced series.
+        if precedence == "historical":
+            seam = int(np.searchsorted(days, hist_days[-1], side="right"))
+        else:
+            seam = int(np.searchsorted(days, daily_days[0], side="left"))
+        if 0 < seam < len(days):
+            seam_date = str(from_epoch_days(days[seam : seam + 1])[0])
+            spacing = np.median(np.diff(days)) if len(days) > 1 else 1
+            gap = max(int(round((days[seam] - days[seam - 1]) / spacing)) - 1, 0)
+
+    report = SpliceReport(
+        precedence=precedence,
+        historical_rows=len(hist_days),
+        daily_rows=len(daily_days),
+        overlap=len(overlap_days),
+        seam_date=seam_date,
+        seam_gap_periods=gap,
+        seam_max_diff=seam_max_diff,
+    )
+    return from_epoch_days(days), values, report
+
+
+def combined_path(json_path: Union[str, Path]) -> Path:
+    """Return the cache file holding the spliced series for ``json_path``."""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name + COMBINED_SUFFIX)
+
+
+def _combined_key(json_path: Path, daily_path: Path, resample_freq: str, precedence: str, seam_tolerance) -> Dict[str, Any]:
+    """Identify both inputs and the splice settings (a few ``stat`` calls)."""
+    return {
+        "version": SPLICE_VERSION,
+        "historical": _open_sidecar(json_path).metadata["source"]["sha256"],
+        "daily": dataset_version(daily_path),
+        "daily_path": str(daily_path.resolve()),
+        "resample_freq": resample_freq,
+        "precedence": precedence,
+        "seam_tolerance": seam_tolerance,
+    }
+
+
+def get_combined_gold_data(
+    daily_csv_path: Union[str, Path, None] = None,
+    historical_json_path: Union[str, Path, None] = None,
+    resample_freq: str = "ME",
+    precedence: str = DEFAULT_PRECEDENCE,
+    seam_tolerance: Optional[float] = DEFAULT_SEAM_TOLERANCE,
+) -> pd.DataFrame:
+    """Splice the historical monthly series onto a daily gold series.
+
+    Daily closes are resampled to ``resample_freq`` with
+    :func:`resample_last` and joined to the history with
+    :func:`splice_series`. The result is written to :func:`combined_path`
+    together with the identity of both inputs (the JSON's SHA-256 from its
+    sidecar and :func:`~gold_vs_equities.data.columnar.dataset_version` of the
+    daily data) and the splice settings; later calls with unchanged inputs
+    memory-map that file instead of splicing again.
+
+    Args:
+        daily_csv_path: CSV with ``date`` and ``gold`` columns (its fresh
+            ``.bin`` sibling is read when present), or None to return the
+            historical series alone.
+        historical_json_path: Path to ``histprices.json``.
+        resample_freq: Pandas offset alias used to resample the daily data.
+        precedence: Source kept where both have a value (``"historical"`` or
+            ``"daily"``).
+        seam_tolerance: Largest allowed relative difference between the
+            sources near the seam, or None to skip the check.
+
+    Returns:
+        pd.DataFrame: ``date`` and ``gold`` columns sorted by date. The
+        :class:`SpliceReport` is available as ``df.attrs["splice"]`` (a dict).
+
+    Raises:
+        FileNotFoundError: If an input file does not exist.
+        SpliceError: If the seam check fails.
+    """
+    json_path = Path(historical_json_path) if historical_json_path else DEFAULT_HIST_JSON_PATH
+    historical = load_historical_gold_prices(json_path)
+    if daily_csv_path is None:
+        return historical
+
+    daily_path = Path(daily_csv_path)
+    key = _combined_key(json_path, daily_path, resample_freq, precedence, seam_tolerance)
+    cache_path = combined_path(json_path)
+    try:
+        cached = ColumnarDataset(cache_path)
+    except (FileNotFoundError, ValueError):
+        cached = None
+    if cached is not None and cached.metadata.get("key") == key:
+        combined = cached.to_frame()
+        combined.attrs["splice"] = cached.metadata["splice"]
+        return combined
+
+    daily = load_dataset(daily_path)
+    daily_series = resample_last(daily["date"].to_numpy(), daily["gold"].to_numpy(), resample_freq)
+    dates, values, report = splice_series(
+        (historical["date"].to_numpy(), historical["gold"].to_numpy()),
+        daily_series,
+        precedence=precedence,
+        seam_tolerance=seam_tolerance,
+    )
+    metadata = {"key": key, "splice": report.to_dict()}
+    try:
+        combined = ColumnarDataset(write_columnar(cache_path, dates, {"gold": values}, metadata=metadata)).to_frame()
+    except OSError:
+        combined = pd.DataFrame({"date": dates.astype("datetime64[ns]"), "gold": values})
+    combined.attrs["splice"] = report.to_dict()
+    return combined
@@ -1,50 +1,261 @@
-
 """
 Preprocesses gold and S&P 500 historical data from Yahoo Finance.
 
-Fetches daily gold futures and S&P 500 index prices for the last 25 years,
-aligns them by date, and saves the merged dataset as a CSV file.
+Fetches daily gold futures and S&P 500 index prices, aligns them by date, and
+saves the merged dataset as a CSV file plus a memory-mappable binary
+columnar copy and pre-aggregated weekly/monthly/yearly tiers. Raw ticker
+histories are kept in an incremental on-disk cache so repeat runs only
+download new trading days.
 """
 
-
-
-
 import os
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
 import pandas as pd
-import yaml
-from gold_vs_equities.data.fetch_ticker import fetch_ticker_prices
 
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH, load_config
+from gold_vs_equities.data.align import (
+    DEFAULT_POLICY,
+    DEFAULT_TOLERANCE_DAYS,
+    AlignedMatrix,
+    align_series,
+    write_aligned,
+)
+from gold_vs_equities.data.columnar import default_binary_path, write_frame
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+from gold_vs_equities.data.price_cache import fetch_many_cached
+from gold_vs_equities.data.tiers import write_tiers
+from gold_vs_equities.utils.metrics import METRICS
 
+PROJECT_ROOT = DEFAULT_CONFIG_PATH.parent
+DEFAULT_ASSETS = {"gold": "GC=F", "sp500": "^GSPC"}
+# Assets the aligned dataset is built from; failing to fetch either aborts a run.
+REQUIRED_ASSETS = tuple(DEFAULT_ASSETS)
+DEFAULT_ASSETS_FILENAME = "assets_wide.bin"
 
 
 def get_csv_path():
-    config_path = os.path.join(os.path.dirname(__file__), "..", "config.yaml")
-    with open(config_path, "r") as f:
-        config = yaml.safe_load(f)
-    return config["csv_path"]
+    """Return the configured output CSV path (relative to the project root)."""
+    return load_config()["csv_path"]
+
 
-def main():
+def get_binary_path() -> str:
+    """Return the configured binary dataset path (relative to the project root)."""
+    cfg = load_config()
+    return cfg.get("binary_path") or str(default_binary_path(cfg["csv_path"]))
+
+
+def get_cache_dir() -> Path:
+    """Return the configured ticker cache directory."""
+    cache_dir = load_config().get("cache_dir", "data/cache")
+    return PROJECT_ROOT / cache_dir
+
+
+def get_assets() -> Dict[str, str]:
+    """Return the configured asset name -> ticker mapping.
+
+    ``gold`` and ``sp500`` are always present (they feed the main aligned
+    dataset) and default to ``GC=F`` and ``^GSPC``.
     """
-    Fetches, aligns, and saves gold and S&P 500 historical data.
+    assets = dict(DEFAULT_ASSETS)
+    assets.update(load_config().get("assets") or {})
+    return assets
+
+
+def get_alignment() -> Tuple[str, int]:
+    """Return the configured ``(policy, tolerance_days)`` for the gold / S&P 500 dataset.
+
+    Defaults to ``inner`` (only days both markets traded) with a 4-day
+    tolerance, which only matters for the ``outer`` and ``asof`` policies.
+    """
+    alignment = load_config().get("alignment") or {}
+    return alignment.get("policy", DEFAULT_POLICY), int(alignment.get("tolerance_days", DEFAULT_TOLERANCE_DAYS))
+
+
+def get_assets_path() -> Path:
+    """Return the configured wide asset table path."""
+    return PROJECT_ROOT / load_config().get("assets_path", f"data/{DEFAULT_ASSETS_FILENAME}")
+
+
+def align_assets(
+    prices: Mapping[str, PriceColumns],
+    assets: Mapping[str, str],
+    policy: str = "outer",
+    tolerance: int = 0,
+) -> AlignedMatrix:
+    """Align every asset's closes on one epoch-day axis in a single pass.
+
+    Unlike the gold / S&P 500 dataset (``inner`` by default), the wide table
+    defaults to ``outer`` without filling: it keeps every date any asset
+    traded and leaves each asset's missing closes as NaN.
+
+    Args:
+        prices: Ticker -> price history.
+        assets: Column name -> ticker.
+        policy: Alignment policy (see :mod:`gold_vs_equities.data.align`).
+        tolerance: Forward-fill tolerance in days (0 leaves gaps as NaN).
+
+    Returns:
+        AlignedMatrix: ``T x N`` closes plus the per-asset gap report.
+    """
+    return align_series({name: prices[ticker] for name, ticker in assets.items()}, policy=policy, tolerance=tolerance)
+
+
+def align_prices(
+    gold: PriceColumns,
+    sp500: PriceColumns,
+    policy: str = DEFAULT_POLICY,
+    tolerance: int = DEFAULT_TOLERANCE_DAYS,
+) -> pd.DataFrame:
+    """Align gold and S&P 500 closes by date and round them to 1 decimal.
 
-    Downloads daily gold futures and S&P 500 index prices, merges them by date,
-    and writes the aligned data to 'gold_sp500_aligned.csv'.
+    Args:
+        gold: Gold futures history.
+        sp500: S&P 500 history.
+        policy: ``inner`` keeps days both markets traded; ``outer`` and
+            ``asof`` (on gold's days) carry a close forward for up to
+            ``tolerance`` days. Days still missing a close are dropped.
+        tolerance: Forward-fill tolerance in days.
+
+    Returns:
+        pd.DataFrame: ``date`` (``YYYY-MM-DD`` strings), ``gold`` and ``sp500``,
+        sorted by date.
     """
-    gold = fetch_ticker_prices("GC=F")
-    sp500 = fetch_ticker_prices("^GSPC")
-    gold_df = pd.DataFrame([(row["date"], row["close"]) for row in gold], columns=["date", "gold"])
-    sp500_df = pd.DataFrame([(row["date"], row["close"]) for row in sp500], columns=["date", "sp500"])
-    merged = pd.merge(gold_df, sp500_df, on="date", how="inner")
-    merged = merged.dropna()
-    merged = merged.sort_values("date")
+    aligned = align_series({"gold": gold, "sp500": sp500}, policy=policy, tolerance=tolerance)
+    merged = pd.DataFrame({
+        "date": np.datetime_as_string(aligned.dates, unit="D"),
+        "gold": aligned.column("gold"),
+        "sp500": aligned.column("sp500"),
+    })
+    merged = merged.dropna().reset_index(drop=True)
     # Round gold and sp500 columns to 1 decimal place
     merged["gold"] = merged["gold"].round(1)
     merged["sp500"] = merged["sp500"].round(1)
-    # Get output CSV path from config.yaml
-    out_path = os.path.join(os.path.dirname(__file__), "..", get_csv_path())
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    merged.to_csv(out_path, index=False)
-    print(f"Saved {len(merged)} aligned records to {out_path}")
+    return merged
+
+
+def build_datasets(
+    cache_dir: Union[str, Path, None] = None,
+    force_full: bool = False,
+    assets: Optional[Mapping[str, str]] = None,
+) -> Tuple[pd.DataFrame, AlignedMatrix]:
+    """Fetch every configured asset and align it, without writing anything.
+
+    Args:
+        cache_dir: Ticker cache directory (defaults to ``cache_dir`` in config.yaml).
+        force_full: Re-download the full history instead of only the delta.
+        assets: Column name -> ticker mapping (defaults to ``assets`` in
+            config.yaml). Must include ``gold`` and ``sp500``.
+
+    Returns:
+        tuple: The aligned gold / S&P 500 frame (see :func:`align_prices`)
+        and the wide table of every asset that could be fetched.
+
+    Raises:
+        Exception: If gold or the S&P 500 cannot be fetched. Other assets that
+            fail are reported and left out of the wide table.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    assets = dict(assets) if assets else get_assets()
+    errors: Dict[str, Exception] = {}
+    with METRICS.span("preprocess.fetch"):
+        prices = fetch_many_cached(list(assets.values()), cache_dir=cache_dir, force_full=force_full, errors=errors)
+    for name in REQUIRED_ASSETS:
+        if assets[name] in errors:
+            raise errors[assets[name]]
+    for name, ticker in list(assets.items()):
+        if ticker in errors:
+            print(f"Skipping {name} ({ticker}): {errors[ticker]}")
+            del assets[name]
+    with METRICS.span("preprocess.merge"):
+        policy, tolerance = get_alignment()
+        merged = align_prices(prices[assets["gold"]], prices[assets["sp500"]], policy=policy, tolerance=tolerance)
+    with METRICS.span("preprocess.align_assets"):
+        table = align_assets(prices, assets)
+    return merged, table
+
+
+def write_datasets(
+    merged: pd.DataFrame,
+    table: AlignedMatrix,
+    out_path: Union[str, Path],
+    binary_path: Union[str, Path],
+    assets_path: Union[str, Path],
+) -> Dict[str, Path]:
+    """Write the aligned CSV, its binary copy and tiers, and the wide asset table.
+
+    Every file is written next to its target and renamed into place.
+
+    Returns:
+        dict: ``csv``, ``binary``, one entry per tier and ``assets`` -> path.
+    """
+    out_path, binary_path, assets_path = Path(out_path), Path(binary_path), Path(assets_path)
+    os.makedirs(out_path.parent, exist_ok=True)
+    with METRICS.span("preprocess.write_csv"):
+        # Written next to the target and renamed, so running apps never read half a file.
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        merged.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, out_path)
+    # Written after the CSV so the binary copy is never older than it.
+    with METRICS.span("preprocess.write_binary"):
+        write_frame(merged, binary_path)
+    with METRICS.span("preprocess.write_tiers"):
+        tier_paths = write_tiers(merged.assign(date=pd.to_datetime(merged["date"])), binary_path)
+    with METRICS.span("preprocess.write_assets"):
+        write_aligned(assets_path, table)
+    return {"csv": out_path, "binary": binary_path, **tier_paths, "assets": assets_path}
+
+
+def main(
+    out_path: Union[str, Path, None] = None,
+    cache_dir: Union[str, Path, None] = None,
+    force_full: bool = False,
+    binary_path: Union[str, Path, None] = None,
+    assets: Optional[Mapping[str, str]] = None,
+    assets_path: Union[str, Path, None] = None,
+):
+    """
+    Fetches, aligns, and saves gold and S&P 500 historical data.
+
+    Downloads daily prices for every configured asset concurrently, merges gold futures and
+    S&P 500 index prices by date, and writes the aligned data to 'gold_sp500_aligned.csv',
+    its binary columnar sibling and the coarser resolution tiers next to it. All assets are
+    also written as one wide date x asset table for the correlation matrix engine.
+
+    Args:
+        out_path: Output CSV path (defaults to ``csv_path`` in config.yaml).
+        cache_dir: Ticker cache directory (defaults to ``cache_dir`` in config.yaml).
+        force_full: Re-download the full history instead of only the delta.
+        binary_path: Binary dataset path (defaults to ``binary_path`` in
+            config.yaml, or the ``.bin`` sibling of ``out_path``).
+        assets: Column name -> ticker mapping (defaults to ``assets`` in
+            config.yaml). Must include ``gold`` and ``sp500``.
+        assets_path: Wide asset table path (defaults to ``assets_path`` in
+            config.yaml, or ``assets_wide.bin`` next to ``out_path``).
+    """
+    merged, table = build_datasets(cache_dir, force_full, assets)
+    if out_path:
+        out_path = Path(out_path)
+        binary_path = Path(binary_path) if binary_path else default_binary_path(out_path)
+        assets_path = Path(assets_path) if assets_path else out_path.with_name(DEFAULT_ASSETS_FILENAME)
+    else:
+        out_path = PROJECT_ROOT / get_csv_path()
+        binary_path = Path(binary_path) if binary_path else PROJECT_ROOT / get_binary_path()
+        assets_path = Path(assets_path) if assets_path else get_assets_path()
+    paths = write_datasets(merged, table, out_path, binary_path, assets_path)
+    print(f"Saved {len(merged)} aligned records to {out_path} and {binary_path}")
+    for tier, path in paths.items():
+        if tier not in ("csv", "binary", "assets"):
+            print(f"Saved {tier} tier to {path}")
+    print(f"Saved {len(table)} x {len(table.names)} asset table to {assets_path}")
+    for name, gaps in table.gaps.items():
+        print(
+            f"  {name}: {gaps.observations} closes, {gaps.missing} missing days, "
+            f"longest gap {gaps.longest_gap_days} days"
+        )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+"""Incremental on-disk cache for ticker price history.
+
+Each ticker is stored as its own ``.npz`` file (int64 epoch-second timestamps
+plus float64 closes) inside a cache directory. The last row of that file is
+the last cached trading day, so a refresh only has to ask Yahoo Finance for
+``period1 = last_cached_date`` onwards and merge the delta into what is
+already on disk.
+"""
+
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH
+from gold_vs_equities.data import fetch_ticker
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+
+DEFAULT_CACHE_DIR = DEFAULT_CONFIG_PATH.parent / "data" / "cache"
+
+
+def ticker_cache_path(ticker: str, cache_dir: Union[str, Path, None] = None) -> Path:
+    """Return the cache file used for ``ticker``.
+
+    Characters that are awkward in file names (``=``, ``^`` ...) are replaced
+    with underscores, e.g. ``"GC=F"`` is stored as ``GC_F.npz``.
+
+    Args:
+        ticker: Ticker symbol.
+        cache_dir: Cache directory (defaults to ``data/cache``).
+
+    Returns:
+        Path: Location of the per-ticker cache file.
+    """
+    safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+    return Path(cache_dir or DEFAULT_CACHE_DIR) / f"{safe_name}.npz"
+
+
+def load_cached_prices(ticker: str, cache_dir: Union[str, Path, None] = None) -> PriceColumns:
+    """Load the cached price history for ``ticker``.
+
+    Args:
+        ticker: Ticker symbol.
+        cache_dir: Cache directory (defaults to ``data/cache``).
+
+    Returns:
+        PriceColumns: Cached rows sorted by date, empty if the ticker has not
+        been cached yet.
+    """
+    path = ticker_cache_path(ticker, cache_dir)
+    if not path.exists():
+        return PriceColumns.empty()
+    with np.load(path) as data:
+        return PriceColumns(data["timestamps"], data["closes"])
+
+
+def save_cached_prices(ticker: str, prices: PriceColumns, cache_dir: Union[str, Path, None] = None) -> Path:
+    """Atomically write ``prices`` as the cached history for ``ticker``.
+
+    Args:
+        ticker: Ticker symbol.
+        prices: History to store.
+        cache_dir: Cache directory (defaults to ``data/cache``).
+
+    Returns:
+        Path: Location of the written cache file.
+    """
+    path = ticker_cache_path(ticker, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a sibling temp file first so an interrupted run never leaves a
+    # truncated cache behind.
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez(tmp_path, timestamps=prices.timestamps, closes=prices.closes)
+    os.replace(tmp_path, path)
+    return path
+
+
+def merge_prices(cached: PriceColumns, delta: PriceColumns) -> PriceColumns:
+    """Merge freshly fetched rows into cached rows.
+
+    Rows are keyed on their UTC calendar day. Rows in ``delta`` replace cached
+    rows for the same day, since the last cached day may have been stored
+    before the market closed.
+
+    Args:
+        cached: Previously cached rows.
+        delta: Newly fetched rows.
+
+    Returns:
+        PriceColumns: Union of both inputs, sorted by date.
+    """
+    timestamps = np.concatenate([cached.timestamps, delta.timestamps])
+    closes = np.concatenate([cached.closes, delta.closes])
+    days = timestamps // fetch_ticker.SECONDS_PER_DAY
+    # np.unique keeps the first occurrence, so search the reversed arrays to
+    # let the newest row for each day win.
+    _, first_from_end = np.unique(days[::-1], return_index=True)
+    keep = len(days) - 1 - first_from_end
+    return PriceColumns(timestamps[keep], closes[keep])
+
+
+def _last_cached_date(cached: PriceColumns) -> Optional[str]:
+    """Return the last cached day as ``YYYY-MM-DD``, or None if empty."""
+    if not len(cached):
+        return None
+    return str(cached.timestamps[-1:].astype("datetime64[s]").astype("datetime64[D]")[0])
+
+
+def fetch_cached_ticker_prices(
+    ticker: str,
+    cache_dir: Union[str, Path, None] = None,
+    force_full: bool = False,
+    end: Optional[Union[str, date, datetime]] = None,
+    fetcher: Optional[Callable[..., PriceColumns]] = None,
+) -> PriceColumns:
+    """Return the full price history for ``ticker``, downloading only the delta.
+
+    On the first call (or with ``force_full``) the complete history is fetched.
+    Afterwards only rows from the last cached date onwards are requested and
+    merged into the local store.
+
+    Args:
+        ticker: Ticker symbol (e.g., "GC=F", "^GSPC").
+        cache_dir: Cache directory (defaults to ``data/cache``).
+        force_full: Ignore the cache and re-download the whole history.
+        end: Exclusive end date passed through to the fetcher.
+        fetcher: Callable with the signature of
+            :func:`fetch_ticker.fetch_ticker_columns`, mainly for testing.
+
+    Returns:
+        PriceColumns: The merged history.
+    """
+    fetcher = fetcher or fetch_ticker.fetch_ticker_columns
+    cached = PriceColumns.empty() if force_full else load_cached_prices(ticker, cache_dir)
+    delta = fetcher(ticker, start=_last_cached_date(cached), end=end)
+    return _store_delta(ticker, cache_dir, cached, delta)
+
+
+def fetch_many_cached(
+    tickers: Iterable[str],
+    cache_dir: Union[str, Path, None] = None,
+    force_full: bool = False,
+    end: Optional[Union[str, date, datetime]] = None,
+    **kwargs,
+) -> Dict[str, PriceColumns]:
+    """Refresh several cached tickers concurrently.
+
+    Each ticker asks only for its own delta; the requests share one pooled
+    session via :func:`fetch_ticker.fetch_many`.
+
+    Args:
+        tickers: Ticker symbols to refresh.
+        cache_dir: Cache directory (defaults to ``data/cache``).
+        force_full: Ignore the cache and re-download every history.
+        end: Exclusive end date passed through to the fetcher.
+        **kwargs: Extra keyword arguments for :func:`fetch_ticker.fetch_many`.
+            With ``errors`` (a dict), tickers that fail to download are left
+            out of the result instead of raising.
+
+    Returns:
+        dict: Mapping of ticker to its full, merged price history.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    cached = {
+        ticker: PriceColumns.empty() if force_full else load_cached_prices(ticker, cache_dir)
+        for ticker in tickers
+    }
+    starts = {ticker: _last_cached_date(rows) for ticker, rows in cached.items()}
+    deltas = fetch_ticker.fetch_many(tickers, start=starts, end=end, columnar=True, **kwargs)
+    return {ticker: _store_delta(ticker, cache_dir, cached[ticker], deltas[ticker]) for ticker in tickers if ticker in deltas}
+
+
+def _store_delta(
+    ticker: str,
+    cache_dir: Union[str, Path, None],
+    cached: PriceColumns,
+    delta: PriceColumns,
+) -> PriceColumns:
+    """Merge ``delta`` into ``cached`` and persist the result for ``ticker``."""
+    if len(cached) and not len(delta):
+        return cached
+    prices = merge_prices(cached, delta)
+    save_cached_prices(ticker, prices, cache_dir)
+    return prices
@@ -0,0 +1,296 @@
+"""Versioned, atomically published dataset snapshots.
+
+Each refresh of the dataset is written to a hidden temporary directory under
+the snapshot root, validated there, and published in two atomic steps: the
+directory is renamed to its version name, then the ``current`` pointer file
+is replaced to name it. Layout::
+
+    data/snapshots/
+        current                      <- "20260102T030405Z-1a2b3c4d"
+        20260101T030405Z-9f8e7d6c/   <- previous versions, kept for rollback
+        20260102T030405Z-1a2b3c4d/
+            gold_sp500_aligned.csv
+            gold_sp500_aligned.bin
+            gold_sp500_aligned.weekly.bin ...
+            manifest.json
+
+Published directories are never modified, so readers take no locks: they
+read the pointer once (:meth:`SnapshotStore.resolve`) and open files in the
+version it names, which is complete by construction. Old versions beyond
+the retention limit are deleted, but never the current one; on POSIX a
+reader that still has an old file open (or memory-mapped) keeps reading it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH, load_config
+from gold_vs_equities.data.dataset_cache import content_digest
+
+POINTER_NAME = "current"
+MANIFEST_NAME = "manifest.json"
+DEFAULT_KEEP = 5
+_TMP_PREFIX = ".tmp-"
+# Temporary directories older than this are left over from a crashed publish.
+_STALE_TMP_SECONDS = 3600
+
+# Validation defaults (see validate_dataset).
+MIN_ROWS = 2
+MIN_ROW_RATIO = 0.99
+MAX_MOVE = 0.5
+MAX_REVISION = 0.1
+PRICE_COLUMNS = ("gold", "sp500")
+
+
+def get_snapshots_dir() -> Path:
+    """Return the configured snapshot directory (``snapshots_dir`` in config.yaml)."""
+    return DEFAULT_CONFIG_PATH.parent / load_config().get("snapshots_dir", "data/snapshots")
+
+
+class SnapshotError(ValueError):
+    """A new dataset failed validation, or a snapshot does not exist."""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One published version.
+
+    Attributes:
+        version: Directory name, ``<UTC time>-<content digest prefix>``.
+        path: Snapshot directory.
+        manifest: Contents of its ``manifest.json``.
+    """
+
+    version: str
+    path: Path
+    manifest: Dict[str, object]
+
+
+def validate_dataset(
+    frame: pd.DataFrame,
+    previous: Optional[pd.DataFrame] = None,
+    min_rows: int = MIN_ROWS,
+    min_row_ratio: float = MIN_ROW_RATIO,
+    max_move: float = MAX_MOVE,
+    max_revision: float = MAX_REVISION,
+) -> Dict[str, object]:
+    """Check that a freshly built dataset is safe to publish.
+
+    Args:
+        frame: ``date`` plus the ``gold`` and ``sp500`` closes.
+        previous: The dataset currently published, if any.
+        min_rows: Fewest rows accepted.
+        min_row_ratio: Fewest rows accepted, as a fraction of ``previous``.
+        max_move: Largest accepted change between consecutive closes
+            (``0.5`` is 50%); larger jumps are taken as bad data.
+        max_revision: Largest accepted change of a close ``previous``
+            already has for the same date.
+
+    Returns:
+        dict: Row count, first and last date and largest move (for the manifest).
+
+    Raises:
+        SnapshotError: Describing the first check that failed.
+    """
+    missing = [column for column in ("date", *PRICE_COLUMNS) if column not in frame]
+    if missing:
+        raise SnapshotError(f"missing columns: {', '.join(missing)}")
+    rows = len(frame)
+    if rows < min_rows:
+        raise SnapshotError(f"{rows} rows, expected at least {min_rows}")
+    dates = frame["date"].to_numpy(dtype="datetime64[D]")
+    if (np.diff(dates) <= np.timedelta64(0, "D")).any():
+        raise SnapshotError("dates are not strictly increasing")
+
+    largest = 0.0
+    for column in PRICE_COLUMNS:
+        prices = frame[column].to_numpy(dtype=np.float64)
+        if not (np.isfinite(prices) & (prices > 0)).all():
+            raise SnapshotError(f"{column} has missing, infinite or non-positive prices")
+        moves = np.abs(prices[1:] / prices[:-1] - 1.0)
+        if len(moves) and moves.max() > max_move:
+            k = int(np.argmax(moves))
+            raise SnapshotError(f"{column} moved {moves[k]:.0%} on {dates[k + 1]}, more than {max_move:.0%}")
+        largest = max(largest, float(moves.max()) if len(moves) else 0.0)
+
+    if previous is not None and len(previous):
+        if rows < len(previous) * min_row_ratio:
+            raise SnapshotError(f"{rows} rows, down from {len(previous)} in the current snapshot")
+        old_dates = previous["date"].to_numpy(dtype="datetime64[D]")
+        if dates[-1] < old_dates[-1]:
+            raise SnapshotError(f"last date {dates[-1]} is before the current snapshot's {old_dates[-1]}")
+        shared, new_rows, old_rows = np.intersect1d(dates, old_dates, assume_unique=True, return_indices=True)
+        for column in PRICE_COLUMNS:
+            if column not in previous or not len(shared):
+                continue
+            new = frame[column].to_numpy(dtype=np.float64)[new_rows]
+            old = previous[column].to_numpy(dtype=np.float64)[old_rows]
+            revisions = np.abs(new / old - 1.0)
+            if np.nanmax(revisions) > max_revision:
+                k = int(np.nanargmax(revisions))
+                raise SnapshotError(f"{column} on {shared[k]} changed from {old[k]} to {new[k]}")
+
+    return {
+        "rows": rows,
+        "first_date": str(dates[0]),
+        "last_date": str(dates[-1]),
+        "largest_move": largest,
+    }
+
+
+def _files_digest(files: Mapping[str, Mapping[str, object]]) -> str:
+    """Digest identifying a set of files by name and content digest."""
+    token = "|".join(f"{name}:{info['digest']}" for name, info in sorted(files.items()))
+    return hashlib.sha1(token.encode()).hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """Directory of versioned dataset snapshots with a ``current`` pointer.
+
+    Args:
+        root: Snapshot directory (created on first publish).
+        keep: Most versions kept; older ones are deleted after a publish.
+    """
+
+    def __init__(self, root: Union[str, Path], keep: int = DEFAULT_KEEP):
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.root = Path(root)
+        self.keep = keep
+
+    @property
+    def pointer(self) -> Path:
+        """The pointer file naming the current version."""
+        return self.root / POINTER_NAME
+
+    def current(self) -> Optional[str]:
+        """Return the current version, or None before the first publish."""
+        try:
+            version = self.pointer.read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first."""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(_TMP_PREFIX))
+
+    def get(self, version: str) -> Snapshot:
+        """Return a published snapshot.
+
+        Raises:
+            SnapshotError: If ``version`` does not exist.
+        """
+        path = self.root / version
+        try:
+            manifest = json.loads((path / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            raise SnapshotError(f"no snapshot {version!r} in {self.root}") from None
+        return Snapshot(version, path, manifest)
+
+    def resolve(self, *paths: Union[str, Path]) -> Tuple[Path, ...]:
+        """Map dataset paths to their copies in the current snapshot.
+
+        The pointer is read once, so all paths come from the same version. A
+        path is returned unchanged when there is no current snapshot or the
+        snapshot has no file of that name.
+        """
+        version = self.current()
+        resolved = []
+        for path in paths:
+            path = Path(path)
+            candidate = self.root / version / path.name if version else None
+            resolved.append(candidate if candidate is not None and candidate.exists() else path)
+        return tuple(resolved)
+
+    def publish(
+        self,
+        write: Callable[[Path], Mapping[str, object]],
+        now: Optional[datetime] = None,
+    ) -> Optional[Snapshot]:
+        """Build a new version and make it current.
+
+        Args:
+            write: Called with an empty temporary directory; writes the
+                dataset files into it, validates them and returns extra
+                manifest fields. Raising aborts the publish and leaves the
+                current version untouched.
+            now: Publish time (defaults to the current UTC time).
+
+        Returns:
+            Snapshot: The new current snapshot, or None if the files are
+            identical to the current version (nothing is published).
+        """
+        now = now or datetime.now(timezone.utc)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.root / f"{_TMP_PREFIX}{os.getpid()}-{uuid.uuid4().hex}"
+        tmp_dir.mkdir()
+        try:
+            info = dict(write(tmp_dir))
+            files = {p.name: {"bytes": p.stat().st_size, "digest": content_digest(p)} for p in sorted(tmp_dir.iterdir())}
+            digest = _files_digest(files)
+            current = self.current()
+            if current is not None and self.get(current).manifest.get("digest") == digest:
+                return None
+            version = f"{now.strftime('%Y%m%dT%H%M%SZ')}-{digest[:8]}"
+            manifest = {"version": version, "created": now.isoformat(), "digest": digest, "files": files, **info}
+            (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+            os.replace(tmp_dir, self.root / version)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.activate(version)
+        self.prune()
+        return self.get(version)
+
+    def activate(self, version: str) -> Snapshot:
+        """Point ``current`` at a published version (e.g. to roll back).
+
+        Raises:
+            SnapshotError: If ``version`` does not exist.
+        """
+        snapshot = self.get(version)
+        _write_atomic(self.pointer, version + "\n")
+        return snapshot
+
+    def prune(self) -> List[str]:
+        """Delete all but the newest :attr:`keep` versions (never the current one).
+
+        Temporary directories left behind by a crashed publish are removed too.
+
+        Returns:
+            list: The deleted versions.
+        """
+        current = self.current()
+        versions = self.versions()
+        removed = [v for v in versions[: max(len(versions) - self.keep, 0)] if v != current]
+        for version in removed:
+            shutil.rmtree(self.root / version, ignore_errors=True)
+        cutoff = time.time() - _STALE_TMP_SECONDS
+        for path in self.root.glob(f"{_TMP_PREFIX}*"):
+            if path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        return removed
+
@@ -0,0 +1,185 @@
+"""Immutable date-sorted columns with binary-search range slicing.
+
+The dashboard asks for one date range per interaction. Evaluating
+``(df["date"] >= start) & (df["date"] <= end)`` and copying the selected rows
+costs time and memory proportional to the whole dataset on every rerun.
+:class:`SortedFrame` instead keeps each column as one read-only NumPy array
+sorted by date; a range resolves to row bounds with two ``searchsorted``
+calls and :class:`RangeView` hands out slices of the original arrays, so a
+selection allocates nothing however long the history is. Derived series such
+as the base-100 index are computed on first use and cached on the view.
+"""
+
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.data.columnar import DATE_COLUMN
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+def _as_datetime64(value, unit: str) -> np.datetime64:
+    if isinstance(value, pd.Timestamp):
+        value = value.to_datetime64()
+    return np.datetime64(value, unit)
+
+
+class SortedFrame(Mapping[str, np.ndarray]):
+    """Read-only columns sharing one sorted ``datetime64`` date axis.
+
+    Behaves like a mapping of column name to array, like
+    :class:`~gold_vs_equities.data.columnar.ColumnarDataset` (the date column
+    is available as :attr:`dates`, the row count as :attr:`rows`). Arrays
+    are not copied when they already have the right dtype, and every array
+    handed out is marked read-only.
+
+    Args:
+        dates: Sorted dates (anything ``np.asarray`` turns into ``datetime64``).
+        columns: Mapping of column name to values of the same length.
+
+    Raises:
+        ValueError: If the dates are not sorted or a column has the wrong length.
+    """
+
+    def __init__(self, dates, columns: Mapping[str, np.ndarray]):
+        dates = np.asarray(dates)
+        if dates.dtype.kind != "M":
+            dates = dates.astype("datetime64[ns]")
+        if len(dates) > 1 and (dates[1:] < dates[:-1]).any():
+            raise ValueError("dates must be sorted in ascending order")
+        self._dates = _read_only(dates)
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if len(values) != len(dates):
+                raise ValueError(f"Column {name!r} has {len(values)} rows, expected {len(dates)}")
+            self._columns[name] = _read_only(values)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_col: str = DATE_COLUMN) -> "SortedFrame":
+        """Wrap a DataFrame's columns (sorting by date first if needed)."""
+        if not df[date_col].is_monotonic_increasing:
+            df = df.sort_values(date_col, kind="stable")
+        columns = {name: df[name].to_numpy() for name in df.columns if name != date_col}
+        return cls(df[date_col].to_numpy(), columns)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """The sorted date axis."""
+        return self._dates
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    @property
+    def rows(self) -> int:
+        """Number of rows."""
+        return len(self._dates)
+
+    def bounds(self, start=None, end=None) -> Tuple[int, int]:
+        """Return row bounds ``[i, j)`` of the inclusive range ``start .. end``.
+
+        ``None`` leaves that side of the range open.
+        """
+        unit = np.datetime_data(self._dates.dtype)[0]
+        i = 0 if start is None else int(np.searchsorted(self._dates, _as_datetime64(start, unit), side="left"))
+        j = self.rows if end is None else int(np.searchsorted(self._dates, _as_datetime64(end, unit), side="right"))
+        return i, max(i, j)
+
+    def range(self, start=None, end=None) -> "RangeView":
+        """Return a zero-copy view of the rows dated ``start .. end`` (inclusive)."""
+        return RangeView(self, *self.bounds(start, end))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the data as a DataFrame (columns wrap the arrays without copying)."""
+        return self.range().to_frame()
+
+
+class RangeView:
+    """Rows ``start:stop`` of a :class:`SortedFrame`, without copying.
+
+    ``view[name]`` returns a column slice and ``len(view)`` the row count.
+
+    Attributes:
+        frame: The underlying frame.
+        start: First row (inclusive).
+        stop: Last row (exclusive).
+    """
+
+    def __init__(self, frame: SortedFrame, start: int, stop: int):
+        self.frame = frame
+        self.start = start
+        self.stop = stop
+        self._derived: Dict[tuple, np.ndarray] = {}
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Dates of the rows in the range."""
+        return self.frame.dates[self.start : self.stop]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.frame[name][self.start : self.stop]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.frame
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Column names (excluding the date)."""
+        return tuple(self.frame)
+
+    def first(self, name: str):
+        """Value of ``name`` in the first row of the range."""
+        return self.frame[name][self.start]
+
+    def last(self, name: str):
+        """Value of ``name`` in the last row of the range."""
+        return self.frame[name][self.stop - 1]
+
+    def first_date(self) -> pd.Timestamp:
+        """Date of the first row of the range."""
+        return pd.Timestamp(self.frame.dates[self.start])
+
+    def last_date(self) -> pd.Timestamp:
+        """Date of the last row of the range."""
+        return pd.Timestamp(self.frame.dates[self.stop - 1])
+
+    def pct_change(self, name: str) -> float:
+        """Percentage change of ``name`` from the first to the last row."""
+        first = self.first(name)
+        return float(100 * (self.last(name) - first) / first)
+
+    def indexed(self, name: str, base: float = 100.0) -> np.ndarray:
+        """``name`` rescaled so the first row equals ``base``; computed once per view.
+
+        Returns:
+            np.ndarray: A read-only array of ``len(view)`` values.
+        """
+        key = ("indexed", name, base)
+        values = self._derived.get(key)
+        if values is None:
+            column = self[name]
+            values = self._derived[key] = _read_only(base * column / column[0] if len(column) else column.astype(float))
+        return values
+
+    def to_frame(self, columns: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+        """Return the range as a DataFrame (wrapping the views without copying)."""
+        names = self.columns if columns is None else columns
+        data = {DATE_COLUMN: self.dates}
+        data.update((name, self[name]) for name in names)
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,105 @@
+"""Seeded synthetic gold / equity price series for benchmarks and tests.
+
+Prices follow two geometric random walks whose log returns have a chosen
+correlation, so every statistic the dashboard computes has a known target.
+The same ``(rows, seed)`` always produces the same data.
+
+Rows are one calendar day apart while that fits between 1971 and the end of
+the ``datetime64[ns]`` range (about 106k rows). Larger series keep the same
+span and shrink the spacing to an intraday interval, so several rows then
+share a calendar day; code keyed by calendar day (the CSV merge in
+:mod:`gold_vs_equities.data.preprocess`) is limited to
+:data:`MAX_CALENDAR_DAY_ROWS`.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+
+# Named sizes used by the benchmark suite.
+SIZES: Dict[str, int] = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+START = np.datetime64("1971-01-01T00:00:00", "s")
+END = np.datetime64("2261-12-31T00:00:00", "s")
+SECONDS_PER_DAY = 86_400
+MAX_CALENDAR_DAY_ROWS = int((END - START) // np.timedelta64(1, "D")) + 1
+
+
+def parse_size(size: str) -> int:
+    """Return the row count for a named size (``"1M"``) or a plain integer string."""
+    if size in SIZES:
+        return SIZES[size]
+    return int(size)
+
+
+def synthetic_timestamps(rows: int) -> np.ndarray:
+    """Return ``rows`` increasing UTC epoch seconds starting at 1971-01-01."""
+    span = int((END - START) // np.timedelta64(1, "s"))
+    step = SECONDS_PER_DAY if rows <= MAX_CALENDAR_DAY_ROWS else span // max(rows - 1, 1)
+    return START.astype(np.int64) + step * np.arange(rows, dtype=np.int64)
+
+
+def synthetic_columns(
+    rows: int,
+    seed: int = 0,
+    correlation: float = 0.5,
+    volatility: Tuple[float, float] = (0.010, 0.012),
+    drift: Tuple[float, float] = (0.0001, 0.00015),
+) -> Tuple[PriceColumns, PriceColumns]:
+    """Generate correlated gold and equity histories.
+
+    Drift and volatility are per day and scaled to the row spacing, so the
+    price level stays finite however many intraday rows are generated.
+
+    Args:
+        rows: Number of observations.
+        seed: Random seed.
+        correlation: Correlation of the two log-return series.
+        volatility: Daily log-return standard deviation of (gold, equity).
+        drift: Daily mean log return of (gold, equity).
+
+    Returns:
+        tuple: ``(gold, equity)`` :class:`PriceColumns` sharing timestamps.
+    """
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((rows, 2))
+    shocks[:, 1] = correlation * shocks[:, 0] + np.sqrt(1.0 - correlation ** 2) * shocks[:, 1]
+    timestamps = synthetic_timestamps(rows)
+    days_per_row = (timestamps[1] - timestamps[0]) / SECONDS_PER_DAY if rows > 1 else 1.0
+    log_returns = np.asarray(drift) * days_per_row + shocks * (np.asarray(volatility) * np.sqrt(days_per_row))
+    prices = np.array([40.0, 90.0]) * np.exp(np.cumsum(log_returns, axis=0))
+    return PriceColumns(timestamps, prices[:, 0].copy()), PriceColumns(timestamps, prices[:, 1].copy())
+
+
+def synthetic_prices(rows: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """Return a synthetic aligned dataset with ``date``, ``gold`` and ``sp500``.
+
+    Keyword arguments are passed to :func:`synthetic_columns`.
+    """
+    gold, sp500 = synthetic_columns(rows, seed=seed, **kwargs)
+    dates = gold.timestamps.astype("datetime64[s]").astype("datetime64[ns]")
+    return pd.DataFrame({"date": dates, "gold": gold.closes, "sp500": sp500.closes})
+
+
+def chart_payload(columns: PriceColumns, missing_fraction: float = 0.01, seed: int = 0) -> dict:
+    """Build a ``v8/finance/chart`` style payload, as the fetcher receives it.
+
+    A ``missing_fraction`` of closes is replaced by ``null`` like the gaps in
+    real responses.
+    """
+    closes = columns.closes.tolist()
+    rng = np.random.default_rng(seed)
+    for row in np.flatnonzero(rng.random(len(closes)) < missing_fraction).tolist():
+        closes[row] = None
+    return {
+        "chart": {
+            "result": [
+                {
+                    "timestamp": columns.timestamps.tolist(),
+                    "indicators": {"quote": [{"close": closes}]},
+                }
+            ]
+        }
+    }
@@ -0,0 +1,233 @@
+"""Multi-resolution (daily / weekly / monthly / yearly) views of the dataset.
+
+Preprocessing writes the aligned daily rows plus pre-aggregated tiers, one
+columnar file per tier next to the main binary::
+
+    gold_sp500_aligned.bin           daily (the base dataset)
+    gold_sp500_aligned.weekly.bin    last close of each Monday-based week
+    gold_sp500_aligned.monthly.bin   last close of each calendar month
+    gold_sp500_aligned.yearly.bin    last close of each calendar year
+
+Every aggregated row keeps the date of the observation it was taken from, so
+all tiers share one date axis. :class:`MultiResolutionDataset` loads the
+tiers and picks the coarsest one that still has enough rows for a date range;
+long ranges stay on a few hundred monthly rows and only short ranges touch the
+daily data.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.data.columnar import (
+    DATE_COLUMN,
+    ColumnarDataset,
+    default_binary_path,
+    load_dataset,
+    to_epoch_days,
+    write_frame,
+)
+
+TIER_NAMES = ("daily", "weekly", "monthly", "yearly")
+PERIODS_PER_YEAR = {"daily": 252, "weekly": 52, "monthly": 12, "yearly": 1}
+DEFAULT_MIN_POINTS = 100
+
+# Largest median spacing (in days) still classified as each tier.
+_MAX_MEDIAN_SPACING = {"daily": 4, "weekly": 10, "monthly": 62}
+
+
+def period_keys(dates, tier: str) -> np.ndarray:
+    """Return an integer period number per date for ``tier``.
+
+    Args:
+        dates: Sorted dates (anything :func:`to_epoch_days` accepts).
+        tier: One of :data:`TIER_NAMES`.
+
+    Returns:
+        np.ndarray: int64 keys; rows in the same period share a key.
+    """
+    days = to_epoch_days(dates).astype(np.int64)
+    if tier == "daily":
+        return days
+    if tier == "weekly":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday.
+        return (days + 3) // 7
+    if tier == "monthly":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    if tier == "yearly":
+        return days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64)
+    raise ValueError(f"Unknown tier: {tier!r}")
+
+
+def aggregate_last(df: pd.DataFrame, tier: str) -> pd.DataFrame:
+    """Keep the last row of every ``tier`` period of a date-sorted frame."""
+    keys = period_keys(df[DATE_COLUMN].to_numpy(), tier)
+    if len(keys) == 0:
+        return df.iloc[:0]
+    last_rows = np.flatnonzero(np.append(keys[1:] != keys[:-1], True))
+    return df.iloc[last_rows].reset_index(drop=True)
+
+
+def detect_base_tier(dates) -> str:
+    """Classify a date column by its median spacing."""
+    days = to_epoch_days(dates)
+    if len(days) < 2:
+        return TIER_NAMES[0]
+    spacing = float(np.median(np.diff(days)))
+    for tier, limit in _MAX_MEDIAN_SPACING.items():
+        if spacing <= limit:
+            return tier
+    return "yearly"
+
+
+def months_to_rows(months: int, tier: str) -> int:
+    """Convert a window length in months to a row count for ``tier``."""
+    return int(round(months * PERIODS_PER_YEAR[tier] / 12))
+
+
+def tier_path(binary_path: Union[str, Path], tier: str) -> Path:
+    """Return the file holding ``tier`` for the dataset at ``binary_path``."""
+    binary_path = Path(binary_path)
+    if tier == TIER_NAMES[0]:
+        return binary_path
+    return binary_path.with_name(f"{binary_path.stem}.{tier}{binary_path.suffix}")
+
+
+def _base_signature(base: pd.DataFrame) -> Dict[str, object]:
+    dates = base[DATE_COLUMN]
+    return {
+        "base_rows": len(base),
+        "base_first": str(dates.iloc[0].date()) if len(base) else None,
+        "base_last": str(dates.iloc[-1].date()) if len(base) else None,
+    }
+
+
+def build_tiers(base: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Aggregate ``base`` into every tier at or above its own resolution."""
+    base_tier = detect_base_tier(base[DATE_COLUMN].to_numpy())
+    held = TIER_NAMES[TIER_NAMES.index(base_tier):]
+    tiers = {base_tier: base}
+    for tier in held[1:]:
+        tiers[tier] = aggregate_last(base, tier)
+    return tiers
+
+
+def write_tiers(base: pd.DataFrame, binary_path: Union[str, Path]) -> Dict[str, Path]:
+    """Write the aggregated tiers of ``base`` next to ``binary_path``.
+
+    The base dataset itself is expected at ``binary_path`` already; only the
+    coarser tiers are written here. Each file records the base row count and
+    date bounds so readers can tell when it no longer matches the base.
+
+    Returns:
+        dict: Tier name to written path.
+    """
+    signature = _base_signature(base)
+    paths = {}
+    for tier, frame in build_tiers(base).items():
+        if frame is base:
+            continue
+        paths[tier] = write_frame(frame, tier_path(binary_path, tier), metadata={"tier": tier, **signature})
+    return paths
+
+
+class MultiResolutionDataset:
+    """The dataset at several resolutions, with automatic tier selection.
+
+    Args:
+        tiers: Mapping of tier name to date-sorted frame, finest first.
+    """
+
+    def __init__(self, tiers: Mapping[str, pd.DataFrame]):
+        if not tiers:
+            raise ValueError("at least one tier is required")
+        unknown = set(tiers) - set(TIER_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown tiers: {sorted(unknown)}")
+        self._frames = {tier: tiers[tier] for tier in TIER_NAMES if tier in tiers}
+        self._dates = {tier: frame[DATE_COLUMN].to_numpy(dtype="datetime64[D]") for tier, frame in self._frames.items()}
+
+    @classmethod
+    def from_frame(cls, base: pd.DataFrame) -> "MultiResolutionDataset":
+        """Aggregate every tier from ``base`` in memory."""
+        return cls(build_tiers(base))
+
+    @classmethod
+    def load(
+        cls,
+        csv_path: Union[str, Path],
+        binary_path: Optional[Union[str, Path]] = None,
+    ) -> "MultiResolutionDataset":
+        """Load the base dataset and its pre-aggregated tier files.
+
+        Tier files that are missing or were built from a different base are
+        re-aggregated in memory instead.
+
+        Args:
+            csv_path: Path to the aligned CSV.
+            binary_path: Path to the base columnar file (defaults to the CSV's
+                ``.bin`` sibling).
+        """
+        binary_path = Path(binary_path) if binary_path else default_binary_path(csv_path)
+        base = load_dataset(csv_path, binary_path)
+        signature = _base_signature(base)
+        base_tier = detect_base_tier(base[DATE_COLUMN].to_numpy())
+        tiers = {base_tier: base}
+        for tier in TIER_NAMES[TIER_NAMES.index(base_tier) + 1 :]:
+            stored = cls._read_tier(tier_path(binary_path, tier), tier, signature)
+            tiers[tier] = stored if stored is not None else aggregate_last(base, tier)
+        return cls(tiers)
+
+    @staticmethod
+    def _read_tier(path: Path, tier: str, signature: Mapping[str, object]) -> Optional[pd.DataFrame]:
+        try:
+            stored = ColumnarDataset(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        metadata = stored.metadata
+        if metadata.get("tier") != tier or any(metadata.get(k) != v for k, v in signature.items()):
+            return None
+        return stored.to_frame()
+
+    @property
+    def tiers(self) -> tuple:
+        """Held tier names, finest first."""
+        return tuple(self._frames)
+
+    @property
+    def base_tier(self) -> str:
+        """The finest tier held (the resolution of the underlying data)."""
+        return self.tiers[0]
+
+    @property
+    def base(self) -> pd.DataFrame:
+        """The finest-resolution frame."""
+        return self._frames[self.base_tier]
+
+    def frame(self, tier: str) -> pd.DataFrame:
+        """Return the frame for ``tier``."""
+        return self._frames[tier]
+
+    def map(self, func: Callable[[pd.DataFrame], pd.DataFrame]) -> "MultiResolutionDataset":
+        """Return a new dataset with ``func`` applied to every tier."""
+        return MultiResolutionDataset({tier: func(frame) for tier, frame in self._frames.items()})
+
+    def count(self, tier: str, start, end) -> int:
+        """Number of ``tier`` rows dated within ``start..end`` inclusive."""
+        dates = self._dates[tier]
+        i = np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        j = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return int(max(j - i, 0))
+
+    def select_tier(self, start, end, min_points: int = DEFAULT_MIN_POINTS) -> str:
+        """Pick the coarsest tier with at least ``min_points`` rows in range.
+
+        Falls back to the base tier when even that has fewer rows. Costs two
+        binary searches per tier.
+        """
+        for tier in reversed(self.tiers):
+            if self.count(tier, start, end) >= min_points:
+                return tier
+        return self.base_tier
@@ -0,0 +1,186 @@
+"""Scheduled dataset refresh into versioned snapshots.
+
+Each run fetches and aligns every configured asset (see
+:mod:`gold_vs_equities.data.preprocess`), writes the dataset into a temporary
+snapshot directory, validates it against the current version (row counts,
+strictly increasing dates, positive prices, no implausible jumps or large
+revisions of published closes) and only then publishes it atomically (see
+:mod:`gold_vs_equities.data.snapshots`). A failed fetch or validation leaves
+the current version in place, and the next run tries again.
+
+Usage::
+
+    python -m gold_vs_equities.cli refresh [--interval MINUTES] [--once] [--keep N]
+    python -m gold_vs_equities.cli refresh --list
+    python -m gold_vs_equities.cli refresh --activate VERSION
+"""
+
+import argparse
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+from gold_vs_equities.data import preprocess
+from gold_vs_equities.data.columnar import default_binary_path, load_dataset
+from gold_vs_equities.data.snapshots import (
+    DEFAULT_KEEP,
+    Snapshot,
+    SnapshotError,
+    SnapshotStore,
+    get_snapshots_dir,
+    validate_dataset,
+)
+from gold_vs_equities.utils.metrics import METRICS
+
+DEFAULT_INTERVAL_MINUTES = 60.0
+
+
+def load_current(store: SnapshotStore, csv_path: Path, binary_path: Path) -> Optional[pd.DataFrame]:
+    """Load the dataset readers currently see (from the current snapshot, or
+    the un-versioned files written by ``preprocess``), or None if there is none."""
+    csv_path, binary_path = store.resolve(csv_path, binary_path)
+    if not csv_path.exists() and not binary_path.exists():
+        return None
+    return load_dataset(csv_path, binary_path)
+
+
+def refresh_once(
+    store: SnapshotStore,
+    cache_dir: Union[str, Path, None] = None,
+    force_full: bool = False,
+    csv_path: Union[str, Path, None] = None,
+    binary_path: Union[str, Path, None] = None,
+    assets_path: Union[str, Path, None] = None,
+) -> Optional[Snapshot]:
+    """Fetch, validate and publish one new dataset version.
+
+    Args:
+        store: Snapshot store to publish into.
+        cache_dir: Ticker cache directory (defaults to ``cache_dir`` in config.yaml).
+        force_full: Re-download the full history instead of only the delta.
+        csv_path: Dataset CSV path (defaults to ``csv_path`` in config.yaml).
+            Snapshot files take the names of these paths, and the files at
+            these paths are the baseline until the first snapshot exists.
+        binary_path: Binary dataset path (defaults to ``binary_path`` in
+            config.yaml, or the ``.bin`` sibling of ``csv_path``).
+        assets_path: Wide asset table path (defaults to ``assets_path`` in
+            config.yaml, or ``assets_wide.bin`` next to ``csv_path``).
+
+    Returns:
+        Snapshot: The published snapshot, or None if the data is unchanged.
+
+    Raises:
+        SnapshotError: If the new dataset fails validation (nothing is published).
+    """
+    if csv_path:
+        csv_path = Path(csv_path)
+        binary_path = Path(binary_path) if binary_path else default_binary_path(csv_path)
+        assets_path = Path(assets_path) if assets_path else csv_path.with_name(preprocess.DEFAULT_ASSETS_FILENAME)
+    else:
+        csv_path = preprocess.PROJECT_ROOT / preprocess.get_csv_path()
+        binary_path = Path(binary_path) if binary_path else preprocess.PROJECT_ROOT / preprocess.get_binary_path()
+        assets_path = Path(assets_path) if assets_path else preprocess.get_assets_path()
+    merged, table = preprocess.build_datasets(cache_dir, force_full)
+    previous = load_current(store, csv_path, binary_path)
+
+    def write(directory: Path) -> Dict[str, object]:
+        paths = preprocess.write_datasets(
+            merged, table, directory / csv_path.name, directory / binary_path.name, directory / assets_path.name
+        )
+        # Validate what was written, read back from the temporary files.
+        written = load_dataset(paths["csv"], paths["binary"])
+        if len(written) != len(merged) or len(pd.read_csv(paths["csv"], usecols=["date"])) != len(merged):
+            raise SnapshotError(f"wrote {len(written)} rows, expected {len(merged)}")
+        return validate_dataset(written, previous)
+
+    with METRICS.span("refresh.publish"):
+        return store.publish(write)
+
+
+def run_daemon(store: SnapshotStore, interval: float, stop: threading.Event, **options) -> int:
+    """Refresh every ``interval`` seconds until ``stop`` is set.
+
+    Runs start on a fixed schedule; runs missed while a slow one was still
+    going are skipped rather than bunched up. ``options`` are passed to
+    :func:`refresh_once`.
+
+    Returns:
+        int: Number of failed runs.
+    """
+    failures = 0
+    next_run = time.monotonic()
+    while not stop.is_set():
+        try:
+            _print_outcome(refresh_once(store, **options), store)
+        except Exception as exc:  # a bad run must not stop the daemon
+            failures += 1
+            print(f"Refresh failed, keeping {store.current() or 'the current dataset'}: {exc}")
+        now = time.monotonic()
+        while next_run <= now:
+            next_run += interval
+        stop.wait(next_run - now)
+    return failures
+
+
+def _print_outcome(snapshot: Optional[Snapshot], store: SnapshotStore) -> None:
+    """Print the outcome of one refresh."""
+    if snapshot is None:
+        print(f"Data unchanged; {store.current()} stays current")
+        return
+    manifest = snapshot.manifest
+    print(f"Published {snapshot.version}: {manifest['rows']} rows, {manifest['first_date']} to {manifest['last_date']}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for ``cli refresh``."""
+    parser = argparse.ArgumentParser(prog="gold_vs_equities.cli refresh", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL_MINUTES, help="minutes between runs (default: 60)"
+    )
+    parser.add_argument("--once", action="store_true", help="refresh once and exit")
+    parser.add_argument("--full", action="store_true", help="re-download full histories (with --once)")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="versions to keep (default: 5)")
+    parser.add_argument("--list", action="store_true", help="list the published versions and exit")
+    parser.add_argument("--activate", metavar="VERSION", help="make an existing version current (roll back) and exit")
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.full and not args.once:
+        parser.error("--full requires --once")
+    store = SnapshotStore(get_snapshots_dir(), keep=args.keep)
+
+    if args.list:
+        current = store.current()
+        for version in store.versions():
+            manifest = store.get(version).manifest
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {manifest.get('rows')} rows, last date {manifest.get('last_date')}")
+        return 0
+    if args.activate:
+        try:
+            store.activate(args.activate)
+        except SnapshotError as exc:
+            print(exc)
+            return 1
+        print(f"{args.activate} is now current")
+        return 0
+    if args.once:
+        try:
+            _print_outcome(refresh_once(store, force_full=args.full), store)
+        except Exception as exc:
+            print(f"Refresh failed, keeping {store.current() or 'the current dataset'}: {exc}")
+            return 1
+        return 0
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"Refreshing every {args.interval:g} minutes into {store.root} (Ctrl+C to stop)")
+    try:
+        run_daemon(store, args.interval * 60, stop)
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,285 @@
+"""Headless batch report over every preset range, rolling window and asset pair.
+
+The report answers, without a browser, the questions the dashboard answers
+interactively: correlation, p-value and regression fit for every preset date
+range, plus summary statistics of every rolling-correlation window, for every
+pair of assets.
+
+Work is split by asset pair. Each worker process memory-maps the dataset once
+(see :mod:`gold_vs_equities.data.columnar`), builds the prefix-sum index and
+rolling table for a pair, then answers every preset from them, so the whole
+grid costs roughly ``O(pairs * rows * windows)``.
+
+Usage::
+
+    python -m gold_vs_equities.cli report [--out PATH] [--charts DIR] [--workers N]
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import date, datetime, timezone
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH, load_config
+from gold_vs_equities.core.presets import PRESET_RANGES, ROLLING_WINDOW_MONTHS, preset_range
+from gold_vs_equities.core.rolling import RollingCorrelationTable
+from gold_vs_equities.core.stats_index import PrefixStatsIndex
+from gold_vs_equities.data.columnar import ColumnarDataset, dataset_version, load_dataset
+from gold_vs_equities.data.snapshots import SnapshotStore, get_snapshots_dir
+from gold_vs_equities.data.tiers import detect_base_tier, months_to_rows
+
+PROJECT_ROOT = DEFAULT_CONFIG_PATH.parent
+DEFAULT_REPORT_PATH = PROJECT_ROOT / "data" / "report.json"
+
+# Per-process state, set by _init_worker (or directly when running inline).
+_FRAME: Optional[pd.DataFrame] = None
+_RANGES: Dict[str, Tuple[date, date]] = {}
+_WINDOWS: Tuple[int, ...] = ()
+
+
+def load_report_frame(
+    csv_path: Union[str, Path],
+    binary_path: Union[str, Path, None] = None,
+    assets_path: Union[str, Path, None] = None,
+) -> pd.DataFrame:
+    """Load the data a report runs on.
+
+    The wide multi-asset table is used when it exists; otherwise the aligned
+    gold / S&P 500 dataset.
+
+    Returns:
+        pd.DataFrame: ``date`` plus one column per asset.
+    """
+    if assets_path and Path(assets_path).exists():
+        return ColumnarDataset(assets_path).to_frame()
+    return load_dataset(csv_path, binary_path)
+
+
+def _init_worker(source: Tuple, ranges: Dict[str, Tuple[date, date]], windows: Tuple[int, ...]) -> None:
+    global _FRAME, _RANGES, _WINDOWS
+    _FRAME = load_report_frame(*source)
+    _RANGES = ranges
+    _WINDOWS = windows
+
+
+def _rolling_summary(values: np.ndarray) -> Dict[str, float]:
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        nan = float("nan")
+        return {"mean": nan, "min": nan, "max": nan, "last": nan}
+    return {
+        "mean": float(finite.mean()),
+        "min": float(finite.min()),
+        "max": float(finite.max()),
+        "last": float(finite[-1]),
+    }
+
+
+def evaluate_pair(pair: Tuple[str, str]) -> List[Dict[str, object]]:
+    """Evaluate every preset and window for one asset pair.
+
+    Rows where either asset is missing are dropped first, so each pair uses
+    its own overlapping history.
+
+    Returns:
+        list: One flat record per preset.
+    """
+    x_name, y_name = pair
+    frame = _FRAME[["date", x_name, y_name]].dropna()
+    dates = frame["date"].to_numpy(dtype="datetime64[D]")
+    x = frame[x_name].to_numpy(dtype=np.float64)
+    y = frame[y_name].to_numpy(dtype=np.float64)
+    index = PrefixStatsIndex(dates, x, y)
+    tier = detect_base_tier(dates)
+    window_rows = {months: months_to_rows(months, tier) for months in _WINDOWS}
+    table = RollingCorrelationTable(x, y, windows=[w for w in window_rows.values() if w >= 2])
+
+    records = []
+    for preset, (start, end) in _RANGES.items():
+        i, j = index.bounds(start, end)
+        record: Dict[str, object] = {"preset": preset, "start": str(start), "end": str(end), "x": x_name, "y": y_name}
+        record.update(asdict(index.query_positions(i, j)))
+        for months, rows in window_rows.items():
+            values = table.get(rows, i, j) if rows >= 2 else np.empty(0)
+            for stat, value in _rolling_summary(values).items():
+                record[f"rolling_{months}m_{stat}"] = value
+        records.append(record)
+    return records
+
+
+def _render_preset_chart(task: Tuple[str, str, str, str]) -> str:
+    """Draw the indexed price and rolling correlation chart for one preset."""
+    from matplotlib.figure import Figure
+
+    from gold_vs_equities.viz.downsample import downsample
+
+    preset, x_name, y_name, out_dir = task
+    start, end = _RANGES[preset]
+    frame = _FRAME[["date", x_name, y_name]].dropna()
+    frame = frame[(frame["date"] >= pd.Timestamp(start)) & (frame["date"] <= pd.Timestamp(end))]
+    dates = frame["date"].to_numpy()
+    months = 12 if 12 in _WINDOWS else _WINDOWS[0]
+    rows = max(months_to_rows(months, detect_base_tier(dates)), 2)
+
+    fig = Figure(figsize=(12, 8))
+    price_ax, rolling_ax = fig.subplots(2, 1, sharex=True)
+    for name in (x_name, y_name):
+        values = frame[name].to_numpy()
+        price_ax.plot(*downsample(dates, 100 * values / values[0]), label=name)
+    price_ax.set_ylabel("Indexed Value (Start = 100)")
+    price_ax.set_title(f"{x_name} vs {y_name}: {preset}")
+    price_ax.legend(loc="best")
+    price_ax.grid(True, alpha=0.3, linestyle="--")
+
+    rolling = RollingCorrelationTable(frame[x_name].to_numpy(), frame[y_name].to_numpy(), windows=[rows]).get(rows)
+    rolling_ax.plot(*downsample(dates, rolling), color="darkgreen", label=f"{months}-month rolling correlation")
+    rolling_ax.axhline(0, color="black", linestyle="--", linewidth=1, alpha=0.5)
+    rolling_ax.set_ylim(-1, 1)
+    rolling_ax.set_ylabel("Correlation Coefficient")
+    rolling_ax.legend(loc="best")
+    rolling_ax.grid(True, alpha=0.3, linestyle="--")
+    fig.tight_layout()
+
+    slug = preset.lower().replace("(", "").replace(")", "").replace(" ", "_")
+    path = Path(out_dir) / f"{x_name}_vs_{y_name}_{slug}.png"
+    fig.savefig(path, dpi=100)
+    return str(path)
+
+
+def _to_json_value(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def write_results(records: Sequence[Dict[str, object]], meta: Dict[str, object], out_path: Union[str, Path]) -> Path:
+    """Write report records as JSON (``{"meta": ..., "results": [...]}``) or Parquet.
+
+    The format follows the file suffix. Parquet needs ``pyarrow`` or
+    ``fastparquet``; its metadata is written next to it as ``<name>.meta.json``.
+
+    Returns:
+        Path: The written results file.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    if out_path.suffix == ".parquet":
+        pd.DataFrame.from_records(records).to_parquet(tmp_path, index=False)
+        meta_path = out_path.with_suffix(".meta.json")
+        meta_path.write_text(json.dumps(meta, indent=2))
+    else:
+        payload = {"meta": meta, "results": [{k: _to_json_value(v) for k, v in r.items()} for r in records]}
+        tmp_path.write_text(json.dumps(payload, allow_nan=False))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def run_report(
+    out_path: Union[str, Path, None] = None,
+    charts_dir: Union[str, Path, None] = None,
+    workers: Optional[int] = None,
+    csv_path: Union[str, Path, None] = None,
+    binary_path: Union[str, Path, None] = None,
+    assets_path: Union[str, Path, None] = None,
+    windows: Sequence[int] = ROLLING_WINDOW_MONTHS,
+) -> Dict[str, object]:
+    """Evaluate the full preset x window x pair grid and write the results.
+
+    Args:
+        out_path: Results file (``.json`` or ``.parquet``; defaults to
+            ``data/report.json``).
+        charts_dir: Directory for one PNG chart per preset of the first asset
+            pair, or None to skip charts.
+        workers: Worker processes (defaults to the CPU count; 1 runs inline).
+        csv_path: Aligned CSV (defaults to ``csv_path`` in config.yaml).
+        binary_path: Aligned binary (defaults to ``binary_path`` in config.yaml).
+        assets_path: Wide asset table (defaults to ``assets_path`` in config.yaml).
+            Defaults are read from the current snapshot when there is one.
+        windows: Rolling windows in months.
+
+    Returns:
+        dict: The report metadata (also written to the results file).
+    """
+    started = time.perf_counter()
+    cfg = load_config()
+    defaults = SnapshotStore(get_snapshots_dir()).resolve(
+        PROJECT_ROOT / cfg["csv_path"],
+        PROJECT_ROOT / cfg.get("binary_path", "data/gold_sp500_aligned.bin"),
+        PROJECT_ROOT / cfg.get("assets_path", "data/assets_wide.bin"),
+    )
+    csv_path = Path(csv_path) if csv_path else defaults[0]
+    binary_path = Path(binary_path) if binary_path else defaults[1]
+    assets_path = Path(assets_path) if assets_path else defaults[2]
+    source = (str(csv_path), str(binary_path), str(assets_path))
+
+    frame = load_report_frame(*source)
+    assets = [name for name in frame.columns if name != "date"]
+    pairs = list(combinations(assets, 2))
+    min_date, max_date = frame["date"].min().date(), frame["date"].max().date()
+    ranges = {preset: preset_range(preset, min_date, max_date) for preset in PRESET_RANGES}
+    windows = tuple(windows)
+    workers = workers or os.cpu_count() or 1
+
+    chart_tasks = []
+    if charts_dir is not None and pairs:
+        Path(charts_dir).mkdir(parents=True, exist_ok=True)
+        chart_tasks = [(preset, *pairs[0], str(charts_dir)) for preset in ranges]
+
+    if workers <= 1 or len(pairs) + len(chart_tasks) <= 1:
+        _init_worker(source, ranges, windows)
+        per_pair = [evaluate_pair(pair) for pair in pairs]
+        charts = [_render_preset_chart(task) for task in chart_tasks]
+    else:
+        workers = min(workers, len(pairs) + len(chart_tasks))
+        chunksize = max(1, len(pairs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source, ranges, windows)) as pool:
+            chart_futures = [pool.submit(_render_preset_chart, task) for task in chart_tasks]
+            per_pair = list(pool.map(evaluate_pair, pairs, chunksize=chunksize))
+            charts = [future.result() for future in chart_futures]
+    records = [record for pair_records in per_pair for record in pair_records]
+
+    if assets_path.exists():
+        used_source, version = assets_path, dataset_version(assets_path, assets_path)
+    else:
+        used_source, version = csv_path, dataset_version(csv_path, binary_path)
+    meta = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": str(used_source),
+        "dataset_version": version,
+        "assets": assets,
+        "presets": {preset: [str(start), str(end)] for preset, (start, end) in ranges.items()},
+        "windows_months": list(windows),
+        "pairs": len(pairs),
+        "records": len(records),
+        "charts": charts,
+        "workers": workers,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+    meta["results_path"] = str(write_results(records, meta, out_path or DEFAULT_REPORT_PATH))
+    return meta
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for ``cli report``."""
+    parser = argparse.ArgumentParser(prog="gold_vs_equities.cli report", description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="results file (.json or .parquet), default data/report.json")
+    parser.add_argument("--charts", metavar="DIR", help="also write one PNG chart per preset to DIR")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    meta = run_report(out_path=args.out, charts_dir=args.charts, workers=args.workers)
+    print(
+        f"Evaluated {meta['records']} preset x pair rows ({meta['pairs']} pairs, "
+        f"{len(meta['windows_months'])} windows) in {meta['elapsed_seconds']}s -> {meta['results_path']}"
+    )
+    return 0
@@ -0,0 +1,246 @@
+"""Low-overhead stage timing, counters and cache hit rates.
+
+Instrumented code wraps each stage in a span::
+
+    from gold_vs_equities.utils.metrics import METRICS
+
+    with METRICS.span("preprocess.merge"):
+        merged = align_prices(gold, sp500)
+
+and reports cache lookups with :meth:`MetricsRegistry.record_cache`. The
+registry is disabled unless the ``GOLD_VS_EQ_METRICS`` environment variable
+is set (to anything but ``0``/``false``); while disabled, ``span`` returns a
+shared no-op context manager after a single attribute check, and every other
+method returns immediately.
+
+When enabled, the collected numbers are available as a dictionary
+(:meth:`~MetricsRegistry.snapshot`, used by the dashboard's developer panel)
+or as Prometheus text (:meth:`~MetricsRegistry.to_prometheus`, served at
+``/metrics`` by the API). If ``GOLD_VS_EQ_METRICS_LOG`` names a file, every
+finished span is also appended to it as one JSON object per line.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional, TextIO, Union
+
+ENV_ENABLED = "GOLD_VS_EQ_METRICS"
+ENV_LOG_PATH = "GOLD_VS_EQ_METRICS_LOG"
+PROMETHEUS_PREFIX = "gold_vs_equities"
+
+
+class _NullSpan:
+    """Context manager that does nothing (used while metrics are disabled)."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_registry", "_name", "_start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str):
+        self._registry = registry
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._registry._record_span(self._name, time.perf_counter() - self._start, exc_type is not None)
+        return False
+
+
+class MetricsRegistry:
+    """Thread-safe collection of span timings, counters and cache hit counts.
+
+    Args:
+        enabled: Start collecting immediately.
+        log_path: Optional JSON-lines file receiving one record per span.
+    """
+
+    def __init__(self, enabled: bool = False, log_path: Union[str, Path, None] = None):
+        self.enabled = enabled
+        self.log_path = Path(log_path) if log_path else None
+        self._lock = threading.Lock()
+        self._spans: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._caches: Dict[str, Dict[str, int]] = {}
+        # The span log stays open between writes; its own lock keeps lines whole.
+        self._log_lock = threading.Lock()
+        self._log_file: Optional[TextIO] = None
+
+    @classmethod
+    def from_env(cls) -> "MetricsRegistry":
+        """Build a registry configured by ``GOLD_VS_EQ_METRICS[_LOG]``."""
+        flag = os.getenv(ENV_ENABLED, "").strip().lower()
+        return cls(enabled=flag not in ("", "0", "false", "no", "off"), log_path=os.getenv(ENV_LOG_PATH) or None)
+
+    def enable(self, log_path: Union[str, Path, None] = None) -> None:
+        """Start collecting (optionally also logging spans to ``log_path``)."""
+        if log_path is not None:
+            self.log_path = Path(log_path)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop collecting; numbers gathered so far are kept."""
+        self.enabled = False
+
+    def close(self) -> None:
+        """Close the span log file (it is reopened by the next logged span)."""
+        with self._log_lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def reset(self) -> None:
+        """Drop every collected number."""
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+            self._caches.clear()
+
+    def span(self, name: str):
+        """Return a context manager timing the enclosed block as ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of a function (``module.qualname`` by default)."""
+
+        def decorate(func):
+            span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add ``value`` to the counter ``name``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def counter(self, name: str) -> float:
+        """Return the current value of the counter ``name`` (0 if never counted)."""
+        return self._counters.get(name, 0)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Record one lookup in the cache called ``cache``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._caches.setdefault(cache, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def _record_span(self, name: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = {"count": 0, "errors": 0, "total": 0.0, "min": seconds, "max": seconds, "last": 0.0}
+            stats["count"] += 1
+            stats["errors"] += failed
+            stats["total"] += seconds
+            stats["min"] = min(stats["min"], seconds)
+            stats["max"] = max(stats["max"], seconds)
+            stats["last"] = seconds
+        log_path = self.log_path
+        if log_path is None:
+            return
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="microseconds"),
+            "event": "span",
+            "name": name,
+            "seconds": seconds,
+            "error": failed,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        line = json.dumps(record) + "\n"
+        with self._log_lock:
+            if self._log_file is None or self._log_file.name != str(log_path):
+                if self._log_file is not None:
+                    self._log_file.close()
+                # Line-buffered, so every record reaches the file as it is written.
+                self._log_file = open(log_path, "a", encoding="utf-8", buffering=1)
+            self._log_file.write(line)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return a copy of every number collected so far.
+
+        Returns:
+            dict: ``{"spans": {name: {count, errors, total, mean, min, max,
+            last}}, "counters": {name: value}, "caches": {name: {hits,
+            misses, hit_rate}}}`` with times in seconds.
+        """
+        with self._lock:
+            spans = {name: dict(stats, mean=stats["total"] / stats["count"]) for name, stats in self._spans.items()}
+            caches = {
+                name: dict(stats, hit_rate=stats["hits"] / max(stats["hits"] + stats["misses"], 1))
+                for name, stats in self._caches.items()
+            }
+            return {"spans": spans, "counters": dict(self._counters), "caches": caches}
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """Render the collected numbers in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        if snapshot["spans"]:
+            family("stage_seconds", "summary", "Time spent in each instrumented stage.")
+            for stage, stats in sorted(snapshot["spans"].items()):
+                label = f'{{stage="{_escape(stage)}"}}'
+                lines.append(f"{prefix}_stage_seconds_sum{label} {stats['total']!r}")
+                lines.append(f"{prefix}_stage_seconds_count{label} {stats['count']}")
+            family("stage_seconds_max", "gauge", "Slowest run of each stage.")
+            for stage, stats in sorted(snapshot["spans"].items()):
+                lines.append(f'{prefix}_stage_seconds_max{{stage="{_escape(stage)}"}} {stats["max"]!r}')
+            family("stage_errors_total", "counter", "Stage runs that raised an exception.")
+            for stage, stats in sorted(snapshot["spans"].items()):
+                lines.append(f'{prefix}_stage_errors_total{{stage="{_escape(stage)}"}} {stats["errors"]}')
+        if snapshot["counters"]:
+            family("events_total", "counter", "Instrumented event counts.")
+            for name, value in sorted(snapshot["counters"].items()):
+                lines.append(f'{prefix}_events_total{{name="{_escape(name)}"}} {value!r}')
+        if snapshot["caches"]:
+            family("cache_requests_total", "counter", "Cache lookups by result.")
+            for cache, stats in sorted(snapshot["caches"].items()):
+                for result in ("hit", "miss"):
+                    value = stats["hits" if result == "hit" else "misses"]
+                    lines.append(f'{prefix}_cache_requests_total{{cache="{_escape(cache)}",result="{result}"}} {value}')
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry used by the package, the dashboard and the API.
+METRICS = MetricsRegistry.from_env()
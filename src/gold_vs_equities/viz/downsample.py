@@ -0,0 +1,177 @@
+"""Visual downsampling for long line charts.
+
+A chart a thousand pixels wide cannot show more than a few thousand distinct
+vertices, yet daily data over fifty years has well over ten thousand rows per
+line. The helpers here pick a representative subset of rows so that drawing
+cost depends on the target point count rather than on the range length:
+
+* :func:`lttb_indices` — Largest-Triangle-Three-Buckets, which keeps the
+  points that contribute most to the visual shape of the line;
+* :func:`minmax_indices` — the minimum and maximum of every bucket, which
+  guarantees that no spike disappears.
+
+Both always keep the first and last row, and :func:`downsample_indices` adds
+the global extremes plus any caller-supplied rows (e.g. the extremes inside
+each recession period) so highlighted features survive the reduction.
+"""
+
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_TARGET_POINTS = 2000
+METHODS = ("lttb", "minmax")
+
+
+def _as_float(values) -> np.ndarray:
+    """Return ``values`` as float64, converting datetimes to elapsed nanoseconds."""
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        values = values.astype("datetime64[ns]").astype(np.int64)
+        if len(values):
+            values = values - values[0]
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Select ``n_out`` rows with Largest-Triangle-Three-Buckets.
+
+    Rows ``1 .. n - 2`` are split into ``n_out - 2`` buckets of near-equal
+    size. Walking left to right, each bucket keeps the row forming the largest
+    triangle with the previously kept row and the mean of the next bucket.
+
+    Args:
+        x: Sorted x values (numbers or ``datetime64``).
+        y: y values of the same length.
+        n_out: Number of rows to keep.
+
+    Returns:
+        np.ndarray: Sorted row indices (all rows when ``n_out >= len(x)`` or
+        ``n_out < 3``).
+    """
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    n_buckets = n_out - 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    counts = ends - starts
+    # Mean of the bucket after each bucket; the last bucket looks at the final row.
+    next_x = np.append(((cum_x[ends] - cum_x[starts]) / counts)[1:], x[-1])
+    next_y = np.append(((cum_y[ends] - cum_y[starts]) / counts)[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for k in range(n_buckets):
+        s, e = starts[k], ends[k]
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - next_x[k]) * (y[s:e] - ay) - (ax - x[s:e]) * (next_y[k] - ay))
+        anchor = s + int(np.argmax(area))
+        selected[k + 1] = anchor
+    return selected
+
+
+def minmax_indices(y, n_buckets: int) -> np.ndarray:
+    """Keep the minimum and maximum row of each of ``n_buckets`` equal buckets.
+
+    Args:
+        y: Values to reduce.
+        n_buckets: Number of buckets (up to ``2 * n_buckets + 2`` rows are kept).
+
+    Returns:
+        np.ndarray: Sorted unique row indices, including the first and last row.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n == 0:
+        return np.arange(0)
+    if n_buckets < 1 or 2 * n_buckets >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded_max = np.full(size * n_buckets, -np.inf)
+    padded_min = np.full(size * n_buckets, np.inf)
+    finite = np.isfinite(y)
+    padded_max[:n] = np.where(finite, y, -np.inf)
+    padded_min[:n] = np.where(finite, y, np.inf)
+    offsets = np.arange(n_buckets) * size
+    highs = offsets + padded_max.reshape(n_buckets, size).argmax(axis=1)
+    lows = offsets + padded_min.reshape(n_buckets, size).argmin(axis=1)
+    keep = np.concatenate([[0, n - 1], highs, lows])
+    return np.unique(keep[keep < n])
+
+
+def range_extrema(y, bounds: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """Return the rows holding the minimum and maximum of ``y`` in each range.
+
+    Args:
+        y: Values to search.
+        bounds: Positional ``(start, stop)`` ranges; ranges without a finite
+            value are skipped.
+
+    Returns:
+        np.ndarray: Row indices (two per non-empty range).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    rows = []
+    for start, stop in bounds:
+        segment = y[start:stop]
+        if np.isfinite(segment).any():
+            rows.extend((start + int(np.nanargmin(segment)), start + int(np.nanargmax(segment))))
+    return np.asarray(rows, dtype=np.int64)
+
+
+def downsample_indices(
+    x,
+    y,
+    target_points: int = DEFAULT_TARGET_POINTS,
+    method: str = "lttb",
+    keep: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """Choose at most about ``target_points`` rows to draw for one line.
+
+    The global minimum and maximum of ``y`` and every row in ``keep`` are
+    always included, so the result may exceed ``target_points`` by that many
+    rows. Rows whose ``y`` is not finite are never selected.
+
+    Args:
+        x: Sorted x values (numbers or ``datetime64``).
+        y: y values of the same length.
+        target_points: Desired number of rows.
+        method: ``"lttb"`` or ``"minmax"``.
+        keep: Extra row indices that must be kept.
+
+    Returns:
+        np.ndarray: Sorted unique row indices into ``x`` and ``y``.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) <= target_points:
+        return finite
+    x_valid = np.asarray(x)[finite]
+    y_valid = y[finite]
+    if method == "lttb":
+        chosen = finite[lttb_indices(x_valid, y_valid, target_points)]
+    else:
+        chosen = finite[minmax_indices(y_valid, max(target_points // 2 - 1, 1))]
+    extras = [finite[[np.argmin(y_valid), np.argmax(y_valid)]]]
+    if keep is not None and len(keep):
+        keep = np.asarray(keep, dtype=np.int64)
+        extras.append(keep[np.isfinite(y[keep])])
+    return np.unique(np.concatenate([chosen, *extras]))
+
+
+def downsample(x, y, target_points: int = DEFAULT_TARGET_POINTS, method: str = "lttb", keep=None):
+    """Return the downsampled ``(x, y)`` arrays for one line.
+
+    See :func:`downsample_indices` for the arguments.
+    """
+    rows = downsample_indices(x, y, target_points=target_points, method=method, keep=keep)
+    return np.asarray(x)[rows], np.asarray(y)[rows]
@@ -1,18 +1,31 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def plot_gold_sp500(csv_path):
+from gold_vs_equities.data.columnar import load_dataset
+from gold_vs_equities.viz.downsample import DEFAULT_TARGET_POINTS, downsample
+
+def plot_gold_sp500(csv_path, binary_path=None, target_points=DEFAULT_TARGET_POINTS, method="lttb"):
     """
     Plots gold and S&P 500 prices from a CSV file using matplotlib and seaborn.
 
+    The memory-mapped binary copy of the dataset is used when it exists; the
+    CSV is only parsed as a fallback. Each line is downsampled to about
+    ``target_points`` vertices (peaks are always kept), so plotting time does
+    not grow with the number of rows.
+
     Args:
         csv_path (str): Path to the CSV file containing gold and S&P 500 data.
+        binary_path (str, optional): Path to the binary columnar dataset
+            (defaults to the CSV's ``.bin`` sibling).
+        target_points (int): Approximate number of vertices drawn per line.
+        method (str): Downsampling method, ``"lttb"`` or ``"minmax"``.
     """
-    df = pd.read_csv(csv_path, parse_dates=["date"])
+    df = load_dataset(csv_path, binary_path)
+    dates = df["date"].to_numpy()
     plt.figure(figsize=(14, 7))
-    sns.lineplot(data=df, x="date", y="gold", label="Gold")
-    sns.lineplot(data=df, x="date", y="sp500", label="S&P 500")
+    for column, label in (("gold", "Gold"), ("sp500", "S&P 500")):
+        x, y = downsample(dates, df[column].to_numpy(), target_points=target_points, method=method)
+        sns.lineplot(x=x, y=y, label=label)
     plt.title("Gold vs S&P 500 Prices Over Time")
     plt.xlabel("Date")
     plt.ylabel("Price (USD)/Index value")
@@ -25,4 +38,4 @@ from gold_vs_equities.utils.load_config import load_config
 if __name__ == "__main__":
     config = load_config("config.yaml")
     csv_path = config.get("csv_path", "../data/gold_sp500_aligned.csv")
-    plot_gold_sp500(csv_path)
+    plot_gold_sp500(csv_path, config.get("binary_path"))
@@ -0,0 +1,177 @@
+"""Bounded LRU cache of rendered chart images.
+
+Drawing a matplotlib figure and encoding it is the expensive part of a
+dashboard rerun, and most reruns ask for a chart that some session has
+already drawn. :class:`RenderCache` keeps the encoded bytes (PNG or SVG) keyed
+by whatever identifies the chart — typically ``(dataset version, chart type,
+start, end, window)`` — and evicts least-recently-used entries once the total
+size exceeds a byte budget.
+
+The cache is thread-safe, so one instance can be shared by every Streamlit
+session through ``st.cache_resource``.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Hashable, Optional
+
+from gold_vs_equities.utils.metrics import METRICS
+
+if TYPE_CHECKING:  # matplotlib is only needed by the callers that draw
+    from matplotlib.figure import Figure
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_DPI = 100
+SUPPORTED_FORMATS = ("png", "svg")
+
+
+@dataclass(frozen=True)
+class RenderCacheStats:
+    """Snapshot of cache counters.
+
+    Attributes:
+        hits: Lookups served from the cache.
+        misses: Lookups that had to render.
+        evictions: Entries dropped to stay within the byte budget.
+        entries: Entries currently held.
+        size_bytes: Total size of the held images.
+        max_bytes: Byte budget.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache (0.0 before any lookup)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def render_figure(fig: "Figure", fmt: str = "png", dpi: int = DEFAULT_DPI) -> bytes:
+    """Encode ``fig`` as ``fmt`` and return the bytes."""
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt!r}")
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+class RenderCache:
+    """Thread-safe LRU cache of encoded images with a total byte budget.
+
+    Args:
+        max_bytes: Upper bound on the summed size of cached images. A single
+            image larger than this is returned but not stored.
+        dpi: Resolution used when encoding raster formats.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, dpi: int = DEFAULT_DPI):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached image for ``key`` (counting a hit or miss)."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return data
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        """Store ``data`` under ``key`` and evict old entries to fit the budget."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._evictions += 1
+
+    def get_or_render(self, key: Hashable, draw: Callable[[], "Figure"], fmt: str = "png") -> bytes:
+        """Return the image for ``key``, drawing and encoding it on a miss.
+
+        Args:
+            key: Anything hashable that identifies the chart's content. The
+                format is appended, so PNG and SVG renders are kept apart.
+            draw: Zero-argument callable returning a new matplotlib
+                :class:`~matplotlib.figure.Figure`. Only called on a miss.
+            fmt: ``"png"`` or ``"svg"``.
+
+        Returns:
+            bytes: The encoded image.
+        """
+        full_key = (key, fmt)
+        data = self.get(full_key)
+        METRICS.record_cache("render", data is not None)
+        if data is not None:
+            return data
+        # Drawing happens outside the lock; two sessions missing on the same
+        # key at once both render and the second put simply replaces the first.
+        with METRICS.span("render.draw"):
+            fig = draw()
+        with METRICS.span("render.encode"):
+            data = render_figure(fig, fmt=fmt, dpi=self.dpi)
+        self.put(full_key, data)
+        return data
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop the entries whose key matches ``predicate``.
+
+        Entries stored by :meth:`get_or_render` are keyed ``(key, fmt)``.
+
+        Returns:
+            int: Number of entries dropped.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._size -= len(self._entries.pop(key))
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> RenderCacheStats:
+        """Return a snapshot of the hit/miss/eviction counters and size."""
+        with self._lock:
+            return RenderCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size,
+                max_bytes=self.max_bytes,
+            )
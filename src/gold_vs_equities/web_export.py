@@ -0,0 +1,179 @@
+"""Precomputed analytics bundle for the web dashboard.
+
+``export-web`` writes one minified JSON file holding everything the dashboard
+otherwise recomputes in the browser on every state change::
+
+    {
+      "format": "gold-vs-equities/web-bundle",
+      "format_version": 1,
+      "dataset_version": "...",          # changes whenever the data does
+      "frequency": "monthly",
+      "start_day": 395,                  # epoch day of the first row
+      "day_offsets": [0, 28, ...],       # row dates as days since start_day
+      "series": {"gold": [...], "sp500": [...]},
+      "shift": {"gold": m_x, "sp500": m_y},
+      "cumulative": {"x": [...], "y": [...], "xx": [...], "yy": [...], "xy": [...]},
+      "rolling": {"3": [...], "6": [...], ...},   # window in months; null = undefined
+      "presets": {"Last 1 Year": {...summary...}, ...}
+    }
+
+``cumulative`` holds prefix sums (with a leading zero) of the mean-shifted
+series, so the correlation and regression of any custom range ``[i, j)`` is
+answered in O(1) from ``cumulative[k][j] - cumulative[k][i]`` exactly as
+:meth:`PrefixStatsIndex.query_positions` does. ``rolling`` series cover the
+whole history; a range view slices them and blanks the first ``window - 1``
+entries. Row indices for a date come from a binary search over
+``day_offsets``.
+
+Usage::
+
+    python -m gold_vs_equities.cli export-web [--out data/web_bundle.json]
+"""
+
+import argparse
+import json
+import math
+import os
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from gold_vs_equities.config import DEFAULT_CONFIG_PATH, load_config
+from gold_vs_equities.core.presets import PRESET_RANGES, ROLLING_WINDOW_MONTHS, preset_range
+from gold_vs_equities.core.rolling import RollingCorrelationTable
+from gold_vs_equities.core.stats_index import PrefixStatsIndex
+from gold_vs_equities.data.columnar import dataset_version, load_dataset, to_epoch_days
+from gold_vs_equities.data.snapshots import SnapshotStore, get_snapshots_dir
+from gold_vs_equities.data.tiers import detect_base_tier, months_to_rows
+
+PROJECT_ROOT = DEFAULT_CONFIG_PATH.parent
+DEFAULT_BUNDLE_PATH = PROJECT_ROOT / "data" / "web_bundle.json"
+BUNDLE_FORMAT = "gold-vs-equities/web-bundle"
+BUNDLE_FORMAT_VERSION = 1
+# Decimal places kept for each kind of value in the bundle.
+PRICE_DECIMALS = 4
+CORRELATION_DECIMALS = 6
+
+
+def _rounded(values: np.ndarray, decimals: Optional[int] = None) -> list:
+    """Return ``values`` as a JSON-ready list with NaN/inf replaced by None."""
+    values = np.asarray(values, dtype=np.float64)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    finite = np.isfinite(values)
+    out = values.tolist()
+    if not finite.all():
+        for k in np.flatnonzero(~finite):
+            out[k] = None
+    return out
+
+
+def _scalar(value: float) -> Optional[float]:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def build_bundle(
+    df: pd.DataFrame,
+    version: str,
+    windows: Sequence[int] = ROLLING_WINDOW_MONTHS,
+) -> Dict[str, object]:
+    """Build the bundle dictionary for an aligned ``date``/``gold``/``sp500`` frame.
+
+    Args:
+        df: Aligned dataset (rows with missing values are dropped).
+        version: Dataset version recorded in the bundle.
+        windows: Rolling windows in months.
+
+    Returns:
+        dict: The JSON-ready bundle.
+    """
+    df = df.dropna().sort_values("date").reset_index(drop=True)
+    dates = df["date"].to_numpy(dtype="datetime64[D]")
+    gold = df["gold"].to_numpy(dtype=np.float64)
+    sp500 = df["sp500"].to_numpy(dtype=np.float64)
+    index = PrefixStatsIndex(dates, gold, sp500)
+    tier = detect_base_tier(dates)
+    window_rows = {months: months_to_rows(months, tier) for months in windows}
+    table = RollingCorrelationTable(gold, sp500, windows=[w for w in window_rows.values() if w >= 2])
+    days = to_epoch_days(dates).astype(np.int64)
+
+    presets = {}
+    if len(dates):
+        min_date, max_date = dates[0].item(), dates[-1].item()
+        for preset in PRESET_RANGES:
+            start, end = preset_range(preset, min_date, max_date)
+            i, j = index.bounds(start, end)
+            summary: Dict[str, object] = {"start": str(start), "end": str(end), "i": i, "j": j}
+            summary.update({key: _scalar(value) if key != "n" else value for key, value in asdict(index.query_positions(i, j)).items()})
+            if j > i:
+                summary["gold_pct"] = _scalar(100 * (gold[j - 1] - gold[i]) / gold[i])
+                summary["sp500_pct"] = _scalar(100 * (sp500[j - 1] - sp500[i]) / sp500[i])
+            presets[preset] = summary
+
+    return {
+        "format": BUNDLE_FORMAT,
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "dataset_version": version,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "frequency": tier,
+        "rows": len(dates),
+        "start_day": int(days[0]) if len(days) else None,
+        "day_offsets": (days - days[0]).tolist() if len(days) else [],
+        "series": {"gold": _rounded(gold, PRICE_DECIMALS), "sp500": _rounded(sp500, PRICE_DECIMALS)},
+        "shift": {"gold": index.x_shift, "sp500": index.y_shift},
+        "cumulative": {name: _rounded(sums) for name, sums in index.cumulative_sums().items()},
+        "rolling": {
+            str(months): _rounded(table.get(rows), CORRELATION_DECIMALS)
+            for months, rows in window_rows.items()
+            if rows >= 2
+        },
+        "presets": presets,
+    }
+
+
+def export_web_bundle(
+    out_path: Union[str, Path, None] = None,
+    csv_path: Union[str, Path, None] = None,
+    binary_path: Union[str, Path, None] = None,
+) -> Path:
+    """Write the minified bundle for the aligned dataset.
+
+    Paths default to ``data/web_bundle.json`` and the ``csv_path`` /
+    ``binary_path`` entries in config.yaml (read from the current snapshot
+    when there is one). The file is replaced atomically.
+
+    Returns:
+        Path: The written bundle.
+    """
+    cfg = load_config()
+    defaults = SnapshotStore(get_snapshots_dir()).resolve(
+        PROJECT_ROOT / cfg["csv_path"], PROJECT_ROOT / cfg.get("binary_path", "data/gold_sp500_aligned.bin")
+    )
+    csv_path = Path(csv_path) if csv_path else defaults[0]
+    binary_path = Path(binary_path) if binary_path else defaults[1]
+    out_path = Path(out_path) if out_path else DEFAULT_BUNDLE_PATH
+
+    df = load_dataset(csv_path, binary_path)
+    df = df[df["date"] >= "1971-01-01"]
+    bundle = build_bundle(df, dataset_version(csv_path, binary_path))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(bundle, separators=(",", ":"), allow_nan=False))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for ``cli export-web``."""
+    parser = argparse.ArgumentParser(prog="gold_vs_equities.cli export-web", description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="bundle path (default data/web_bundle.json)")
+    args = parser.parse_args(argv)
+    path = export_web_bundle(out_path=args.out)
+    print(f"Wrote web bundle ({path.stat().st_size / 1024:.0f} KiB) to {path}")
+    return 0
@@ -0,0 +1,99 @@
+"""
+Tests for the k-way epoch-day aligner.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.data import columnar
+from gold_vs_equities.data.align import align_series, write_aligned
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+
+DAY = 86400
+
+
+@pytest.fixture
+def series():
+    # a: Mon-Fri, b: misses day 3 and days 6-9, c: starts late
+    return {
+        "a": (np.arange(0, 12), np.arange(0, 12) + 100.0),
+        "b": (np.array([0, 1, 2, 4, 5, 10, 11]), np.array([1.0, 2, 3, 5, 6, 11, 12])),
+        "c": (np.array([5, 7, 11]), np.array([50.0, 70, 110])),
+    }
+
+
+def test_inner_keeps_common_days(series):
+    aligned = align_series(series, policy="inner")
+    assert aligned.days.tolist() == [5, 11]
+    assert aligned.column("b").tolist() == [6.0, 12.0]
+    assert aligned.gaps["a"].dropped == 10 and aligned.gaps["c"].dropped == 1
+
+
+def test_outer_forward_fills_within_tolerance(series):
+    aligned = align_series(series, policy="outer", tolerance=2)
+    assert aligned.days.tolist() == list(range(12))
+    b = aligned.column("b")
+    assert b[3] == 3.0  # day 3 filled from day 2
+    assert b[6] == 6.0 and b[7] == 6.0 and np.isnan(b[8]) and np.isnan(b[9])
+    c = aligned.column("c")
+    assert np.isnan(c[:5]).all() and c[6] == 50.0
+    gaps = aligned.gaps["b"]
+    assert (gaps.matched, gaps.filled, gaps.missing) == (7, 3, 2)
+    assert gaps.longest_gap_days == 5 and gaps.longest_gap_start == 5
+
+    unfilled = align_series(series, policy="outer", tolerance=0)
+    assert np.isnan(unfilled.column("b")[3]) and unfilled.gaps["b"].filled == 0
+
+
+def test_matches_pandas_joins(series):
+    frames = [pd.Series(v, index=d, name=n) for n, (d, v) in series.items()]
+    outer = pd.concat(frames, axis=1, sort=True)
+    aligned = align_series(series, policy="outer", tolerance=0)
+    np.testing.assert_array_equal(aligned.values, outer.to_numpy())
+    inner = pd.concat(frames, axis=1, join="inner").sort_index()
+    np.testing.assert_array_equal(align_series(series, policy="inner").values, inner.to_numpy())
+
+
+def test_asof_uses_reference_days(series):
+    left = pd.DataFrame({"day": series["c"][0], "c": series["c"][1]})
+    right = pd.DataFrame({"day": series["b"][0], "b": series["b"][1]})
+    expected = pd.merge_asof(left, right, on="day", tolerance=1)
+    aligned = align_series({"c": series["c"], "b": series["b"]}, policy="asof", tolerance=1)
+    assert aligned.days.tolist() == [5, 7, 11]
+    np.testing.assert_array_equal(aligned.column("b"), expected["b"].to_numpy())
+    by_name = align_series(series, policy="asof", tolerance=1, reference="c")
+    assert by_name.days.tolist() == [5, 7, 11]
+
+
+def test_price_columns_nans_and_duplicate_days():
+    timestamps = np.array([2 * DAY, 0, DAY, DAY + 3600], dtype=np.int64)
+    closes = np.array([3.0, 1.0, 2.0, 2.5])
+    other = PriceColumns(np.array([0, DAY, 2 * DAY]), np.array([np.nan, 20.0, 30.0]))
+    aligned = align_series({"x": PriceColumns(timestamps, closes), "y": other}, policy="outer", tolerance=0)
+    assert aligned.column("x").tolist() == [1.0, 2.5, 3.0]  # last close of day 1 wins
+    assert np.isnan(aligned.column("y")[0]) and aligned.gaps["y"].observations == 2
+
+
+def test_errors(series):
+    with pytest.raises(ValueError):
+        align_series(series, policy="left")
+    with pytest.raises(ValueError):
+        align_series(series, tolerance=-1)
+    with pytest.raises(ValueError):
+        align_series(series, policy="asof", reference="missing")
+    with pytest.raises(ValueError):
+        align_series({})
+
+
+def test_write_aligned_stores_matrix_and_gap_report(tmp_path, series):
+    aligned = align_series(series, policy="outer", tolerance=2)
+    assert aligned.values.flags.f_contiguous
+    path = write_aligned(tmp_path / "wide.bin", aligned)
+    data = columnar.ColumnarDataset(path)
+    assert data.value_columns == ["a", "b", "c"]
+    np.testing.assert_array_equal(data["date"], aligned.days)
+    np.testing.assert_array_equal(data["b"], aligned.column("b"))
+    stored = data.metadata["alignment"]
+    assert stored["policy"] == "outer" and stored["tolerance"] == 2
+    assert stored["gaps"]["b"]["longest_gap_days"] == 5
@@ -0,0 +1,173 @@
+"""
+Tests for the JSON analytics API.
+"""
+
+import gzip
+import json
+import os
+import threading
+import urllib.request
+from urllib.error import HTTPError
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from gold_vs_equities.api import AnalyticsApp, AnalyticsService, ResponseCache, make_handler
+from gold_vs_equities.data.columnar import write_frame
+from gold_vs_equities.data.snapshots import SnapshotStore
+from gold_vs_equities.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def frame():
+    dates = pd.date_range("1971-01-31", "2025-09-30", freq="ME")
+    rng = np.random.default_rng(9)
+    return pd.DataFrame({
+        "date": dates,
+        "gold": 40 * np.exp(np.cumsum(rng.normal(0, 0.04, len(dates)))),
+        "sp500": 100 * np.exp(np.cumsum(rng.normal(0, 0.04, len(dates)))),
+    })
+
+
+@pytest.fixture
+def app(tmp_path, frame):
+    csv_path = tmp_path / "data.csv"
+    frame.to_csv(csv_path, index=False)
+    write_frame(frame, tmp_path / "data.bin")
+    return AnalyticsApp(AnalyticsService(csv_path, tmp_path / "data.bin"))
+
+
+def _json(response):
+    status, headers, body = response
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return status, headers, json.loads(body)
+
+
+def test_correlation_and_regression(app, frame):
+    status, _, body = _json(app.handle("/api/correlation?start=2000-01-01&end=2010-12-31", {}))
+    selected = frame[(frame["date"] >= "2000-01-01") & (frame["date"] <= "2010-12-31")]
+    assert status == 200
+    assert body["n"] == len(selected)
+    assert body["r"] == pytest.approx(stats.pearsonr(selected["gold"], selected["sp500"]).statistic, abs=1e-12)
+
+    _, _, body = _json(app.handle("/api/regression?preset=Last 10 Years", {}))
+    assert body["n"] == 121 and body["slope"] is not None  # both end points inclusive
+
+    _, _, body = _json(app.handle("/api/performance?start=2020-01-01", {}))
+    assert body["gold"]["start_date"] == "2020-01-31"
+    first = frame.loc[frame["date"] == "2020-01-31", "gold"].iloc[0]
+    assert body["gold"]["pct_change"] == pytest.approx(100 * (frame["gold"].iloc[-1] - first) / first)
+
+
+def test_rolling_series_and_downsampling(app, frame):
+    _, _, body = _json(app.handle("/api/rolling?window=12", {}))
+    expected = frame["gold"].rolling(12).corr(frame["sp500"]).dropna()
+    assert len(body["values"]) == len(expected)
+    np.testing.assert_allclose(body["values"], expected.round(6), atol=1e-6)
+    assert body["dates"][0] == str(frame["date"].iloc[11].date())
+
+    _, _, body = _json(app.handle("/api/rolling?window=12&points=100", {}))
+    assert len(body["values"]) <= 102
+
+
+def test_etag_revalidation_and_gzip(app):
+    status, headers, body = app.handle("/api/rolling?window=6", {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body).startswith(b"{")
+    etag = headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('-gz"')
+
+    status, headers, body = app.handle("/api/rolling?window=6", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert (status, body) == (304, b"")
+    assert headers["ETag"] == etag
+    # The identity encoding is a different representation with its own tag.
+    assert app.handle("/api/rolling?window=6", {"If-None-Match": etag})[0] == 200
+    # Parameter order does not matter.
+    _, headers, _ = app.handle("/api/rolling?window=6&end=2020-01-01", {})
+    assert app.handle("/api/rolling?end=2020-01-01&window=6", {"If-None-Match": headers["ETag"]})[0] == 304
+
+    hits = app.cache.hits
+    app.handle("/api/rolling?window=6", {})
+    assert app.cache.hits == hits + 1
+
+
+def test_dataset_change_invalidates_etag(app, frame, tmp_path):
+    _, headers, _ = app.handle("/api/meta", {})
+    write_frame(frame.iloc[:-12], tmp_path / "data.bin")
+    os.utime(tmp_path / "data.bin", ns=(2 * 10 ** 18, 2 * 10 ** 18))
+    status, new_headers, body = _json(app.handle("/api/meta", {"If-None-Match": headers["ETag"]}))
+    assert status == 200
+    assert new_headers["ETag"] != headers["ETag"]
+    assert body["rows"] == len(frame) - 12
+
+
+def test_service_follows_snapshot_pointer(frame, tmp_path):
+    frame.to_csv(tmp_path / "data.csv", index=False)
+    write_frame(frame, tmp_path / "data.bin")
+    store = SnapshotStore(tmp_path / "snapshots")
+    app = AnalyticsApp(AnalyticsService(tmp_path / "data.csv", tmp_path / "data.bin", store))
+    assert _json(app.handle("/api/meta", {}))[2]["rows"] == len(frame)
+
+    def write(directory):
+        write_frame(frame.iloc[:-12], directory / "data.bin")
+        return {}
+
+    store.publish(write)
+    assert _json(app.handle("/api/meta", {}))[2]["rows"] == len(frame) - 12
+
+
+def test_errors(app):
+    assert app.handle("/api/unknown", {})[0] == 404
+    assert app.handle("/api/correlation?start=2020-13-01", {})[0] == 400
+    assert app.handle("/api/correlation?preset=Last 3 Years", {})[0] == 400
+    assert app.handle("/api/rolling?window=abc", {})[0] == 400
+    # Only the advertised windows are served, so clients cannot grow the table.
+    assert app.handle("/api/rolling?window=13", {})[0] == 400
+
+
+def test_metrics_endpoint(app, monkeypatch):
+    assert app.handle("/metrics", {})[0] == 404  # disabled by default
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr("gold_vs_equities.api.METRICS", registry)
+    app.handle("/api/correlation?preset=Last 5 Years", {})
+    app.handle("/api/correlation?preset=Last 5 Years", {})
+    status, headers, body = app.handle("/metrics", {})
+    assert status == 200 and headers["Content-Type"].startswith("text/plain")
+    text = body.decode()
+    assert 'gold_vs_equities_stage_seconds_count{stage="api.correlation"} 1' in text
+    assert 'gold_vs_equities_cache_requests_total{cache="api_response",result="hit"} 1' in text
+
+
+def test_response_cache_ttl_and_lru():
+    now = [0.0]
+    cache = ResponseCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None and cache.get("c") == 3
+    now[0] = 11
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def test_http_server_round_trip(app):
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(app))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/meta"
+        with urllib.request.urlopen(url) as response:
+            etag = response.headers["ETag"]
+            assert json.loads(response.read())["rows"] > 0
+        request = urllib.request.Request(url, headers={"If-None-Match": etag})
+        with pytest.raises(HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+        assert excinfo.value.code == 304
+    finally:
+        server.shutdown()
+        server.server_close()
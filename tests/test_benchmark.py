@@ -0,0 +1,76 @@
+"""
+Tests for the synthetic data generator and the benchmark harness.
+"""
+
+import json
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from gold_vs_equities import benchmark, cli
+from gold_vs_equities.data import fetch_ticker, preprocess, synthetic
+
+
+def test_synthetic_prices_are_seeded_and_correlated():
+    first = synthetic.synthetic_prices(5000, seed=3, correlation=0.7)
+    again = synthetic.synthetic_prices(5000, seed=3, correlation=0.7)
+    other = synthetic.synthetic_prices(5000, seed=4, correlation=0.7)
+    assert first.equals(again) and not first.equals(other)
+    assert first["date"].is_monotonic_increasing and first["date"].is_unique
+    returns = np.diff(np.log(first[["gold", "sp500"]].to_numpy()), axis=0)
+    assert np.corrcoef(returns.T)[0, 1] == pytest.approx(0.7, abs=0.03)
+
+
+def test_large_series_switch_to_intraday_spacing():
+    assert synthetic.parse_size("1M") == 1_000_000 and synthetic.parse_size("2500") == 2500
+    daily = synthetic.synthetic_timestamps(synthetic.MAX_CALENDAR_DAY_ROWS)
+    assert (np.diff(daily) == synthetic.SECONDS_PER_DAY).all()
+    intraday = synthetic.synthetic_timestamps(synthetic.MAX_CALENDAR_DAY_ROWS * 3)
+    assert np.diff(intraday).max() < synthetic.SECONDS_PER_DAY
+    assert intraday[-1] <= synthetic.END.astype(np.int64)
+
+
+def test_chart_payload_round_trips_through_parser():
+    gold, sp500 = synthetic.synthetic_columns(2000, seed=1)
+    parsed = fetch_ticker.parse_chart_columns(synthetic.chart_payload(gold, missing_fraction=0.05))
+    assert 1800 < len(parsed) < 2000
+    assert np.isin(parsed.timestamps, gold.timestamps).all()
+    merged = preprocess.align_prices(gold, sp500)
+    assert len(merged) == 2000 and merged["gold"].equals(merged["gold"].round(1))
+
+
+def test_run_benchmarks_times_and_skips(tmp_path, monkeypatch):
+    # Lower the calendar-day limit so a small run exercises the skip path.
+    case = benchmark.CASES["preprocess.align_write"]
+    monkeypatch.setitem(benchmark.CASES, case.name, replace(case, max_rows=1000))
+    results = benchmark.run_benchmarks(sizes=["500", "2000"], repeat=2, workdir=tmp_path)
+    assert len(results) == 2 * len(benchmark.CASES)
+    skipped = [r for r in results if r.status == "skipped"]
+    assert [(r.case, r.rows) for r in skipped] == [("preprocess.align_write", 2000)]
+    for result in results:
+        if result.status == "ok":
+            assert result.repeat == 2 and 0 < result.best <= result.median
+    assert list(tmp_path.iterdir()) == []  # scratch files are removed
+
+    with pytest.raises(ValueError):
+        benchmark.run_benchmarks(sizes=["1k"], cases=["nope"])
+
+
+def test_results_file_and_regression_check(tmp_path):
+    baseline = benchmark.write_results(
+        [benchmark.BenchmarkResult("filter.range", "1k", 1000, "ok", 3, 0.001, 0.001, 0.001)], tmp_path / "old.json"
+    )
+    payload = json.loads(baseline.read_text())
+    assert payload["meta"]["format_version"] == benchmark.RESULTS_FORMAT_VERSION
+    assert payload["meta"]["environment"]["numpy"] == np.__version__
+
+    slower = {"results": [dict(payload["results"][0], best=0.002)]}
+    rows = benchmark.compare_results(payload, slower, threshold=0.5)
+    assert rows[0]["ratio"] == pytest.approx(2.0) and rows[0]["regression"]
+    assert not benchmark.compare_results(payload, payload)[0]["regression"]
+
+    out = tmp_path / "new.json"
+    status = cli.main(["benchmark", "--sizes", "300", "--cases", "filter.range", "--repeat", "1", "--out", str(out)])
+    assert status == 0
+    assert [r["case"] for r in json.loads(out.read_text())["results"]] == ["filter.range"]
@@ -0,0 +1,107 @@
+"""
+Tests for the block-bootstrap confidence interval engine.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from gold_vs_equities.core import bootstrap
+from gold_vs_equities.core.bootstrap import bootstrap_correlation
+from gold_vs_equities.data.synthetic import synthetic_prices
+
+
+def _prices(rows=600, seed=2):
+    df = synthetic_prices(rows, seed=seed)
+    return df["gold"].to_numpy(), df["sp500"].to_numpy()
+
+
+def test_estimates_match_scipy():
+    x, y = _prices()
+    result = bootstrap_correlation(x, y, resamples=200)
+    fit = stats.linregress(x, y)
+    assert result.estimates["r"] == pytest.approx(stats.pearsonr(x, y)[0], rel=1e-10)
+    assert result.estimates["slope"] == pytest.approx(fit.slope, rel=1e-10)
+    assert result.estimates["r_squared"] == pytest.approx(fit.rvalue ** 2, rel=1e-10)
+    for name in bootstrap.STATISTICS:
+        assert result.samples[name].shape == (200,)
+        low, high = result.intervals[name]
+        assert low <= high
+    assert result.block_length == bootstrap.default_block_length(600)
+
+
+@pytest.mark.parametrize("method", bootstrap.METHODS)
+def test_blocks_cover_every_row(method):
+    rng = np.random.default_rng(0)
+    starts, lengths = bootstrap._draw_blocks(rng, 300, 250, method, 7.0)
+    assert (lengths.sum(axis=1) == 250).all()
+    assert ((starts >= 0) & (starts < 250)).all()
+    used = lengths[lengths > 0]
+    if method == "block":
+        assert used.max() == 7
+    else:
+        assert used.mean() == pytest.approx(7.0, rel=0.15)
+
+
+def test_single_row_blocks_match_iid_standard_error():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(2000)
+    y = 0.5 * x + rng.standard_normal(2000)
+    result = bootstrap_correlation(x, y, resamples=2000, method="block", block_length=1)
+    r = result.estimates["r"]
+    assert result.standard_error("r") == pytest.approx((1 - r * r) / np.sqrt(2000), rel=0.1)
+    low, high = result.intervals["r"]
+    assert low < r < high
+
+
+def test_seeded_results_do_not_depend_on_workers(monkeypatch):
+    x, y = _prices(rows=300)
+    monkeypatch.setattr(bootstrap, "CHUNK_SIZE", 100)
+    inline = bootstrap_correlation(x, y, resamples=350, seed=7, workers=1)
+    monkeypatch.setattr(bootstrap, "_PARALLEL_MIN_LOOKUPS", 0)
+    pooled = bootstrap_correlation(x, y, resamples=350, seed=7, workers=2)
+    other_seed = bootstrap_correlation(x, y, resamples=350, seed=8, workers=1)
+    np.testing.assert_array_equal(inline.samples["r"], pooled.samples["r"])
+    assert inline.intervals == pooled.intervals
+    assert not np.array_equal(inline.samples["r"], other_seed.samples["r"])
+    assert set(inline.to_dict()["statistics"]) == set(bootstrap.STATISTICS)
+
+
+def test_concurrent_inline_calls_do_not_interfere():
+    # Streamlit sessions are threads; inline runs must not share prefix sums.
+    inputs = [_prices(rows=rows, seed=seed) for rows, seed in ((400, 1), (1000, 2), (700, 3), (1500, 4))]
+    expected = [bootstrap_correlation(x, y, resamples=1000, seed=5, workers=1).samples["r"] for x, y in inputs]
+    results = [None] * len(inputs) * 3
+    errors = []
+
+    def run(k):
+        x, y = inputs[k % len(inputs)]
+        try:
+            results[k] = bootstrap_correlation(x, y, resamples=1000, seed=5, workers=1).samples["r"]
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    for k, samples in enumerate(results):
+        np.testing.assert_array_equal(samples, expected[k % len(inputs)])
+
+
+def test_invalid_arguments():
+    x, y = _prices(rows=50)
+    with pytest.raises(ValueError):
+        bootstrap_correlation(x, y[:-1])
+    with pytest.raises(ValueError):
+        bootstrap_correlation(x, y, method="iid")
+    with pytest.raises(ValueError):
+        bootstrap_correlation(x, y, block_length=51)
+    with pytest.raises(ValueError):
+        bootstrap_correlation(x, y, confidence=1.5)
+    with pytest.raises(ValueError):
+        bootstrap_correlation(np.append(x[:-1], np.nan), y)
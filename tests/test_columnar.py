@@ -0,0 +1,85 @@
+"""
+Tests for the binary columnar dataset format.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.data import columnar
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "date": pd.to_datetime(["1971-01-31", "1971-02-28", "2025-10-16"]),
+        "gold": [37.88, 38.74, 4369.2],
+        "sp500": [95.88, 96.75, 6688.46],
+    })
+
+
+def test_round_trip_is_memory_mapped(tmp_path, frame):
+    path = columnar.write_frame(frame, tmp_path / "data.bin")
+    dataset = columnar.ColumnarDataset(path)
+
+    assert dataset["date"].dtype == np.int32
+    assert dataset["date"].tolist() == [395, 423, 20377]
+    assert dataset.value_columns == ["gold", "sp500"]
+    assert isinstance(dataset["gold"].base, np.memmap)
+
+    loaded = dataset.to_frame()
+    pd.testing.assert_frame_equal(loaded, frame, check_dtype=False)
+    assert np.shares_memory(loaded["gold"].to_numpy(), dataset["gold"])
+
+
+def test_columns_are_aligned(tmp_path, frame):
+    path = columnar.write_frame(frame, tmp_path / "data.bin")
+    header = columnar.ColumnarDataset(path).header
+    assert all(spec["offset"] % columnar.ALIGNMENT == 0 for spec in header["columns"])
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"date,gold\n")
+    with pytest.raises(ValueError):
+        columnar.ColumnarDataset(path)
+
+
+def test_load_dataset_prefers_binary(tmp_path, frame):
+    csv_path = tmp_path / "data.csv"
+    frame.iloc[:1].to_csv(csv_path, index=False)
+    columnar.write_frame(frame, columnar.default_binary_path(csv_path))
+
+    assert len(columnar.load_dataset(csv_path)) == 3
+
+
+def test_load_dataset_falls_back_to_csv(tmp_path, frame):
+    csv_path = tmp_path / "data.csv"
+    frame.to_csv(csv_path, index=False)
+    assert len(columnar.load_dataset(csv_path)) == 3
+
+    # A binary copy older than the CSV is ignored.
+    binary_path = columnar.write_frame(frame.iloc[:1], tmp_path / "data.bin")
+    os.utime(binary_path, ns=(0, 0))
+    assert len(columnar.load_dataset(csv_path)) == 3
+
+
+def test_load_dataset_missing_everything(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        columnar.load_dataset(tmp_path / "missing.csv")
+
+
+def test_dataset_version_tracks_the_loaded_file(tmp_path, frame):
+    csv_path = tmp_path / "data.csv"
+    frame.to_csv(csv_path, index=False)
+    csv_version = columnar.dataset_version(csv_path)
+    assert csv_version == columnar.dataset_version(csv_path)
+
+    binary_path = columnar.write_frame(frame, columnar.default_binary_path(csv_path))
+    binary_version = columnar.dataset_version(csv_path)
+    assert binary_version != csv_version
+
+    columnar.write_frame(frame.iloc[:2], binary_path)
+    assert columnar.dataset_version(csv_path) != binary_version
@@ -0,0 +1,135 @@
+"""
+Tests for the hot-reloading dataset holder.
+"""
+
+import os
+import threading
+
+import pytest
+
+from gold_vs_equities.data.dataset_cache import VersionedDataset, content_digest, file_identity
+
+
+def _write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.csv"
+    _write(path, "a\n1\n", 1_000_000_000_000_000_000)
+    loads = []
+
+    def loader():
+        loads.append(path.read_text())
+        return path.read_text()
+
+    return path, loads, loader
+
+
+def test_file_identity_hashes_only_when_stat_changes(tmp_path, monkeypatch):
+    path = tmp_path / "f.bin"
+    _write(path, "abc", 10**18)
+    first = file_identity(path)
+    assert first.digest == content_digest(path) and first.exists
+
+    monkeypatch.setattr("gold_vs_equities.data.dataset_cache.content_digest", pytest.fail)
+    assert file_identity(path, first) is first
+
+    missing = file_identity(tmp_path / "nope")
+    assert not missing.exists and missing.digest == ""
+
+
+def test_unchanged_files_reuse_snapshot_and_derived_values(source):
+    path, loads, loader = source
+    cache = VersionedDataset([path], loader, settle_seconds=0)
+    snapshot = cache.current()
+    assert snapshot.value == "a\n1\n"
+    assert snapshot.derived("double", lambda: snapshot.value * 2) == "a\n1\n" * 2
+
+    assert cache.current() is snapshot
+    assert snapshot.derived("double", pytest.fail) == "a\n1\n" * 2
+    assert len(loads) == 1 and cache.reloads == 1
+
+
+def test_touch_with_same_bytes_keeps_version(source):
+    path, loads, loader = source
+    cache = VersionedDataset([path], loader, settle_seconds=0)
+    snapshot = cache.current()
+    _write(path, "a\n1\n", 1_000_000_000_500_000_000)
+
+    assert cache.current() is snapshot
+    assert len(loads) == 1
+
+
+def test_changed_file_swaps_version_and_notifies(source):
+    path, loads, loader = source
+    cache = VersionedDataset([path], loader, settle_seconds=0)
+    swaps = []
+    cache.subscribe(lambda old, new: swaps.append((old and old.version, new.version)))
+    old = cache.current()
+    old.derived("rows", lambda: 1)
+
+    _write(path, "a\n1\n2\n", 1_000_000_000_500_000_000)
+    new = cache.current()
+    assert new.value == "a\n1\n2\n" and new.version != old.version
+    assert "rows" not in new and "rows" in old
+    assert swaps == [(None, old.version), (old.version, new.version)]
+
+
+def test_recent_writes_wait_to_settle(source):
+    path, loads, loader = source
+    now = [1_000_000_010.0]
+    cache = VersionedDataset([path], loader, settle_seconds=1.0, clock=lambda: now[0])
+    # The first load never waits.
+    old = cache.current()
+
+    _write(path, "a\n9\n", int(now[0] * 1e9))
+    assert cache.current() is old
+    now[0] += 1.5
+    assert cache.current().value == "a\n9\n"
+
+
+def test_failed_reload_keeps_serving_previous_snapshot(source):
+    path, loads, loader = source
+    broken = [False]
+
+    def flaky():
+        if broken[0]:
+            raise ValueError("half-written file")
+        return loader()
+
+    cache = VersionedDataset([path], flaky, settle_seconds=0)
+    old = cache.current()
+    broken[0] = True
+    _write(path, "a\n", 1_000_000_000_500_000_000)
+
+    assert cache.current() is old
+    assert isinstance(cache.last_error, ValueError)
+    # An unchanged broken file is not retried; a fixed one is picked up.
+    broken[0] = False
+    assert cache.current() is old
+    _write(path, "a\n3\n", 1_000_000_000_700_000_000)
+    assert cache.current().value == "a\n3\n" and cache.last_error is None
+
+
+def test_first_load_failure_raises(tmp_path):
+    cache = VersionedDataset([tmp_path / "missing.csv"], lambda: open(tmp_path / "missing.csv").read())
+    with pytest.raises(FileNotFoundError):
+        cache.current()
+
+
+def test_concurrent_readers_trigger_one_reload(source):
+    path, loads, loader = source
+    cache = VersionedDataset([path], loader, settle_seconds=0)
+    cache.current()
+    _write(path, "a\n5\n", 1_000_000_000_500_000_000)
+
+    versions = []
+    threads = [threading.Thread(target=lambda: versions.append(cache.current().version)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(versions)) == 1 and len(loads) == 2
@@ -0,0 +1,103 @@
+"""
+Tests for the visual downsampling helpers.
+"""
+
+import numpy as np
+import pytest
+
+from gold_vs_equities.core.regimes import RegimeIndex
+from gold_vs_equities.viz.downsample import (
+    downsample,
+    downsample_indices,
+    lttb_indices,
+    minmax_indices,
+    range_extrema,
+)
+
+
+@pytest.fixture
+def line():
+    rng = np.random.default_rng(1)
+    n = 20_000
+    dates = np.datetime64("1971-01-01") + np.arange(n)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return dates, values
+
+
+def _lttb_reference(x, y, n_out):
+    """Straightforward loop version of LTTB with the same bucket edges."""
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = [0]
+    for k in range(n_out - 2):
+        s, e = edges[k], edges[k + 1]
+        if k + 1 < n_out - 2:
+            nx, ny = x[edges[k + 1]:edges[k + 2]].mean(), y[edges[k + 1]:edges[k + 2]].mean()
+        else:
+            nx, ny = x[-1], y[-1]
+        a = selected[-1]
+        best, best_area = s, -1.0
+        for i in range(s, e):
+            area = abs((x[a] - nx) * (y[i] - y[a]) - (x[a] - x[i]) * (ny - y[a]))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(5)
+    x = np.arange(500, dtype=float)
+    y = np.cumsum(rng.normal(size=500))
+    np.testing.assert_array_equal(lttb_indices(x, y, 40), _lttb_reference(x, y, 40))
+
+
+def test_lttb_short_input_is_untouched():
+    np.testing.assert_array_equal(lttb_indices([1, 2, 3], [1, 2, 3], 10), [0, 1, 2])
+
+
+def test_minmax_keeps_every_bucket_extreme(line):
+    _, values = line
+    rows = minmax_indices(values, 100)
+    assert rows[0] == 0 and rows[-1] == len(values) - 1
+    assert len(rows) <= 202
+    size = -(-len(values) // 100)
+    for start in range(0, len(values), size):
+        bucket = values[start:start + size]
+        assert start + bucket.argmax() in rows
+        assert start + bucket.argmin() in rows
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_keeps_peaks_and_requested_rows(line, method):
+    dates, values = line
+    spike = 12_345
+    values = values.copy()
+    values[spike] = values.max() * 3
+    keep = range_extrema(values, zip(*RegimeIndex([("1990-07-01", "1991-03-31")]).bounds(dates)))
+
+    rows = downsample_indices(dates, values, target_points=1000, method=method, keep=keep)
+    assert len(rows) <= 1000 + 2 + len(keep)
+    assert np.all(np.diff(rows) > 0)
+    assert {spike, int(values.argmin()), *keep.tolist()} <= set(rows.tolist())
+
+    x, y = downsample(dates, values, target_points=1000, method=method, keep=keep)
+    assert x.dtype == dates.dtype
+    assert y.max() == values.max() and y.min() == values.min()
+
+
+def test_downsample_skips_missing_values():
+    y = np.array([np.nan, 1.0, 2.0, np.nan, 3.0])
+    np.testing.assert_array_equal(downsample_indices(np.arange(5), y, target_points=10), [1, 2, 4])
+    with pytest.raises(ValueError):
+        downsample_indices(np.arange(5), y, method="random")
+
+
+def test_regime_bounds_and_extrema():
+    dates = np.datetime64("2020-01-01") + np.arange(10)
+    lo, hi = RegimeIndex([("2020-01-03", "2020-01-05"), ("2021-01-01", "2021-02-01")]).bounds(dates)
+    bounds = list(zip(lo.tolist(), hi.tolist()))
+    assert bounds == [(2, 5), (10, 10)]
+    y = np.array([0, 0, 5, 1, 9, 0, 0, 0, 0, 0], dtype=float)
+    np.testing.assert_array_equal(range_extrema(y, bounds), [3, 4])
@@ -0,0 +1,152 @@
+"""
+Tests for fetch_ticker against a local stub of the chart API.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+import pytest
+
+from gold_vs_equities.data import fetch_ticker
+
+DELAY_SECONDS = 0.3
+
+
+def _chart_payload(timestamps, closes):
+    return {"chart": {"result": [{"timestamp": timestamps, "indicators": {"quote": [{"close": closes}]}}]}}
+
+
+class StubChartHandler(BaseHTTPRequestHandler):
+    """Serves a fixed two-day payload after a short delay."""
+
+    def do_GET(self):
+        server = self.server
+        ticker = unquote(urlparse(self.path).path.rsplit("/", 1)[-1])
+        with server.lock:
+            server.requests.append(ticker)
+            failures_left = server.failures.get(ticker, 0)
+            if failures_left:
+                server.failures[ticker] = failures_left - 1
+        if failures_left:
+            self.send_response(503)
+            self.end_headers()
+            return
+        time.sleep(DELAY_SECONDS)
+        body = json.dumps(_chart_payload([1577836800, 1577923200, 1578009600], [1.5, None, 2.5])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubChartHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.failures = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _base_url(server):
+    host, port = server.server_address
+    return f"http://{host}:{port}/chart/{{}}"
+
+
+def test_fetch_ticker_prices_parses_payload(stub_server):
+    prices = fetch_ticker.fetch_ticker_prices("GC=F", base_url=_base_url(stub_server))
+    assert prices == [
+        {"date": "2020-01-01", "close": 1.5},
+        {"date": "2020-01-03", "close": 2.5},
+    ]
+
+
+def test_fetch_many_runs_concurrently(stub_server):
+    tickers = ["GC=F", "^GSPC", "SI=F", "CL=F"]
+    started = time.perf_counter()
+    results = fetch_ticker.fetch_many(tickers, base_url=_base_url(stub_server))
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == tickers
+    assert all(len(rows) == 2 for rows in results.values())
+    assert sorted(stub_server.requests) == sorted(tickers)
+    # Sequential fetching would take len(tickers) * DELAY_SECONDS.
+    assert elapsed < DELAY_SECONDS * (len(tickers) - 1)
+
+
+def test_fetch_many_collects_errors(stub_server, monkeypatch):
+    fetch_one = fetch_ticker.fetch_ticker_columns
+
+    def flaky(ticker, *args, **kwargs):
+        if ticker == "SI=F":
+            raise ConnectionError("SI=F unavailable")
+        return fetch_one(ticker, *args, **kwargs)
+
+    monkeypatch.setattr(fetch_ticker, "fetch_ticker_columns", flaky)
+    errors = {}
+    results = fetch_ticker.fetch_many(["GC=F", "SI=F", "^GSPC"], base_url=_base_url(stub_server), errors=errors)
+    assert list(results) == ["GC=F", "^GSPC"]
+    assert list(errors) == ["SI=F"] and isinstance(errors["SI=F"], ConnectionError)
+
+    # Without an errors dict the first failure is raised.
+    with pytest.raises(ConnectionError):
+        fetch_ticker.fetch_many(["GC=F", "SI=F"], base_url=_base_url(stub_server))
+
+
+def test_fetch_many_retries_server_errors(stub_server):
+    stub_server.failures["GC=F"] = 2
+    results = fetch_ticker.fetch_many(["GC=F"], base_url=_base_url(stub_server), backoff_factor=0.01)
+
+    assert len(results["GC=F"]) == 2
+    assert stub_server.requests == ["GC=F"] * 3
+
+
+def test_fetch_gives_up_after_max_retries(stub_server):
+    stub_server.failures["GC=F"] = 5
+    with pytest.raises(fetch_ticker.requests.HTTPError):
+        fetch_ticker.fetch_ticker_prices(
+            "GC=F", base_url=_base_url(stub_server), max_retries=1, backoff_factor=0.01
+        )
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = fetch_ticker.RateLimiter(rate=20)
+    started = time.perf_counter()
+    for _ in range(5):
+        limiter.wait()
+    assert time.perf_counter() - started >= 4 / 20 * 0.9
+
+
+def test_parse_chart_columns_masks_nulls():
+    payload = _chart_payload([1577836800, 1577923200, 1578009600], [1.5, None, 2.5])
+    columns = fetch_ticker.parse_chart_columns(payload)
+
+    assert columns.timestamps.dtype == np.int64
+    assert columns.closes.dtype == np.float64
+    assert columns.timestamps.tolist() == [1577836800, 1578009600]
+    assert columns.date_strings().tolist() == ["2020-01-01", "2020-01-03"]
+
+
+def test_parse_chart_columns_handles_empty_result():
+    payload = {"chart": {"result": [{"indicators": {"quote": [{}]}}]}}
+    assert len(fetch_ticker.parse_chart_columns(payload)) == 0
+
+
+def test_fetch_many_columnar(stub_server):
+    results = fetch_ticker.fetch_many(["GC=F"], base_url=_base_url(stub_server), columnar=True)
+    assert isinstance(results["GC=F"], fetch_ticker.PriceColumns)
+    assert results["GC=F"].closes.tolist() == [1.5, 2.5]
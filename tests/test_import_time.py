@@ -0,0 +1,67 @@
+"""
+Cold-start budget for the package and CLI entry points.
+
+Each entry point is imported in a fresh interpreter. The test fails when the
+import takes longer than its budget or loads a heavy dependency the entry
+point does not need. Budgets are generous wall-clock limits; the module checks
+are what catch an eager import creeping back in.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+HEAVY = ("matplotlib", "seaborn", "pandas", "scipy", "requests")
+
+# module -> (budget in seconds, heavy modules it must not load)
+IMPORT_BUDGETS = {
+    "gold_vs_equities": (0.3, HEAVY),
+    "gold_vs_equities.cli": (0.3, HEAVY),
+    "gold_vs_equities.config": (0.5, HEAVY),
+    "gold_vs_equities.data.preprocess": (2.0, ("matplotlib", "seaborn", "scipy")),
+    "gold_vs_equities.api": (2.5, ("matplotlib", "seaborn", "requests")),
+    "gold_vs_equities.report": (2.5, ("matplotlib", "seaborn", "requests")),
+    "gold_vs_equities.refresh": (2.5, ("matplotlib", "seaborn", "scipy")),
+    "gold_vs_equities.web_export": (2.5, ("matplotlib", "seaborn", "requests")),
+}
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(name for name in {heavy!r} if name in sys.modules)}}))
+"""
+
+
+def measure_import(module, heavy=HEAVY):
+    """Import ``module`` in a new interpreter; return (seconds, heavy modules loaded)."""
+    code = _PROBE.format(src=str(SRC), module=module, heavy=tuple(heavy))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result["seconds"], result["modules"]
+
+
+@pytest.mark.parametrize("module", list(IMPORT_BUDGETS))
+def test_entry_point_import_budget(module):
+    budget, forbidden = IMPORT_BUDGETS[module]
+    # Best of two runs, so one slow filesystem read does not fail the budget.
+    runs = [measure_import(module, forbidden) for _ in range(2)]
+    seconds = min(run[0] for run in runs)
+    assert runs[0][1] == [], f"{module} eagerly imports {runs[0][1]}"
+    assert seconds <= budget, f"{module} took {seconds:.3f}s (budget {budget}s)"
+
+
+def test_package_exports_resolve_lazily():
+    import gold_vs_equities
+
+    assert "eda" in dir(gold_vs_equities)
+    assert gold_vs_equities.load_config is gold_vs_equities.config.load_config
+    assert gold_vs_equities.preprocess.__name__ == "gold_vs_equities.data.preprocess"
+    with pytest.raises(AttributeError):
+        gold_vs_equities.missing_name
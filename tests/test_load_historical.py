@@ -6,7 +6,7 @@ import os
 import pytest
 import pandas as pd
 from datetime import datetime
-from src.load_historical import (
+from gold_vs_equities.data.load_historical import (
     load_historical_gold_prices,
     get_combined_gold_data,
     get_date_range_bounds
@@ -104,3 +104,132 @@ def test_get_combined_gold_data():
         
         # Should have more recent data
         assert df_combined['date'].max() >= df_hist_only['date'].max()
+
+
+def _write_hist_json(path, records):
+    import json
+    with open(path, "w") as f:
+        json.dump([{"Date": d, "Price": p} for d, p in records], f)
+
+
+def test_sidecar_skips_json_parsing(tmp_path, monkeypatch):
+    """Test that a second load is served from the binary sidecar."""
+    from gold_vs_equities.data import load_historical
+
+    json_path = tmp_path / "hist.json"
+    _write_hist_json(json_path, [("1833-01", 18.93), ("1833-02", 19.0)])
+    first = load_historical.load_historical_gold_prices(json_path)
+    assert load_historical.sidecar_path(json_path).exists()
+    assert first['date'].dt.day.tolist() == [31, 28]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("JSON should not be parsed again")
+
+    monkeypatch.setattr(load_historical, "_parse_json", fail)
+    second = load_historical.load_historical_gold_prices(json_path)
+    pd.testing.assert_frame_equal(first, second)
+
+    # Touching the file without changing it only costs a hash check.
+    os.utime(json_path, ns=(1, 1))
+    third = load_historical.load_historical_gold_prices(json_path)
+    pd.testing.assert_frame_equal(first, third)
+
+
+def test_sidecar_invalidated_on_change(tmp_path):
+    """Test that editing the JSON file rebuilds the sidecar."""
+    json_path = tmp_path / "hist.json"
+    _write_hist_json(json_path, [("1833-01", 18.93)])
+    assert len(load_historical_gold_prices(json_path)) == 1
+
+    _write_hist_json(json_path, [("1833-01", 18.93), ("1833-02", 19.0), ("1833-03", 19.5)])
+    df = load_historical_gold_prices(json_path)
+    assert df['gold'].tolist() == [18.93, 19.0, 19.5]
+
+    bounds = get_date_range_bounds(json_path)
+    assert bounds == {'min_date': datetime(1833, 1, 31), 'max_date': datetime(1833, 3, 31)}
+
+
+def test_resample_last_month_end():
+    """Test that daily closes collapse to the last valid close of each month."""
+    import numpy as np
+    from gold_vs_equities.data.load_historical import resample_last
+
+    dates = np.array(["2024-01-02", "2024-01-31", "2024-02-01", "2024-02-15", "2024-02-20"], dtype="datetime64[D]")
+    values = np.array([1.0, 2.0, 3.0, 4.0, np.nan])
+    out_dates, out_values = resample_last(dates, values)
+    assert out_dates.astype(str).tolist() == ["2024-01-31", "2024-02-29"]
+    assert out_values.tolist() == [2.0, 4.0]
+
+    # Other aliases go through pandas and agree with it.
+    year_dates, year_values = resample_last(dates, values, "YE")
+    assert year_dates.astype(str).tolist() == ["2024-12-31"]
+    assert year_values.tolist() == [4.0]
+
+
+def _write_daily_csv(path, rows):
+    pd.DataFrame(rows, columns=["date", "gold"]).to_csv(path, index=False)
+
+
+def test_splice_precedence_and_seam(tmp_path):
+    """Test overlap precedence, the seam report and the seam check."""
+    from gold_vs_equities.data.load_historical import SpliceError
+
+    json_path = tmp_path / "hist.json"
+    _write_hist_json(json_path, [("1900-01", 20.0), ("1900-02", 20.5), ("1900-03", 21.0)])
+    csv_path = tmp_path / "daily.csv"
+    _write_daily_csv(csv_path, [("1900-03-01", 20.9), ("1900-03-30", 21.1), ("1900-04-12", 22.0)])
+
+    hist_first = get_combined_gold_data(csv_path, json_path)
+    assert hist_first['gold'].tolist() == [20.0, 20.5, 21.0, 22.0]
+    assert hist_first['date'].dt.strftime("%Y-%m-%d").tolist()[-1] == "1900-04-30"
+    report = hist_first.attrs["splice"]
+    assert report["overlap"] == 1
+    assert report["seam_date"] == "1900-04-30"
+    assert report["seam_max_diff"] == pytest.approx(21.1 / 21.0 - 1)
+
+    daily_first = get_combined_gold_data(csv_path, json_path, precedence="daily")
+    assert daily_first['gold'].tolist() == [20.0, 20.5, 21.1, 22.0]
+    assert daily_first.attrs["splice"]["seam_date"] == "1900-03-31"
+
+    with pytest.raises(SpliceError):
+        get_combined_gold_data(csv_path, json_path, seam_tolerance=0.001)
+    with pytest.raises(ValueError):
+        get_combined_gold_data(csv_path, json_path, precedence="newest")
+
+
+def test_combined_cache_invalidated_by_either_input(tmp_path, monkeypatch):
+    """Test that the spliced series is reused until one of the inputs changes."""
+    from gold_vs_equities.data import load_historical
+
+    json_path = tmp_path / "hist.json"
+    _write_hist_json(json_path, [("1900-01", 20.0), ("1900-02", 20.5)])
+    csv_path = tmp_path / "daily.csv"
+    _write_daily_csv(csv_path, [("1900-03-15", 21.0)])
+    first = get_combined_gold_data(csv_path, json_path)
+    assert load_historical.combined_path(json_path).exists()
+
+    calls = []
+    splice = load_historical.splice_series
+    monkeypatch.setattr(load_historical, "splice_series", lambda *a, **k: calls.append(1) or splice(*a, **k))
+    pd.testing.assert_frame_equal(get_combined_gold_data(csv_path, json_path), first)
+    assert calls == []
+
+    _write_daily_csv(csv_path, [("1900-03-15", 21.0), ("1900-04-15", 21.5)])
+    os.utime(csv_path, ns=(10 ** 18, 10 ** 18))
+    assert get_combined_gold_data(csv_path, json_path)['gold'].tolist() == [20.0, 20.5, 21.0, 21.5]
+    assert len(calls) == 1
+
+    _write_hist_json(json_path, [("1899-12", 19.5), ("1900-01", 20.0), ("1900-02", 20.5)])
+    assert len(get_combined_gold_data(csv_path, json_path)) == 5
+    assert len(calls) == 2
+
+
+def test_seam_tolerance_from_config(monkeypatch):
+    """Test the seam tolerance is read from config.yaml, with null disabling the check."""
+    from gold_vs_equities.data import load_historical
+
+    assert load_historical.get_seam_tolerance() == pytest.approx(0.1)
+    monkeypatch.setattr(load_historical, "load_config", lambda: {"history": {"seam_tolerance": None}})
+    assert load_historical.get_seam_tolerance() is None
+    monkeypatch.setattr(load_historical, "load_config", lambda: {})
+    assert load_historical.get_seam_tolerance() == load_historical.DEFAULT_SEAM_TOLERANCE
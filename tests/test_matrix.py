@@ -0,0 +1,73 @@
+"""
+Tests for the N-asset correlation matrix engine.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.core.matrix import (
+    correlation_matrix,
+    correlation_matrix_from_frame,
+    iter_rolling_correlation_matrices,
+    rolling_correlation_matrices,
+)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(11)
+    t, n = 1500, 8
+    common = np.cumsum(rng.normal(size=t))
+    values = 100 + np.cumsum(rng.normal(size=(t, n)), axis=0) + np.outer(common, rng.uniform(-1, 1, n))
+    return pd.DataFrame(values, columns=[f"asset_{i}" for i in range(n)])
+
+
+def test_complete_data_matches_pandas(prices):
+    result = correlation_matrix_from_frame(prices)
+    assert result.names == tuple(prices.columns)
+    np.testing.assert_allclose(result.correlation, prices.corr().to_numpy(), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(result.covariance, prices.cov().to_numpy(), rtol=1e-10)
+    assert (result.counts == len(prices)).all()
+    pd.testing.assert_frame_equal(result.to_frame(), prices.corr(), atol=1e-12)
+
+
+def test_missing_values_are_pairwise_complete(prices):
+    gappy = prices.copy()
+    gappy.iloc[:600, 2] = np.nan  # listed later
+    gappy.iloc[1200:, 5] = np.nan  # delisted
+    gappy.iloc[::37, 0] = np.nan  # scattered holidays
+    result = correlation_matrix_from_frame(gappy)
+
+    np.testing.assert_allclose(result.correlation, gappy.corr().to_numpy(), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(result.covariance, gappy.cov().to_numpy(), rtol=1e-9)
+    expected_counts = gappy.notna().astype(int).T @ gappy.notna().astype(int)
+    np.testing.assert_array_equal(result.counts, expected_counts.to_numpy())
+
+
+def test_degenerate_columns():
+    values = np.column_stack([np.arange(10.0), np.full(10, 3.0), np.r_[np.nan * np.ones(9), 1.0]])
+    result = correlation_matrix(values, names=["a", "flat", "short"])
+    assert result.correlation[0, 0] == 1.0
+    assert np.isnan(result.correlation[1]).all()
+    assert np.isnan(result.correlation[2]).all()
+    assert np.isnan(correlation_matrix(values[:, :1], min_periods=20).correlation).all()
+    with pytest.raises(ValueError):
+        correlation_matrix(values, names=["a"])
+
+
+@pytest.mark.parametrize("window,step", [(20, 1), (63, 5)])
+def test_rolling_matrices_match_pandas(prices, window, step):
+    gappy = prices.copy()
+    gappy.iloc[300:310, 1] = np.nan
+    ends, matrices = rolling_correlation_matrices(gappy.to_numpy(), window, step=step, chunk_size=50)
+
+    expected = gappy.rolling(window).corr().to_numpy().reshape(len(gappy), gappy.shape[1], gappy.shape[1])
+    np.testing.assert_array_equal(ends, np.arange(window - 1, len(gappy), step))
+    np.testing.assert_allclose(matrices, expected[ends], rtol=0, atol=1e-9, equal_nan=True)
+
+
+def test_rolling_iterator_batches(prices):
+    batches = list(iter_rolling_correlation_matrices(prices.to_numpy(), 10, chunk_size=400))
+    assert [len(ends) for ends, _ in batches] == [400, 400, 400, 291]
+    assert rolling_correlation_matrices(prices.to_numpy()[:5], 10)[1].shape == (0, 8, 8)
@@ -0,0 +1,139 @@
+"""
+Tests for the stage timing / metrics registry.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from matplotlib.figure import Figure
+
+from gold_vs_equities.utils import metrics
+from gold_vs_equities.utils.metrics import MetricsRegistry
+from gold_vs_equities.viz.render_cache import RenderCache
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    with registry.span("stage"):
+        pass
+    registry.count("events")
+    registry.record_cache("cache", hit=True)
+    assert registry.span("a") is registry.span("b")  # shared no-op
+    assert registry.snapshot() == {"spans": {}, "counters": {}, "caches": {}}
+    assert registry.to_prometheus() == ""
+
+
+def test_disabled_span_overhead_is_negligible():
+    registry = MetricsRegistry()
+    calls = 100_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        with registry.span("stage"):
+            pass
+    per_call = (time.perf_counter() - start) / calls
+    assert per_call < 5e-6
+
+
+def test_spans_counters_and_caches():
+    registry = MetricsRegistry(enabled=True)
+    for _ in range(3):
+        with registry.span("load"):
+            time.sleep(0.001)
+    with pytest.raises(RuntimeError):
+        with registry.span("load"):
+            raise RuntimeError("boom")
+
+    @registry.timed("compute")
+    def compute(x):
+        return x * 2
+
+    assert compute(4) == 8
+    registry.count("rows", 10)
+    registry.count("rows", 5)
+    for hit in (True, True, False):
+        registry.record_cache("render", hit)
+
+    snap = registry.snapshot()
+    load = snap["spans"]["load"]
+    assert load["count"] == 4 and load["errors"] == 1
+    assert load["max"] >= 0.001 and load["max"] >= load["mean"] >= load["min"]
+    assert snap["spans"]["compute"]["count"] == 1
+    assert snap["counters"] == {"rows": 15} and registry.counter("rows") == 15
+    assert snap["caches"]["render"] == {"hits": 2, "misses": 1, "hit_rate": pytest.approx(2 / 3)}
+
+    registry.reset()
+    assert registry.snapshot()["spans"] == {}
+
+
+def test_json_log_and_prometheus_text(tmp_path):
+    log = tmp_path / "spans.jsonl"
+    registry = MetricsRegistry()
+    registry.enable(log_path=log)
+    with registry.span('app."quoted"'):
+        pass
+    registry.record_cache("render", False)
+    registry.count("api.not_modified")
+
+    record = json.loads(log.read_text().splitlines()[0])
+    assert record["event"] == "span" and record["name"] == 'app."quoted"' and record["error"] is False
+
+    text = registry.to_prometheus()
+    assert "# TYPE gold_vs_equities_stage_seconds summary" in text
+    assert 'gold_vs_equities_stage_seconds_count{stage="app.\\"quoted\\""} 1' in text
+    assert 'gold_vs_equities_cache_requests_total{cache="render",result="miss"} 1' in text
+    assert 'gold_vs_equities_events_total{name="api.not_modified"} 1' in text
+
+
+def test_json_log_is_opened_once_and_written_by_many_threads(tmp_path, monkeypatch):
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: opened.append(a[0]) or real_open(*a, **k))
+    registry = MetricsRegistry(enabled=True, log_path=tmp_path / "a.jsonl")
+
+    def work():
+        for _ in range(50):
+            with registry.span("work"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.enable(log_path=tmp_path / "b.jsonl")
+    with registry.span("after"):
+        pass
+    registry.close()
+
+    lines = (tmp_path / "a.jsonl").read_text().splitlines()
+    assert len(lines) == 400 and all(json.loads(line)["name"] == "work" for line in lines)
+    assert json.loads((tmp_path / "b.jsonl").read_text())["name"] == "after"
+    assert opened == [tmp_path / "a.jsonl", tmp_path / "b.jsonl"]
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv(metrics.ENV_ENABLED, "1")
+    monkeypatch.setenv(metrics.ENV_LOG_PATH, str(tmp_path / "m.jsonl"))
+    registry = MetricsRegistry.from_env()
+    assert registry.enabled and registry.log_path == tmp_path / "m.jsonl"
+    monkeypatch.setenv(metrics.ENV_ENABLED, "false")
+    assert not MetricsRegistry.from_env().enabled
+
+
+def test_render_cache_reports_hits_and_draw_time(monkeypatch):
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr("gold_vs_equities.viz.render_cache.METRICS", registry)
+    cache = RenderCache()
+
+    def draw():
+        fig = Figure(figsize=(2, 2))
+        fig.subplots().plot([0, 1], [1, 0])
+        return fig
+
+    cache.get_or_render("chart", draw)
+    cache.get_or_render("chart", draw)
+    snap = registry.snapshot()
+    assert snap["caches"]["render"]["hits"] == 1 and snap["caches"]["render"]["misses"] == 1
+    assert snap["spans"]["render.draw"]["count"] == 1 and snap["spans"]["render.encode"]["count"] == 1
@@ -4,13 +4,13 @@ Unit tests for preprocess.py functions.
 Tests the get_csv_path function and the main data processing pipeline.
 """
 
-import os
-import tempfile
 import yaml
+import numpy as np
 import pandas as pd
 import pytest
 from unittest import mock
-from src import preprocess
+from gold_vs_equities.data import columnar, preprocess
+from gold_vs_equities.data.fetch_ticker import PriceColumns
 
 def test_get_csv_path(tmp_path: pytest.TempPathFactory) -> None:
     """Test get_csv_path returns the correct path from config.yaml."""
@@ -25,26 +25,81 @@ def test_get_csv_path(tmp_path: pytest.TempPathFactory) -> None:
 
 def test_main_merges_and_saves(monkeypatch: pytest.MonkeyPatch, tmp_path: pytest.TempPathFactory) -> None:
     """Test main fetches, merges, rounds, and saves the aligned CSV correctly."""
-    gold_data = [
-        {"date": "2020-01-01", "close": 1550.123},
-        {"date": "2020-01-02", "close": 1560.456},
-    ]
-    sp500_data = [
-        {"date": "2020-01-01", "close": 3200.789},
-        {"date": "2020-01-02", "close": 3210.123},
-    ]
-    # Patch fetch_ticker_prices to return our test data
-    monkeypatch.setattr(preprocess, "fetch_ticker_prices", lambda ticker: gold_data if ticker == "GC=F" else sp500_data)
-    # Patch get_csv_path to write to a temp file
+    timestamps = np.array([1577836800, 1577923200], dtype=np.int64)  # 2020-01-01, 2020-01-02
+    gold_data = PriceColumns(timestamps, np.array([1550.123, 1560.456]))
+    sp500_data = PriceColumns(timestamps, np.array([3200.789, 3210.123]))
+    # Patch the cached fetcher to return our test data
+    monkeypatch.setattr(
+        preprocess,
+        "fetch_many_cached",
+        lambda tickers, **kwargs: {ticker: gold_data if ticker == "GC=F" else sp500_data for ticker in tickers},
+    )
     out_csv = tmp_path / "gold_sp500_aligned.csv"
-    monkeypatch.setattr(preprocess, "get_csv_path", lambda: str(out_csv.relative_to(tmp_path)))
-    # Patch os.path.dirname to tmp_path
-    monkeypatch.setattr(os.path, "dirname", lambda _: str(tmp_path))
     # Run main
-    preprocess.main()
+    preprocess.main(out_path=out_csv, cache_dir=tmp_path / "cache")
     # Check output
     df = pd.read_csv(out_csv)
     assert list(df.columns) == ["date", "gold", "sp500"]
     assert df.shape == (2, 3)
     assert df["gold"].tolist() == [1550.1, 1560.5]
     assert df["sp500"].tolist() == [3200.8, 3210.1]
+    # The binary copy and the coarser tiers are written next to the CSV.
+    for name in ("gold_sp500_aligned.bin", "gold_sp500_aligned.weekly.bin", "gold_sp500_aligned.yearly.bin"):
+        assert (tmp_path / name).exists()
+    # Every configured asset lands in the wide table.
+    assets = columnar.ColumnarDataset(tmp_path / "assets_wide.bin")
+    assert assets.value_columns == list(preprocess.get_assets())
+    assert assets.rows == 2
+
+
+def _fetch_failing(failing: str):
+    """Patchable cached fetcher where ``failing`` raises and every other ticker succeeds."""
+    stamps = np.array([1577836800, 1577923200], dtype=np.int64)
+
+    def fetch(tickers, errors=None, **kwargs):
+        errors[failing] = ConnectionError(f"{failing} unavailable")
+        return {ticker: PriceColumns(stamps, np.array([1.0, 2.0])) for ticker in tickers if ticker != failing}
+
+    return fetch
+
+
+def test_build_datasets_drops_failed_optional_asset(monkeypatch: pytest.MonkeyPatch, capsys) -> None:
+    """An optional asset that fails to download is reported and left out of the wide table."""
+    assets = {"gold": "GC=F", "sp500": "^GSPC", "energy": "XLE", "bonds": "TLT"}
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_failing("XLE"))
+    merged, table = preprocess.build_datasets(assets=assets)
+    assert len(merged) == 2
+    assert table.names == ("gold", "sp500", "bonds")
+    assert "Skipping energy (XLE): XLE unavailable" in capsys.readouterr().out
+
+
+def test_build_datasets_raises_when_gold_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Gold and the S&P 500 are required, so their failures propagate."""
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_failing("GC=F"))
+    with pytest.raises(ConnectionError, match="GC=F unavailable"):
+        preprocess.build_datasets(assets={"gold": "GC=F", "sp500": "^GSPC", "energy": "XLE"})
+
+
+def test_align_assets_outer_joins_dates() -> None:
+    """Assets with different trading calendars are outer-joined on the date."""
+    day = 86400
+    prices = {
+        "GC=F": PriceColumns(np.array([0, day, 2 * day], dtype=np.int64), np.array([1.0, 2.0, 3.0])),
+        "XLE": PriceColumns(np.array([day, 3 * day], dtype=np.int64), np.array([10.0, 11.0])),
+    }
+    table = preprocess.align_assets(prices, {"gold": "GC=F", "energy": "XLE"}).to_frame()
+    assert table["date"].dt.strftime("%Y-%m-%d").tolist() == ["1970-01-01", "1970-01-02", "1970-01-03", "1970-01-04"]
+    assert table["gold"].tolist()[:3] == [1.0, 2.0, 3.0] and np.isnan(table["gold"].iloc[3])
+    assert np.isnan(table["energy"].iloc[0]) and table["energy"].tolist()[1::2] == [10.0, 11.0]
+
+
+def test_align_prices_policies() -> None:
+    """Inner drops days one market was closed; outer carries closes forward within tolerance."""
+    day = 86400
+    gold = PriceColumns(np.array([0, day, 2 * day, 3 * day], dtype=np.int64), np.array([1.04, 2.0, 3.0, 4.0]))
+    sp500 = PriceColumns(np.array([0, 2 * day], dtype=np.int64), np.array([10.0, 30.0]))
+    inner = preprocess.align_prices(gold, sp500)
+    assert inner["date"].tolist() == ["1970-01-01", "1970-01-03"] and inner["gold"].tolist() == [1.0, 3.0]
+    outer = preprocess.align_prices(gold, sp500, policy="outer", tolerance=1)
+    assert outer["date"].tolist() == ["1970-01-01", "1970-01-02", "1970-01-03", "1970-01-04"]
+    assert outer["sp500"].tolist() == [10.0, 10.0, 30.0, 30.0]
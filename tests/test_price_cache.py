@@ -0,0 +1,121 @@
+"""
+Tests for the incremental ticker price cache.
+"""
+
+import numpy as np
+
+from gold_vs_equities.data import price_cache
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+
+DAY = 86400
+JAN_1_2020 = 1577836800
+
+
+def _columns(rows):
+    """Build PriceColumns from (day offset from 2020-01-01, close) pairs."""
+    return PriceColumns(
+        np.array([JAN_1_2020 + offset * DAY for offset, _ in rows], dtype=np.int64),
+        np.array([close for _, close in rows], dtype=np.float64),
+    )
+
+
+class FakeFetcher:
+    """Records calls and serves rows from an in-memory history."""
+
+    def __init__(self, rows):
+        self.history = _columns(rows)
+        self.calls = []
+
+    def __call__(self, ticker, start=None, end=None):
+        self.calls.append({"ticker": ticker, "start": start, "end": end})
+        if start is None:
+            return self.history
+        keep = self.history.date_strings() >= start
+        return PriceColumns(self.history.timestamps[keep], self.history.closes[keep])
+
+
+def test_ticker_cache_path_sanitizes_symbols(tmp_path):
+    assert price_cache.ticker_cache_path("GC=F", tmp_path).name == "GC_F.npz"
+    assert price_cache.ticker_cache_path("^GSPC", tmp_path).name == "_GSPC.npz"
+
+
+def test_first_fetch_downloads_full_history(tmp_path):
+    fetcher = FakeFetcher([(0, 1.0), (1, 2.0)])
+    prices = price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+
+    assert prices.date_strings().tolist() == ["2020-01-01", "2020-01-02"]
+    assert fetcher.calls[0]["start"] is None
+    cached = price_cache.load_cached_prices("GC=F", tmp_path)
+    assert cached.timestamps.dtype == np.int64
+    assert cached.to_rows() == prices.to_rows()
+
+
+def test_refresh_requests_only_delta_and_merges(tmp_path):
+    fetcher = FakeFetcher([(0, 1.0), (1, 2.0)])
+    price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+
+    # The last cached day is revised and a new day appears.
+    fetcher.history = _columns([(0, 1.0), (1, 2.5), (2, 3.0)])
+    prices = price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+
+    assert fetcher.calls[-1]["start"] == "2020-01-02"
+    assert prices.to_rows() == [
+        {"date": "2020-01-01", "close": 1.0},
+        {"date": "2020-01-02", "close": 2.5},
+        {"date": "2020-01-03", "close": 3.0},
+    ]
+    assert price_cache.load_cached_prices("GC=F", tmp_path).to_rows() == prices.to_rows()
+
+
+def test_merge_keys_on_calendar_day():
+    cached = _columns([(0, 1.0), (1, 2.0)])
+    # Same calendar day as the last cached row, but a later intraday timestamp.
+    delta = PriceColumns(np.array([JAN_1_2020 + DAY + 3600], dtype=np.int64), np.array([2.5]))
+
+    merged = price_cache.merge_prices(cached, delta)
+
+    assert merged.closes.tolist() == [1.0, 2.5]
+
+
+def test_force_full_ignores_cache(tmp_path):
+    fetcher = FakeFetcher([(0, 1.0)])
+    price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+
+    fetcher.history = _columns([(-1, 0.5)])
+    prices = price_cache.fetch_cached_ticker_prices(
+        "GC=F", cache_dir=tmp_path, force_full=True, fetcher=fetcher
+    )
+
+    assert fetcher.calls[-1]["start"] is None
+    assert prices.to_rows() == [{"date": "2019-12-31", "close": 0.5}]
+
+
+def test_empty_delta_leaves_cache_untouched(tmp_path):
+    fetcher = FakeFetcher([(0, 1.0)])
+    price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+    path = price_cache.ticker_cache_path("GC=F", tmp_path)
+    mtime = path.stat().st_mtime_ns
+
+    fetcher.history = PriceColumns.empty()
+    prices = price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+
+    assert prices.to_rows() == [{"date": "2020-01-01", "close": 1.0}]
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_fetch_many_cached_requests_per_ticker_deltas(tmp_path, monkeypatch):
+    fetcher = FakeFetcher([(0, 1.0)])
+    price_cache.fetch_cached_ticker_prices("GC=F", cache_dir=tmp_path, fetcher=fetcher)
+    seen = {}
+
+    def fake_fetch_many(tickers, start=None, end=None, columnar=False, **kwargs):
+        assert columnar
+        seen.update(start)
+        return {ticker: _columns([(1, 2.0)]) for ticker in tickers}
+
+    monkeypatch.setattr(price_cache.fetch_ticker, "fetch_many", fake_fetch_many)
+    prices = price_cache.fetch_many_cached(["GC=F", "^GSPC"], cache_dir=tmp_path)
+
+    assert seen == {"GC=F": "2020-01-01", "^GSPC": None}
+    assert prices["GC=F"].date_strings().tolist() == ["2020-01-01", "2020-01-02"]
+    assert prices["^GSPC"].date_strings().tolist() == ["2020-01-02"]
@@ -0,0 +1,100 @@
+"""
+Tests for the scheduled refresh into versioned snapshots.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from gold_vs_equities import refresh
+from gold_vs_equities.data import preprocess
+from gold_vs_equities.data.columnar import load_dataset
+from gold_vs_equities.data.fetch_ticker import PriceColumns
+from gold_vs_equities.data.snapshots import SnapshotError, SnapshotStore
+
+DAY = 86400
+
+
+def _fetch_returning(prices):
+    """Patchable fetcher: gold and the S&P 500 get ``prices``, other assets a flat series."""
+
+    def fetch(tickers, **kwargs):
+        stamps = np.arange(len(prices), dtype=np.int64) * DAY + 1577836800
+        return {ticker: PriceColumns(stamps, np.asarray(prices, dtype=float)) for ticker in tickers}
+
+    return fetch
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {"csv_path": tmp_path / "gold_sp500_aligned.csv", "cache_dir": tmp_path / "cache"}
+
+
+def test_refresh_publishes_validated_snapshot(monkeypatch, tmp_path, paths):
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_returning([100.0, 101.0, 102.0]))
+    store = SnapshotStore(tmp_path / "snapshots")
+
+    snapshot = refresh.refresh_once(store, **paths)
+    assert store.current() == snapshot.version
+    assert snapshot.manifest["rows"] == 3 and snapshot.manifest["last_date"] == "2020-01-03"
+    csv_path, binary_path = store.resolve(paths["csv_path"], tmp_path / "gold_sp500_aligned.bin")
+    assert csv_path.parent == snapshot.path and binary_path.parent == snapshot.path
+    assert (snapshot.path / "gold_sp500_aligned.weekly.bin").exists() and (snapshot.path / "assets_wide.bin").exists()
+    assert load_dataset(csv_path, binary_path)["gold"].tolist() == [100.0, 101.0, 102.0]
+    # Nothing is written outside the snapshot.
+    assert not paths["csv_path"].exists()
+
+    # The same data again publishes nothing.
+    assert refresh.refresh_once(store, **paths) is None
+
+
+def test_bad_data_is_rejected_and_current_kept(monkeypatch, tmp_path, paths):
+    store = SnapshotStore(tmp_path / "snapshots")
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_returning([100.0, 101.0, 102.0]))
+    good = refresh.refresh_once(store, **paths)
+
+    # A truncated history (e.g. a bad API response) is not published.
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_returning([100.0, 101.0]))
+    with pytest.raises(SnapshotError, match="down from"):
+        refresh.refresh_once(store, **paths)
+    # So is a price off by a factor of ten.
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_returning([100.0, 101.0, 1020.0]))
+    with pytest.raises(SnapshotError, match="moved"):
+        refresh.refresh_once(store, **paths)
+    assert store.current() == good.version and store.versions() == [good.version]
+
+
+def test_daemon_keeps_running_after_a_failed_run(monkeypatch, tmp_path, paths, capsys):
+    store = SnapshotStore(tmp_path / "snapshots")
+    stop = threading.Event()
+    calls = []
+
+    def flaky(store, **options):
+        calls.append(options)
+        if len(calls) == 1:
+            raise ConnectionError("network down")
+        stop.set()
+        return None
+
+    monkeypatch.setattr(refresh, "refresh_once", flaky)
+    assert refresh.run_daemon(store, interval=0.01, stop=stop, **paths) == 1
+    assert len(calls) == 2 and calls[0] == paths
+    output = capsys.readouterr().out
+    assert "Refresh failed" in output and "network down" in output
+
+
+def test_cli_lists_and_activates_versions(monkeypatch, tmp_path, paths, capsys):
+    store = SnapshotStore(tmp_path / "snapshots")
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_returning([100.0, 101.0, 102.0]))
+    first = refresh.refresh_once(store, **paths)
+    monkeypatch.setattr(preprocess, "fetch_many_cached", _fetch_returning([100.0, 101.0, 102.0, 103.0]))
+    second = refresh.refresh_once(store, **paths)
+    monkeypatch.setattr(refresh, "get_snapshots_dir", lambda: store.root)
+
+    assert refresh.main(["--activate", first.version]) == 0
+    assert store.current() == first.version
+    assert refresh.main(["--list"]) == 0
+    listing = capsys.readouterr().out
+    assert f"* {first.version}" in listing and f"  {second.version}" in listing
+    assert refresh.main(["--activate", "nope"]) == 1
@@ -0,0 +1,89 @@
+"""
+Tests for the recession regime index and per-regime statistics.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.core.regimes import NBER_RECESSIONS, PHASES, RegimeIndex, regime_table
+from gold_vs_equities.data.synthetic import synthetic_prices
+
+
+def _monthly(rows=400, seed=5):
+    df = synthetic_prices(rows, seed=seed, volatility=(0.01, 0.012))
+    dates = pd.date_range("1971-01-31", periods=rows, freq="ME").to_numpy()
+    return dates, df["gold"].to_numpy(), df["sp500"].to_numpy()
+
+
+def _reference(prices, lo, hi):
+    """Direct per-segment calculation with the entry close before ``lo``."""
+    segment = prices[:, max(lo - 1, 0):hi]
+    returns = np.diff(np.log(segment), axis=1)
+    drawdown = (segment / np.maximum.accumulate(segment, axis=1) - 1).min(axis=1)
+    return np.exp(returns.sum(axis=1)) - 1, returns.std(axis=1, ddof=1) * np.sqrt(12), drawdown, np.corrcoef(returns)[0, 1]
+
+
+def test_regime_table_matches_direct_calculation():
+    dates, gold, sp500 = _monthly()
+    regimes = RegimeIndex(NBER_RECESSIONS)
+    table = regime_table(dates, {"gold": gold, "sp500": sp500}, regimes, months=6)
+    assert len(table) == 3 * len(regimes) + 1
+    assert table["phase"].tolist()[:3] == list(PHASES)
+
+    prices = np.vstack([gold, sp500])
+    lo, hi = regimes.bounds(dates)
+    for k in range(len(regimes)):
+        if hi[k] - lo[k] < 3:
+            continue
+        row = table.iloc[3 * k + 1]
+        total, vol, drawdown, corr = _reference(prices, lo[k], hi[k])
+        assert row["periods"] == hi[k] - lo[k]
+        assert [row["gold_return"], row["sp500_return"]] == pytest.approx(total.tolist())
+        assert [row["gold_volatility"], row["sp500_volatility"]] == pytest.approx(vol.tolist())
+        assert [row["gold_max_drawdown"], row["sp500_max_drawdown"]] == pytest.approx(drawdown.tolist())
+        assert row["correlation"] == pytest.approx(corr)
+
+    # A six-month window on monthly data holds six rows.
+    assert table.iloc[3]["periods"] == 6 and table.iloc[5]["periods"] == 6
+
+    expansion = ~regimes.mask(dates)
+    expansion[0] = False
+    returns = np.diff(np.log(prices), axis=1)[:, expansion[1:]]
+    last = table.iloc[-1]
+    assert last["phase"] == "expansion" and last["periods"] == expansion.sum()
+    assert last["gold_return"] == pytest.approx(np.exp(returns[0].sum()) - 1)
+    assert last["correlation"] == pytest.approx(np.corrcoef(returns)[0, 1])
+
+
+def test_events_outside_the_data_are_empty():
+    dates, gold, sp500 = _monthly(rows=60)
+    table = regime_table(dates, {"gold": gold, "sp500": sp500}, RegimeIndex([("2020-01-01", "2020-06-30", "late")]))
+    assert table["periods"].tolist()[:3] == [0, 0, 0]
+    assert table[["gold_return", "correlation"]].iloc[:3].isna().all().all()
+    assert table.iloc[-1]["periods"] == 59
+
+
+def test_index_lookups_with_overlapping_events():
+    regimes = RegimeIndex([("2000-03-01", "2000-03-31"), ("2000-01-01", "2000-06-30", "long"), ("2001-01-01", "2001-01-31")])
+    assert regimes.labels[0] == "long"
+    dates = np.array(["1999-12-31", "2000-02-15", "2000-04-15", "2000-07-01", "2001-01-15"], dtype="datetime64[D]")
+    assert regimes.mask(dates).tolist() == [False, True, True, False, True]
+    assert regimes.overlapping("2000-04-01", "2000-12-31").tolist() == [0]
+    assert regimes.overlapping("2000-03-15", "2001-02-01").tolist() == [0, 1, 2]
+    assert regimes.overlapping("2002-01-01", "2003-01-01").tolist() == []
+    assert regimes.periods("2000-12-01", "2001-12-31") == [(pd.Timestamp("2001-01-01"), pd.Timestamp("2001-01-31"))]
+    with pytest.raises(ValueError):
+        RegimeIndex([("2000-02-01", "2000-01-01")])
+
+
+def test_events_from_text():
+    regimes = RegimeIndex.from_text("# custom\n2022-01-03, 2022-10-12, 2022 bear market\n\n2020-02-19,2020-03-23\n")
+    assert regimes.events() == [
+        ("2020-02-19", "2020-03-23", "2020-02-19 to 2020-03-23"),
+        ("2022-01-03", "2022-10-12", "2022 bear market"),
+    ]
+    with pytest.raises(ValueError, match="Line 1"):
+        RegimeIndex.from_text("2022-01-03")
+    with pytest.raises(ValueError, match="Line 2"):
+        RegimeIndex.from_text("2022-01-03, 2022-02-01\nsoon, later")
@@ -0,0 +1,106 @@
+"""
+Tests for the rendered chart LRU cache.
+"""
+
+import threading
+
+import pytest
+from matplotlib.figure import Figure
+
+from gold_vs_equities.viz.render_cache import RenderCache, render_figure
+
+
+def _figure(label="a"):
+    fig = Figure(figsize=(2, 1))
+    ax = fig.subplots()
+    ax.plot([0, 1, 2], [1, 0, 1], label=label)
+    return fig
+
+
+def test_hit_returns_same_bytes_without_redrawing():
+    cache = RenderCache()
+    calls = []
+
+    def draw():
+        calls.append(1)
+        return _figure()
+
+    first = cache.get_or_render(("v1", "price", 0, 10), draw)
+    second = cache.get_or_render(("v1", "price", 0, 10), draw)
+    assert first is second
+    assert first.startswith(b"\x89PNG")
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+    assert stats.size_bytes == len(first)
+
+
+def test_formats_are_cached_separately():
+    cache = RenderCache()
+    png = cache.get_or_render("chart", _figure, fmt="png")
+    svg = cache.get_or_render("chart", _figure, fmt="svg")
+    assert png.startswith(b"\x89PNG")
+    assert b"<svg" in svg
+    assert len(cache) == 2
+    with pytest.raises(ValueError):
+        render_figure(_figure(), fmt="gif")
+
+
+def test_evicts_least_recently_used_within_budget():
+    cache = RenderCache(max_bytes=100)
+    cache.put("a", b"x" * 40)
+    cache.put("b", b"x" * 40)
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.put("c", b"x" * 40)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size_bytes == 80
+
+    # Oversized images are handed back but never stored.
+    cache.put("huge", b"x" * 101)
+    assert "huge" not in cache
+    assert cache.stats().size_bytes == 80
+
+
+def test_replacing_a_key_keeps_size_accurate():
+    cache = RenderCache(max_bytes=100)
+    cache.put("a", b"x" * 30)
+    cache.put("a", b"x" * 50)
+    assert cache.stats().size_bytes == 50
+    cache.clear()
+    assert len(cache) == 0 and cache.stats().size_bytes == 0
+
+
+def test_discard_drops_matching_entries_only():
+    cache = RenderCache(max_bytes=1000)
+    cache.put((("v1", "price"), "png"), b"x" * 30)
+    cache.put((("v1", "scatter"), "png"), b"x" * 20)
+    cache.put((("v2", "price"), "png"), b"x" * 10)
+
+    assert cache.discard(lambda key: key[0][0] == "v1") == 2
+    assert len(cache) == 1 and (("v2", "price"), "png") in cache
+    assert cache.stats().size_bytes == 10
+
+
+def test_concurrent_access_is_consistent():
+    cache = RenderCache(max_bytes=10_000)
+
+    def worker(offset):
+        for i in range(200):
+            key = (offset + i) % 50
+            if cache.get(key) is None:
+                cache.put(key, b"x" * 100)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats.hits + stats.misses == 8 * 200
+    assert stats.size_bytes == 100 * stats.entries <= 10_000
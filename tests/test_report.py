@@ -0,0 +1,65 @@
+"""
+Tests for the headless batch report.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from gold_vs_equities import cli, report
+from gold_vs_equities.core.presets import PRESET_RANGES, preset_range
+from gold_vs_equities.data.columnar import write_columnar
+
+
+@pytest.fixture
+def assets_path(tmp_path):
+    dates = pd.date_range("1971-01-31", "2025-09-30", freq="ME")
+    rng = np.random.default_rng(4)
+    columns = {name: 50 * np.exp(np.cumsum(rng.normal(0, 0.03, len(dates)))) for name in ("gold", "sp500", "silver")}
+    columns["silver"][:120] = np.nan  # shorter history
+    return write_columnar(tmp_path / "assets.bin", dates.to_numpy(), columns)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_report_covers_full_grid(tmp_path, assets_path, workers):
+    out = tmp_path / "report.json"
+    meta = report.run_report(out_path=out, workers=workers, csv_path=tmp_path / "missing.csv", assets_path=assets_path)
+    payload = json.loads(out.read_text())
+
+    assert meta["pairs"] == 3
+    assert len(payload["results"]) == 3 * len(PRESET_RANGES)
+    assert payload["meta"]["assets"] == ["gold", "sp500", "silver"]
+
+    record = next(r for r in payload["results"] if r["preset"] == "Last 10 Years" and r["y"] == "silver")
+    frame = report.load_report_frame(None, None, assets_path)[["date", "gold", "silver"]].dropna()
+    start, end = preset_range("Last 10 Years", frame["date"].min().date(), frame["date"].max().date())
+    selected = frame[(frame["date"] >= pd.Timestamp(start)) & (frame["date"] <= pd.Timestamp(end))]
+    expected = stats.pearsonr(selected["gold"], selected["silver"])
+    assert record["n"] == len(selected)
+    assert record["r"] == pytest.approx(expected.statistic, abs=1e-12)
+    rolling = selected["gold"].rolling(12).corr(selected["silver"])
+    assert record["rolling_12m_mean"] == pytest.approx(rolling.mean(), abs=1e-9)
+    assert record["rolling_12m_last"] == pytest.approx(rolling.iloc[-1], abs=1e-9)
+
+
+def test_report_charts_and_cli(tmp_path, assets_path, monkeypatch):
+    monkeypatch.setattr(report, "DEFAULT_REPORT_PATH", tmp_path / "report.json")
+    meta = report.run_report(workers=1, charts_dir=tmp_path / "charts", csv_path=tmp_path / "missing.csv", assets_path=assets_path)
+    assert len(meta["charts"]) == len(PRESET_RANGES)
+    assert all(open(path, "rb").read(4) == b"\x89PNG" for path in meta["charts"])
+
+    monkeypatch.setattr(report, "run_report", lambda **kwargs: {**meta, "results_path": "x"})
+    assert cli.main(["report", "--workers", "1"]) == 0
+
+
+def test_preset_range_clips_to_data():
+    from datetime import date
+
+    assert preset_range("Last 5 Years", date(1971, 1, 31), date(2024, 2, 29)) == (date(2019, 2, 28), date(2024, 2, 29))
+    assert preset_range("Since 1980", date(1990, 1, 1), date(2000, 1, 1)) == (date(1990, 1, 1), date(2000, 1, 1))
+    assert preset_range("Custom", date(1990, 1, 1), date(2000, 1, 1)) == (date(1990, 1, 1), date(2000, 1, 1))
+    assert preset_range("Since 1833 (Gold Only)", date(1833, 1, 31), date(2000, 1, 1)) == (date(1833, 1, 31), date(2000, 1, 1))
+    assert preset_range("Since 1971 (All Data)", date(1833, 1, 31), date(2000, 1, 1)) == (date(1971, 1, 1), date(2000, 1, 1))
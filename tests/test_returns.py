@@ -0,0 +1,91 @@
+"""
+Tests for the return-space metrics kernel.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.core.returns import ReturnKernel, log_returns
+from gold_vs_equities.data.sorted_frame import SortedFrame
+from gold_vs_equities.data.synthetic import synthetic_prices
+
+
+def _kernel(rows=500, **kwargs):
+    df = synthetic_prices(rows, seed=11)
+    return df, ReturnKernel.from_frame(SortedFrame.from_frame(df), 252, **kwargs)
+
+
+def test_metrics_match_pandas():
+    df, kernel = _kernel(risk_free=0.03)
+    i, j = 100, 400
+    prices = df["gold"].iloc[i:j]
+    returns = np.log(prices).diff().dropna()
+    rf = np.log1p(0.03) / 252
+    m = kernel.metrics("gold", i, j)
+
+    assert m.periods == j - i - 1
+    assert m.total_return == pytest.approx(prices.iloc[-1] / prices.iloc[0] - 1)
+    days = (df["date"].iloc[j - 1] - df["date"].iloc[i]).days
+    assert m.cagr == pytest.approx((prices.iloc[-1] / prices.iloc[0]) ** (365.25 / days) - 1)
+    assert m.volatility == pytest.approx(returns.std() * np.sqrt(252))
+    assert m.sharpe == pytest.approx((returns.mean() - rf) * 252 / (returns.std() * np.sqrt(252)))
+    downside = np.sqrt((np.minimum(returns - rf, 0) ** 2).mean() * 252)
+    assert m.sortino == pytest.approx((returns.mean() - rf) * 252 / downside)
+    assert m.best_return == pytest.approx(np.expm1(returns.max()))
+    assert m.worst_return == pytest.approx(np.expm1(returns.min()))
+
+    drawdown = prices / prices.cummax() - 1
+    assert m.max_drawdown == pytest.approx(drawdown.min())
+    trough = drawdown.idxmin()
+    assert m.trough_date == df["date"].iloc[trough]
+    assert m.peak_date == df["date"].iloc[prices.loc[:trough].idxmax()]
+    recovered = prices.loc[trough:][prices.loc[trough:] >= prices.loc[:trough].max()]
+    assert m.recovery_date == (df["date"].iloc[recovered.index[0]] if len(recovered) else None)
+
+    other = np.log(df["sp500"].iloc[i:j]).diff().dropna()
+    assert kernel.correlation("gold", "sp500", i, j) == pytest.approx(returns.corr(other))
+
+
+def test_drawdown_dates_and_recovery():
+    dates = pd.date_range("2000-01-31", periods=7, freq="ME").to_numpy()
+    prices = {"a": np.array([100, 120, 90, 60, 110, 125, 130.0]), "b": np.array([1, 2, 3, 2, 1.5, 1.8, 1.9])}
+    kernel = ReturnKernel(dates, prices, periods_per_year=12)
+    a = kernel.metrics("a")
+    assert a.max_drawdown == pytest.approx(-0.5)
+    assert (a.peak_date, a.trough_date, a.recovery_date) == (
+        pd.Timestamp("2000-02-29"), pd.Timestamp("2000-04-30"), pd.Timestamp("2000-06-30"),
+    )
+    b = kernel.metrics("b")
+    assert b.max_drawdown == pytest.approx(-0.5) and b.recovery_date is None
+    rising = kernel.metrics("a", 4, 7)
+    assert rising.max_drawdown == 0.0 and rising.peak_date is None
+    assert np.isnan(kernel.metrics("a", 3, 4).total_return)
+    assert kernel.table(0, 7).index.tolist() == ["a", "b"]
+
+
+def test_results_are_memoized():
+    _, kernel = _kernel(rows=50, memo_size=2)
+    first = kernel.metrics("gold", 5, 40)
+    assert kernel.metrics("gold", 5, 40) is first
+    kernel.metrics("gold", 0, 10)
+    kernel.metrics("sp500", 0, 10)
+    assert kernel.metrics("gold", 5, 40) is not first
+    assert kernel.metrics("gold", 5, 40) == first
+
+
+def test_invalid_prices():
+    dates = pd.date_range("2000-01-31", periods=3, freq="ME").to_numpy()
+    assert log_returns([1.0, np.e, 1.0]).tolist() == pytest.approx([0.0, 1.0, -1.0])
+    with pytest.raises(ValueError):
+        ReturnKernel(dates, {"a": np.array([1.0, np.nan, 2.0])}, 12)
+    with pytest.raises(ValueError):
+        ReturnKernel(dates, {"a": np.array([1.0, 2.0])}, 12)
+
+
+def test_callers_array_stays_writeable():
+    dates = pd.date_range("2000-01-31", periods=3, freq="ME").to_numpy()
+    prices = np.array([1.0, 2.0, 3.0])
+    kernel = ReturnKernel(dates, {"a": prices}, 12)
+    assert prices.flags.writeable
+    assert not kernel.prices["a"].flags.writeable
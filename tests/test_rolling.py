@@ -0,0 +1,93 @@
+"""
+Tests for the multi-window rolling correlation engine.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.core.rolling import (
+    DEFAULT_WINDOWS,
+    RollingCorrelationTable,
+    rolling_correlation,
+)
+
+
+def _two_pass(x, y, window):
+    """Reference implementation: exact two-pass formula per window."""
+    out = np.full(len(x), np.nan)
+    for end in range(window, len(x) + 1):
+        cx = x[end - window:end] - x[end - window:end].mean()
+        cy = y[end - window:end] - y[end - window:end].mean()
+        denom = np.sqrt((cx * cx).sum() * (cy * cy).sum())
+        out[end - 1] = (cx * cy).sum() / denom if denom else np.nan
+    return out
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(3)
+    n = 2000
+    x = 300 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, size=n)))
+    y = 1000 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, size=n)))
+    return x, y
+
+
+@pytest.mark.parametrize("window", DEFAULT_WINDOWS + (2, 7, 250))
+def test_matches_exact_two_pass(prices, window):
+    x, y = prices
+    result = rolling_correlation(x, y, window)
+    np.testing.assert_allclose(result, _two_pass(x, y, window), rtol=0, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", DEFAULT_WINDOWS + (7, 250))
+def test_matches_pandas(prices, window):
+    x, y = prices
+    result = rolling_correlation(x, y, window)
+    expected = pd.Series(x).rolling(window).corr(pd.Series(y)).to_numpy()
+
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+    # pandas' online update carries its own rounding error for short windows,
+    # so compare to it at that level and to the exact reference above.
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-8, equal_nan=True)
+
+
+def test_near_constant_windows_are_exact():
+    # Dyadic values keep the two-pass reference itself free of rounding.
+    step = 2.0 ** -30
+    x = np.array([18.9375] * 20 + [18.9375 + step, 18.9375, 18.9375 + 2 * step, 18.9375] + [20.0, 21.0, 19.5, 22.0] * 5)
+    y = np.linspace(100.0, 140.0, len(x)) + np.sin(np.arange(len(x)))
+    for window in (4, 8):
+        result = rolling_correlation(x, y, window)
+        np.testing.assert_allclose(result, _two_pass(x, y, window), rtol=0, atol=1e-12, equal_nan=True)
+    # A perfectly flat window has no defined correlation.
+    assert np.isnan(rolling_correlation(x, y, 3)[5])
+
+
+def test_missing_values_blank_their_windows(prices):
+    x, y = prices[0][:50].copy(), prices[1][:50]
+    x[20] = np.nan
+    result = rolling_correlation(x, y, 5)
+    assert np.isnan(result[20:25]).all()
+    assert not np.isnan(result[25])
+    expected = pd.Series(x).rolling(5).corr(pd.Series(y)).to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9, equal_nan=True)
+
+
+def test_short_input_is_all_nan():
+    assert np.isnan(rolling_correlation([1.0, 2.0], [2.0, 1.0], 3)).all()
+
+
+def test_table_lookup_and_slicing(prices):
+    x, y = prices
+    table = RollingCorrelationTable(x, y)
+    assert table.values.shape == (len(DEFAULT_WINDOWS), len(x))
+
+    sliced = table.get(12, 100, 400)
+    expected = pd.Series(x[100:400]).rolling(12).corr(pd.Series(y[100:400])).to_numpy()
+    np.testing.assert_allclose(sliced, expected, rtol=0, atol=1e-9, equal_nan=True)
+
+    # Windows outside the precomputed set are computed on the slice, not kept.
+    expected = pd.Series(x[100:400]).rolling(48).corr(pd.Series(y[100:400])).to_numpy()
+    np.testing.assert_allclose(table.get(48, 100, 400), expected, rtol=0, atol=1e-9, equal_nan=True)
+    assert 48 not in table.windows
@@ -0,0 +1,111 @@
+"""
+Tests for versioned dataset snapshots and their validation.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.data.snapshots import SnapshotError, SnapshotStore, validate_dataset
+
+T0 = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def _frame(rows=5, gold=100.0, sp500=1000.0):
+    dates = pd.date_range("2020-01-01", periods=rows, freq="D").strftime("%Y-%m-%d")
+    return pd.DataFrame({"date": dates, "gold": gold + np.arange(rows), "sp500": sp500 + np.arange(rows)})
+
+
+def _writer(text, info=None):
+    def write(directory):
+        (directory / "data.csv").write_text(text)
+        return info or {"rows": text.count("\n")}
+
+    return write
+
+
+def test_publish_activates_new_version_and_resolves_paths(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    legacy = tmp_path / "data.csv"
+    assert store.current() is None
+    assert store.resolve(legacy, tmp_path / "other.bin") == (legacy, tmp_path / "other.bin")
+
+    snapshot = store.publish(_writer("a\n1\n"), now=T0)
+    assert snapshot.version.startswith("20260102T030405Z-")
+    assert store.current() == snapshot.version
+    assert snapshot.manifest["rows"] == 2 and "data.csv" in snapshot.manifest["files"]
+    # Files in the snapshot replace the legacy paths; others are left alone.
+    assert store.resolve(legacy, tmp_path / "other.bin") == (snapshot.path / "data.csv", tmp_path / "other.bin")
+    assert [p.name for p in store.root.iterdir() if p.name.startswith(".tmp-")] == []
+
+
+def test_identical_data_is_not_republished(tmp_path):
+    store = SnapshotStore(tmp_path)
+    first = store.publish(_writer("a\n1\n"), now=T0)
+    assert store.publish(_writer("a\n1\n"), now=T0 + timedelta(hours=1)) is None
+    assert store.versions() == [first.version]
+
+
+def test_failed_write_leaves_current_untouched(tmp_path):
+    store = SnapshotStore(tmp_path)
+    first = store.publish(_writer("a\n1\n"), now=T0)
+
+    def bad(directory):
+        (directory / "data.csv").write_text("partial")
+        raise SnapshotError("validation failed")
+
+    with pytest.raises(SnapshotError):
+        store.publish(bad, now=T0 + timedelta(hours=1))
+    assert store.current() == first.version and store.versions() == [first.version]
+    assert (first.path / "data.csv").read_text() == "a\n1\n"
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".tmp-")] == []
+
+
+def test_retention_keeps_newest_and_current(tmp_path):
+    store = SnapshotStore(tmp_path, keep=2)
+    versions = [store.publish(_writer(f"a\n{k}\n"), now=T0 + timedelta(hours=k)).version for k in range(4)]
+    assert store.versions() == versions[2:]
+
+    # Rolling back keeps the older version current through later prunes.
+    store.activate(versions[2])
+    store.keep = 1
+    assert store.prune() == [] and store.current() == versions[2]
+    assert store.publish(_writer("a\n9\n"), now=T0 + timedelta(hours=9)).version not in versions
+    assert store.versions() == [store.current()]
+
+    with pytest.raises(SnapshotError):
+        store.activate("missing")
+
+
+def test_stale_temporary_directories_are_pruned(tmp_path):
+    store = SnapshotStore(tmp_path)
+    stale = tmp_path / ".tmp-1-dead"
+    stale.mkdir()
+    os.utime(stale, (0, 0))
+    store.publish(_writer("a\n1\n"), now=T0)
+    assert not stale.exists()
+
+
+def test_validate_accepts_clean_data_and_reports_summary():
+    summary = validate_dataset(_frame(6), previous=_frame(5))
+    assert summary["rows"] == 6 and summary["first_date"] == "2020-01-01" and summary["last_date"] == "2020-01-06"
+
+
+@pytest.mark.parametrize(
+    "frame, previous, message",
+    [
+        (_frame(1), None, "rows"),
+        (_frame().drop(columns="sp500"), None, "missing columns"),
+        (_frame().iloc[::-1], None, "increasing"),
+        (_frame().assign(gold=[1.0, 2.0, -1.0, 3.0, 4.0]), None, "non-positive"),
+        (_frame().assign(sp500=[1000.0, 1001.0, 10.0, 10.0, 10.0]), None, "moved"),
+        (_frame(5), _frame(10), "down from"),
+        (_frame(5, gold=200.0), _frame(5), "changed from"),
+    ],
+)
+def test_validate_rejects_bad_data(frame, previous, message):
+    with pytest.raises(SnapshotError, match=message):
+        validate_dataset(frame, previous)
@@ -0,0 +1,73 @@
+"""
+Tests for the sorted, read-only date-indexed frame.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.data.sorted_frame import SortedFrame
+
+
+@pytest.fixture
+def df():
+    dates = pd.date_range("1971-01-31", "2025-09-30", freq="ME")
+    rng = np.random.default_rng(2)
+    return pd.DataFrame({
+        "date": dates,
+        "gold": 40 * np.exp(np.cumsum(rng.normal(0, 0.04, len(dates)))),
+        "sp500": 90 * np.exp(np.cumsum(rng.normal(0, 0.04, len(dates)))),
+    })
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [("2015-10-16", "2025-10-16"), ("1971-01-31", "1971-01-31"), ("2000-02-01", "2000-02-28"), ("1960-01-01", "2030-01-01")],
+)
+def test_range_matches_boolean_mask(df, start, end):
+    frame = SortedFrame.from_frame(df)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    expected = df[(df["date"] >= start) & (df["date"] <= end)]
+    view = frame.range(start, end)
+    assert len(view) == len(expected)
+    np.testing.assert_array_equal(view.dates, expected["date"].to_numpy())
+    np.testing.assert_array_equal(view["gold"], expected["gold"].to_numpy())
+    pd.testing.assert_frame_equal(view.to_frame(), expected.reset_index(drop=True))
+
+
+def test_views_share_memory_and_are_read_only(df):
+    frame = SortedFrame.from_frame(df)
+    view = frame.range("1990-01-01", "1999-12-31")
+    assert np.shares_memory(view["gold"], frame["gold"])
+    assert np.shares_memory(view.dates, frame.dates)
+    with pytest.raises(ValueError):
+        view["gold"][0] = 1.0
+    assert set(frame) == {"gold", "sp500"} and frame.rows == len(df)
+    assert "sp500" in view and view.columns == ("gold", "sp500")
+
+
+def test_first_last_and_lazy_base_100(df):
+    view = SortedFrame.from_frame(df).range("2000-01-01", "2009-12-31")
+    selected = df[(df["date"] >= "2000-01-01") & (df["date"] <= "2009-12-31")]
+    assert view.first_date() == selected["date"].iloc[0] and view.last_date() == selected["date"].iloc[-1]
+    assert view.pct_change("gold") == pytest.approx(
+        100 * (selected["gold"].iloc[-1] - selected["gold"].iloc[0]) / selected["gold"].iloc[0]
+    )
+    indexed = view.indexed("sp500")
+    assert indexed is view.indexed("sp500")  # computed once per view
+    np.testing.assert_allclose(indexed, 100 * selected["sp500"] / selected["sp500"].iloc[0])
+    assert not indexed.flags.writeable
+
+
+def test_empty_and_invalid_input(df):
+    frame = SortedFrame.from_frame(df)
+    empty = frame.range("2030-01-01", "2031-01-01")
+    assert len(empty) == 0 and len(empty.indexed("gold")) == 0
+    assert len(frame.range("2010-01-01", "2000-01-01")) == 0
+    assert frame.bounds() == (0, len(df))
+    shuffled = SortedFrame.from_frame(df.sample(frac=1, random_state=0))
+    np.testing.assert_array_equal(shuffled.dates, df["date"].to_numpy())
+    with pytest.raises(ValueError):
+        SortedFrame(df["date"].to_numpy()[::-1], {"gold": df["gold"].to_numpy()})
+    with pytest.raises(ValueError):
+        SortedFrame(df["date"].to_numpy(), {"gold": df["gold"].to_numpy()[:5]})
@@ -0,0 +1,74 @@
+"""
+Tests for the prefix-sum range statistics index.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from gold_vs_equities.core.stats_index import PrefixStatsIndex
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(42)
+    n = 500
+    dates = np.datetime64("1971-01-31") + np.arange(n) * 30
+    x = 40 + np.cumsum(rng.normal(size=n))
+    y = 100 + 0.8 * x + np.cumsum(rng.normal(size=n))
+    return dates, x, y
+
+
+@pytest.mark.parametrize("i,j", [(0, 500), (10, 50), (123, 456), (490, 500)])
+def test_matches_scipy(series, i, j):
+    dates, x, y = series
+    index = PrefixStatsIndex(dates, x, y)
+    result = index.query(dates[i], dates[j - 1])
+
+    pearson = stats.pearsonr(x[i:j], y[i:j])
+    fit = stats.linregress(x[i:j], y[i:j])
+    assert result.n == j - i
+    assert result.r == pytest.approx(pearson.statistic, abs=1e-12)
+    assert result.p_value == pytest.approx(pearson.pvalue, rel=1e-9, abs=1e-300)
+    assert result.slope == pytest.approx(fit.slope, rel=1e-10)
+    assert result.intercept == pytest.approx(fit.intercept, rel=1e-10, abs=1e-9)
+    assert result.stderr == pytest.approx(fit.stderr, rel=1e-9)
+    assert result.r_squared == pytest.approx(pearson.statistic ** 2, abs=1e-12)
+
+
+def test_range_bounds_are_inclusive(series):
+    dates, x, y = series
+    index = PrefixStatsIndex(dates, x, y)
+    assert index.bounds(dates[5], dates[9]) == (5, 10)
+    assert index.bounds(pd.Timestamp(dates[5]) + pd.Timedelta(days=1), dates[9]) == (6, 10)
+    assert index.query("1800-01-01", "1800-12-31").n == 0
+
+
+def test_degenerate_ranges(series):
+    dates, x, y = series
+    index = PrefixStatsIndex(dates, x, y)
+    assert math.isnan(index.query(dates[3], dates[3]).r)
+
+    flat = PrefixStatsIndex(dates[:5], np.full(5, 2.0), y[:5])
+    assert math.isnan(flat.query(dates[0], dates[4]).r)
+
+
+def test_compensated_sums_stay_accurate_with_large_offsets():
+    rng = np.random.default_rng(7)
+    n = 200_000
+    dates = np.datetime64("1900-01-01") + np.arange(n)
+    x = 1e7 + rng.normal(size=n)
+    y = 1e7 + 0.5 * (x - 1e7) + rng.normal(size=n)
+    index = PrefixStatsIndex(dates, x, y, compensated=True)
+
+    result = index.query_positions(n - 1000, n)
+    expected = stats.pearsonr(x[-1000:], y[-1000:]).statistic
+    assert result.r == pytest.approx(expected, abs=1e-13)
+
+
+def test_rejects_unsorted_dates():
+    with pytest.raises(ValueError):
+        PrefixStatsIndex(["2020-01-02", "2020-01-01"], [1.0, 2.0], [1.0, 2.0])
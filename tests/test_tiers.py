@@ -0,0 +1,82 @@
+"""
+Tests for the multi-resolution dataset tiers.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gold_vs_equities.data import columnar, tiers
+
+
+@pytest.fixture
+def daily():
+    dates = pd.bdate_range("1971-01-01", "2025-12-31")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "date": dates,
+        "gold": 40 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))),
+        "sp500": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))),
+    })
+
+
+@pytest.mark.parametrize("tier,rule", [("weekly", "W-SUN"), ("monthly", "ME"), ("yearly", "YE")])
+def test_aggregate_last_matches_pandas_resample(daily, tier, rule):
+    result = tiers.aggregate_last(daily, tier)
+    grouped = daily.set_index("date").resample(rule)
+    expected = grouped.last().dropna()
+
+    np.testing.assert_array_equal(result["gold"], expected["gold"])
+    # Rows keep the date of the observation they were taken from.
+    last_dates = daily.set_index("date").assign(d=daily["date"].to_numpy()).resample(rule)["d"].last().dropna()
+    np.testing.assert_array_equal(result["date"].to_numpy(), last_dates.to_numpy())
+
+
+def test_detect_base_tier(daily):
+    assert tiers.detect_base_tier(daily["date"]) == "daily"
+    assert tiers.detect_base_tier(tiers.aggregate_last(daily, "weekly")["date"]) == "weekly"
+    assert tiers.detect_base_tier(tiers.aggregate_last(daily, "monthly")["date"]) == "monthly"
+    assert tiers.detect_base_tier(tiers.aggregate_last(daily, "yearly")["date"]) == "yearly"
+
+
+def test_select_tier_prefers_coarsest_with_enough_points(daily):
+    dataset = tiers.MultiResolutionDataset.from_frame(daily)
+    assert dataset.tiers == tiers.TIER_NAMES
+    assert dataset.select_tier("1971-01-01", "2025-12-31") == "monthly"
+    assert dataset.select_tier("2021-01-01", "2025-12-31") == "weekly"
+    assert dataset.select_tier("2025-01-01", "2025-12-31") == "daily"
+    assert dataset.select_tier("2025-12-01", "2025-12-31") == "daily"
+    assert dataset.select_tier("1971-01-01", "2025-12-31", min_points=50) == "yearly"
+    assert dataset.count("monthly", "2025-01-01", "2025-12-31") == 12
+
+
+def test_monthly_base_holds_only_coarser_tiers(daily):
+    monthly = tiers.aggregate_last(daily, "monthly")
+    dataset = tiers.MultiResolutionDataset.from_frame(monthly)
+    assert dataset.tiers == ("monthly", "yearly")
+    assert dataset.select_tier("2024-01-01", "2025-12-31") == "monthly"
+
+
+def test_written_tiers_are_loaded_and_checked(tmp_path, daily):
+    csv_path = tmp_path / "data.csv"
+    binary_path = columnar.write_frame(daily, tmp_path / "data.bin")
+    paths = tiers.write_tiers(daily, binary_path)
+    assert paths["weekly"] == tmp_path / "data.weekly.bin"
+
+    dataset = tiers.MultiResolutionDataset.load(csv_path, binary_path)
+    # Read from the mapped tier file (read-only), not re-aggregated.
+    assert not dataset.frame("monthly")["gold"].to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(dataset.frame("monthly"), tiers.aggregate_last(daily, "monthly"), check_dtype=False)
+
+    # Tier files built from another base are ignored and re-aggregated.
+    shorter = daily.iloc[:-30]
+    columnar.write_frame(shorter, binary_path)
+    dataset = tiers.MultiResolutionDataset.load(csv_path, binary_path)
+    assert dataset.frame("monthly")["date"].iloc[-1] == shorter["date"].iloc[-1]
+
+
+def test_months_to_rows():
+    assert tiers.months_to_rows(12, "daily") == 252
+    assert tiers.months_to_rows(3, "weekly") == 13
+    assert tiers.months_to_rows(12, "monthly") == 12
+    assert tiers.months_to_rows(3, "yearly") == 0
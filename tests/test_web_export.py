@@ -0,0 +1,86 @@
+"""
+Tests for the precomputed web dashboard bundle.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from gold_vs_equities import cli, web_export
+from gold_vs_equities.core.presets import PRESET_RANGES, ROLLING_WINDOW_MONTHS, preset_range
+
+
+@pytest.fixture
+def frame():
+    dates = pd.date_range("1971-01-31", "2025-09-30", freq="ME")
+    rng = np.random.default_rng(9)
+    gold = 40 * np.exp(np.cumsum(rng.normal(0.004, 0.04, len(dates))))
+    sp500 = 90 * np.exp(np.cumsum(rng.normal(0.006, 0.045, len(dates))))
+    return pd.DataFrame({"date": dates, "gold": gold, "sp500": sp500})
+
+
+def _range_stats(bundle, i, j):
+    """Answer a range the way the dashboard does: differences of prefix sums."""
+    c = bundle["cumulative"]
+    n = j - i
+    sx, sy = c["x"][j] - c["x"][i], c["y"][j] - c["y"][i]
+    sxx, syy, sxy = c["xx"][j] - c["xx"][i], c["yy"][j] - c["yy"][i], c["xy"][j] - c["xy"][i]
+    cov = sxy - sx * sy / n
+    var_x, var_y = sxx - sx * sx / n, syy - sy * sy / n
+    return cov / np.sqrt(var_x * var_y), cov / var_x
+
+
+def test_prefix_sums_answer_any_range(frame):
+    bundle = web_export.build_bundle(frame, "v1")
+    assert bundle["rows"] == len(frame)
+    assert len(bundle["cumulative"]["x"]) == len(frame) + 1
+    for i, j in [(0, len(frame)), (100, 220), (500, 505)]:
+        r, slope = _range_stats(bundle, i, j)
+        expected = stats.linregress(frame["gold"][i:j], frame["sp500"][i:j])
+        assert r == pytest.approx(expected.rvalue, abs=1e-9)
+        assert slope == pytest.approx(expected.slope, rel=1e-9)
+
+
+def test_presets_and_rolling_match_pandas(frame):
+    bundle = web_export.build_bundle(frame, "v1")
+    assert list(bundle["presets"]) == list(PRESET_RANGES)
+    start, end = preset_range("Last 5 Years", frame["date"].min().date(), frame["date"].max().date())
+    selected = frame[(frame["date"] >= pd.Timestamp(start)) & (frame["date"] <= pd.Timestamp(end))]
+    summary = bundle["presets"]["Last 5 Years"]
+    assert summary["n"] == len(selected) == summary["j"] - summary["i"]
+    assert summary["r"] == pytest.approx(stats.pearsonr(selected["gold"], selected["sp500"])[0], abs=1e-9)
+
+    assert sorted(bundle["rolling"], key=int) == [str(m) for m in ROLLING_WINDOW_MONTHS]
+    expected = frame["gold"].rolling(12).corr(frame["sp500"]).to_numpy()
+    rolling = np.array([np.nan if v is None else v for v in bundle["rolling"]["12"]])
+    assert np.isnan(rolling[:11]).all()
+    np.testing.assert_allclose(rolling[11:], expected[11:], atol=1e-6)
+
+    days = bundle["start_day"] + np.array(bundle["day_offsets"])
+    assert (days.astype("datetime64[D]") == frame["date"].to_numpy(dtype="datetime64[D]")).all()
+
+
+def test_export_writes_minified_bundle(tmp_path, frame):
+    csv_path = tmp_path / "aligned.csv"
+    frame.to_csv(csv_path, index=False)
+    out = tmp_path / "web" / "bundle.json"
+    path = web_export.export_web_bundle(out_path=out, csv_path=csv_path, binary_path=tmp_path / "aligned.bin")
+    text = path.read_text()
+    assert ": " not in text and ", " not in text
+    bundle = json.loads(text)
+    assert bundle["format"] == web_export.BUNDLE_FORMAT
+    assert bundle["frequency"] == "monthly"
+    assert len(bundle["dataset_version"]) == 16
+    assert not list(tmp_path.glob("web/*.tmp"))
+
+
+def test_cli_export_web(tmp_path, monkeypatch):
+    calls = []
+    written = tmp_path / "bundle.json"
+    written.write_text("{}")
+    monkeypatch.setattr(web_export, "export_web_bundle", lambda out_path=None: calls.append(out_path) or written)
+    assert cli.main(["export-web", "--out", "bundle.json"]) == 0
+    assert calls == ["bundle.json"]